@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   This work may be distributed and/or modified under
+#             the conditions of the `LaTeX Project Public License`,
+#             either version 1.3 of this license or (at your option)
+#             any later  version.
+
+# build_patterns.py
+# *****************
+#
+# ::
+
+u"""
+Erzeuge die Trennmuster mehrerer Varianten parallel.
+
+Die Schritte der Mustererzeugung bilden einen Abhängigkeitsgraphen:
+
+  words        Eingabelisten aller Varianten in einem Durchgang über die
+               Wortliste (extract_tex.py),
+  <dir>:1..8   die acht patgen-Level jeder Variante (wie
+               make-full-pattern.sh, mit dessen Parametern),
+  <dir>:eval   Bewertung der Muster anhand der Wortliste (Treffer und
+               Fehler je Kategorie der Trennstellen, Laufzeit), Bericht in
+               <dir>/evaluation.json (siehe python/patuse/evaluate.py),
+  <dir>:pat    Zusammensetzen von <dir>-<Datum>.pat und .tex (wie im
+               Makefile).
+
+Unabhängige Schritte (die Level verschiedener Varianten) laufen
+gleichzeitig in einem Prozess-Pool. Schritte, deren Eingaben sich seit dem
+letzten Lauf inhaltlich (MD5-Summe) nicht geändert haben, werden
+übersprungen. Zum Schluss wird die Laufzeit jedes Schrittes angezeigt.
+
+Varianten: trad, refo, swiss, optional mit Endung -major, -fugen oder
+-suffix (z.B. "trad refo-major"). Vorgabe: trad refo swiss.
+"""
+
+usage = u'%prog [Optionen] [Variante ...]\n' + __doc__
+
+
+import sys, os, re, time, optparse, hashlib, marshal, subprocess
+import multiprocessing, Queue
+
+import extract_tex
+from patuse import evaluate
+
+# Verzeichnisse wie im Makefile (`SRCDIR`, `SCRIPTDIR`, `DATADIR`)::
+
+scriptdir = os.path.dirname(os.path.abspath(__file__))
+srcdir = os.path.dirname(scriptdir)
+
+
+# patgen-Parameter
+# ================
+#
+# Die Parameter der Level werden aus ``make-full-pattern.sh`` gelesen, damit
+# beide Wege dieselben Muster erzeugen. Rückgabewert ist eine Liste von
+# Tupeln (hyph_start_finish, pat_start_finish, good_bad_thres):
+#
+# >>> from build_patterns import read_parameters
+# >>> parameter = read_parameters()
+# >>> len(parameter)
+# 8
+# >>> parameter[1]
+# ('2 2', '2 5', '1 2 1')
+#
+# ::
+
+def read_parameters(path=os.path.join(scriptdir, 'make-full-pattern.sh')):
+    felder = ('hyph_start_finish', 'pat_start_finish', 'good_bad_thres')
+    werte = dict((feld, {}) for feld in felder)
+    for line in open(path):
+        match = re.match(r"(\w+)\[(\d+)\]='([^']*)'", line)
+        if match and match.group(1) in werte:
+            werte[match.group(1)][int(match.group(2))] = match.group(3)
+    levels = sorted(werte[felder[0]])
+    return [tuple(werte[feld][i] for feld in felder) for i in levels]
+
+# Zeile für ``pattern.rules`` (wie in ``make-full-pattern.sh``):
+#
+# >>> from build_patterns import format_rule
+# >>> format_rule(parameter[1])
+# '%   2 2 | 2 5 | 1 2 1\n'
+#
+# ::
+
+def format_rule(parameter):
+    return '%%   %s | %s | %s\n' % parameter
+
+
+# Schritte
+# ========
+#
+# Ein Schritt hat einen Namen, eine Aktion (Funktion auf Modulebene, damit
+# sie an einen Kindprozess übergeben werden kann), die Namen der Schritte,
+# von denen er abhängt, sowie Eingabe- und Ausgabedateien. `parameter`
+# fließt mit den MD5-Summen der Eingaben in den Schlüssel ein, an dem ein
+# aktueller Schritt erkannt wird. Schritte mit ``lokal=True`` laufen im
+# Hauptprozess (z.B. die Extraktion, die selbst einen Prozess-Pool nutzt)::
+
+class Schritt(object):
+
+    def __init__(self, name, aktion, args=(), abhaengig=(), eingaben=(),
+                 ausgaben=(), parameter='', lokal=False):
+        self.name = name
+        self.aktion = aktion
+        self.args = args
+        self.abhaengig = list(abhaengig)
+        self.eingaben = list(eingaben)
+        self.ausgaben = list(ausgaben)
+        self.parameter = parameter
+        self.lokal = lokal
+
+    def __repr__(self):
+        return '<Schritt %s>' % self.name
+
+# MD5-Summe einer Datei (None, wenn sie nicht existiert)::
+
+def md5sum(path):
+    try:
+        datei = open(path, 'rb')
+    except IOError:
+        return None
+    summe = hashlib.md5()
+    with datei:
+        for block in iter(lambda: datei.read(1 << 20), ''):
+            summe.update(block)
+    return summe.hexdigest()
+
+def schluessel(schritt):
+    summe = hashlib.md5(schritt.parameter)
+    for path in schritt.eingaben:
+        summe.update('%s:%s\n' % (path, md5sum(path)))
+    return summe.hexdigest()
+
+
+# Aktionen
+# --------
+#
+# Eingabelisten aller Varianten (siehe extract_tex.py)::
+
+def extrahiere(wortliste, varianten, w, builddir, jobs):
+    schreibungen = sorted(set(s for s, m in varianten))
+    moden = set(m for s, m in varianten)
+    moden = [m for m in extract_tex.modi if m in moden]
+    ausgaben, woerter = extract_tex.extract_parallel(
+        open(wortliste), schreibungen, moden, w, jobs)
+    ausgaben = dict((key, menge) for key, menge in ausgaben.iteritems()
+                    if key in varianten)
+    extract_tex.write_outputs(ausgaben, woerter, builddir, jobs)
+
+# Ein patgen-Level (wie eine Runde der Schleife in make-full-pattern.sh).
+# Die Steuereingaben werden über die Standardeingabe übergeben, die Ausgabe
+# in ``pattern.<level>.log`` gespeichert::
+
+def patgen_level(verzeichnis, level, woerter, translate, parameter,
+                 patgen='patgen'):
+    eingabe = '\n'.join(parameter + ('y',))
+    with open(os.path.join(verzeichnis, 'pattern.%d.log' % level),
+              'w') as log:
+        process = subprocess.Popen(
+            [patgen, os.path.basename(woerter), 'pattern.%d' % (level-1),
+             'pattern.%d' % level, translate],
+            cwd=verzeichnis, stdin=subprocess.PIPE, stdout=log,
+            stderr=subprocess.STDOUT)
+        process.communicate(eingabe)
+    if process.returncode:
+        raise RuntimeError('patgen (Level %d) beendet mit Status %d'
+                           % (level, process.returncode))
+
+# Leere Startmuster ``pattern.0``::
+
+def startmuster(verzeichnis):
+    if not os.path.isdir(verzeichnis):
+        os.makedirs(verzeichnis)
+    open(os.path.join(verzeichnis, 'pattern.0'), 'w').close()
+
+# Bewertung der Muster eines Levels (``pattern.<level>``, latin-9) mit den
+# Wörtern der Rechtschreibung (siehe python/patuse/evaluate.py). Die
+# Schritte laufen schon parallel, daher hier ein Prozess::
+
+def bewerte(verzeichnis, wortliste, sprachvarianten, level):
+    evaluate.evaluate_file(
+        os.path.join(verzeichnis, 'pattern.%d' % level), wortliste,
+        sprachvarianten, encoding='iso-8859-15',
+        report=os.path.join(verzeichnis, 'evaluation.json'),
+        errors=os.path.join(verzeichnis, 'evaluation.errors'))
+
+# Zusammensetzen der Musterdatei aus den Schablonen in ``daten/``, den
+# patgen-Parametern und ``pattern.<n>`` (in UTF-8), sowie der .tex-Datei
+# (wie die Regeln für ``$(TRAD)/$(TRAD)-$(DATE).pat`` im Makefile)::
+
+def git_version(srcdir=srcdir):
+    try:
+        return subprocess.Popen(['git', 'log', '--format=%H', '-1', 'HEAD',
+                                 '--'], cwd=srcdir, stdout=subprocess.PIPE,
+                                stderr=open(os.devnull, 'w')
+                               ).communicate()[0].strip()
+    except OSError:
+        return ''
+
+def zusammensetzen(verzeichnis, datadir, datum, version, parameter):
+    name = os.path.basename(verzeichnis)
+    ersetze = lambda text: text.replace('@DATE@', datum
+                              ).replace('@GIT_VERSION@', version)
+    vorlage = lambda teil: open(os.path.join(datadir, name + teil)).read()
+
+    with open(os.path.join(verzeichnis, 'pattern.rules'), 'w') as rules:
+        rules.write(''.join(format_rule(p) for p in parameter))
+    muster = open(os.path.join(verzeichnis, 'pattern.%d' % len(parameter))
+                 ).read().decode('iso-8859-15').encode('utf8')
+
+    with open(os.path.join(verzeichnis, '%s-%s.pat' % (name, datum)),
+              'w') as pat:
+        pat.write(ersetze(vorlage('.1')))
+        pat.write(''.join(format_rule(p) for p in parameter))
+        pat.write(vorlage('.2'))
+        pat.write(muster)
+        pat.write(vorlage('.3'))
+    with open(os.path.join(verzeichnis, '%s-%s.tex' % (name, datum)),
+              'w') as tex:
+        tex.write(vorlage('.tex.in').replace('@DATE@', datum))
+
+
+# Abhängigkeitsgraph
+# ==================
+#
+# Schritte für die gewählten Varianten (Paare (Rechtschreibung, Modus) wie
+# in extract_tex.py). Die Zusammenstellung der .pat-Datei entfällt, wenn es
+# keine Schablonen für die Variante gibt (z.B. bei "fugen" und "suffix"):
+#
+# >>> from build_patterns import schritte
+# >>> [s.name for s in schritte([('trad', 'major')], '/tmp/build')]
+# ... # doctest: +NORMALIZE_WHITESPACE
+# ['words', 'dehypht-x-major:0', 'dehypht-x-major:1', 'dehypht-x-major:2',
+#  'dehypht-x-major:3', 'dehypht-x-major:4', 'dehypht-x-major:5',
+#  'dehypht-x-major:6', 'dehypht-x-major:7', 'dehypht-x-major:8',
+#  'dehypht-x-major:eval', 'dehypht-x-major:pat']
+#
+# ::
+
+def schritte(varianten, builddir, w=0, wortliste=None, jobs=None,
+             patgen='patgen', datum=None, version=''):
+    wortliste = wortliste or os.path.join(srcdir, 'wortliste')
+    datadir = os.path.join(srcdir, 'daten')
+    translate = os.path.join(datadir, 'german.tr')
+    datum = datum or time.strftime('%Y-%m-%d')
+    parameter = read_parameters()
+    extract_py = os.path.splitext(extract_tex.__file__)[0] + '.py'
+
+    woerter = [extract_tex.ausgabedatei(s, m, builddir)
+               for s, m in varianten]
+    liste = [Schritt('words', extrahiere,
+                     (wortliste, varianten, w, builddir, jobs),
+                     eingaben=[wortliste, extract_py],
+                     ausgaben=woerter,
+                     parameter='W=%d %r' % (w, sorted(varianten)),
+                     lokal=True)]
+
+    for (s, m), path in zip(varianten, woerter):
+        verzeichnis = os.path.dirname(path)
+        name = os.path.basename(verzeichnis)
+        liste.append(Schritt('%s:0' % name, startmuster, (verzeichnis,),
+                             ausgaben=[os.path.join(verzeichnis,
+                                                    'pattern.0')]))
+        for level, p in enumerate(parameter, 1):
+            vorher = os.path.join(verzeichnis, 'pattern.%d' % (level-1))
+            liste.append(Schritt(
+                '%s:%d' % (name, level), patgen_level,
+                (verzeichnis, level, path, translate, p, patgen),
+                abhaengig=['words', '%s:%d' % (name, level-1)],
+                eingaben=[path, vorher, translate],
+                ausgaben=[os.path.join(verzeichnis, 'pattern.%d' % level)],
+                parameter=repr(p)))
+
+        letzte = os.path.join(verzeichnis, 'pattern.%d' % len(parameter))
+        sprachvarianten = extract_tex.rechtschreibungen[s][1]
+        liste.append(Schritt(
+            '%s:eval' % name, bewerte,
+            (verzeichnis, wortliste, sprachvarianten, len(parameter)),
+            abhaengig=['%s:%d' % (name, len(parameter))],
+            eingaben=[wortliste, letzte,
+                      os.path.splitext(evaluate.__file__)[0] + '.py'],
+            ausgaben=[os.path.join(verzeichnis, 'evaluation.json'),
+                      os.path.join(verzeichnis, 'evaluation.errors')],
+            parameter=sprachvarianten))
+
+        vorlagen = [os.path.join(datadir, name + teil)
+                    for teil in ('.1', '.2', '.3', '.tex.in')]
+        if not all(os.path.exists(v) for v in vorlagen):
+            continue
+        liste.append(Schritt(
+            '%s:pat' % name, zusammensetzen,
+            (verzeichnis, datadir, datum, version, parameter),
+            abhaengig=['%s:%d' % (name, len(parameter))],
+            eingaben=vorlagen + [os.path.join(verzeichnis, 'pattern.%d'
+                                              % len(parameter))],
+            ausgaben=[os.path.join(verzeichnis, '%s-%s.%s'
+                                   % (name, datum, endung))
+                      for endung in ('pat', 'tex')],
+            parameter='%s %s %r' % (datum, version, parameter)))
+    return liste
+
+
+# Ausführung
+# ==========
+#
+# Zustand des letzten Laufs: ``{Schritt: (Schlüssel, {Ausgabe: MD5})}``::
+
+class Zustand(dict):
+
+    format = '1'
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            format, daten = marshal.load(open(path, 'rb'))
+            if format == self.format:
+                self.update(daten)
+        except (IOError, EOFError, ValueError, TypeError):
+            pass
+
+    def aktuell(self, schritt, key):
+        try:
+            alt, summen = self[schritt.name]
+        except KeyError:
+            return False
+        return alt == key and all(md5sum(path) == summen.get(path)
+                                  for path in schritt.ausgaben)
+
+    def eintragen(self, schritt, key):
+        self[schritt.name] = (key, dict((path, md5sum(path))
+                                        for path in schritt.ausgaben))
+        tmp = self.path + '.tmp'
+        marshal.dump((self.format, dict(self)), open(tmp, 'wb'))
+        os.rename(tmp, self.path)
+
+# Aufruf einer Aktion (im Kindprozess). Ausnahmen werden als Text
+# zurückgegeben, weil `apply_async` sonst den Rückruf nicht ausführt::
+
+def ausfuehren(aktion, args):
+    start = time.time()
+    try:
+        aktion(*args)
+        fehler = None
+    except Exception, err:
+        fehler = '%s: %s' % (err.__class__.__name__, err)
+    return fehler, time.time() - start
+
+# Alle Schritte in Abhängigkeitsreihenfolge ausführen. Bereite Schritte
+# werden sofort an den Pool übergeben, fertige melden sich über eine
+# Warteschlange. Rückgabewert ist eine Liste von
+# (Schritt, Status, Laufzeit) in der Reihenfolge der Fertigstellung::
+
+def build(liste, zustand, processes=None, verbose=False):
+    nach_name = dict((s.name, s) for s in liste)
+    offen = dict((s.name, set(a for a in s.abhaengig if a in nach_name))
+                 for s in liste)
+    folgende = dict((s.name, []) for s in liste)
+    for s in liste:
+        for a in offen[s.name]:
+            folgende[a].append(s.name)
+
+    pool = multiprocessing.Pool(processes or multiprocessing.cpu_count())
+    fertig = Queue.Queue()
+    ergebnis = []
+    laufend = [0]
+
+    def melde(schritt, status, dauer):
+        ergebnis.append((schritt, status, dauer))
+        if verbose:
+            print >> sys.stderr, '%-24s %-10s %8.2f' % (schritt.name,
+                                                       status, dauer)
+
+    def starten(schritt):
+        key = schluessel(schritt)
+        if zustand.aktuell(schritt, key):
+            fertig.put((schritt, key, 'aktuell', 0.0))
+        elif schritt.lokal:
+            fehler, dauer = ausfuehren(schritt.aktion, schritt.args)
+            fertig.put((schritt, key, fehler or 'erstellt', dauer))
+        else:
+            pool.apply_async(
+                ausfuehren, (schritt.aktion, schritt.args),
+                callback=lambda (fehler, dauer): fertig.put(
+                    (schritt, key, fehler or 'erstellt', dauer)))
+        laufend[0] += 1
+
+    def ueberspringen(name):
+        melde(nach_name[name], 'abgebrochen', 0.0)
+        for f in folgende[name]:
+            if f in offen:
+                del offen[f]
+                ueberspringen(f)
+
+    for name in [n for n, a in offen.items() if not a]:
+        del offen[name]
+        starten(nach_name[name])
+
+    while laufend[0]:
+        schritt, key, status, dauer = fertig.get()
+        laufend[0] -= 1
+        if status in ('erstellt', 'aktuell'):
+            if status == 'erstellt':
+                zustand.eintragen(schritt, key)
+            melde(schritt, status, dauer)
+            for f in folgende[schritt.name]:
+                if f not in offen:
+                    continue
+                offen[f].discard(schritt.name)
+                if not offen[f]:
+                    del offen[f]
+                    starten(nach_name[f])
+        else:
+            melde(schritt, 'Fehler', dauer)
+            print >> sys.stderr, '%s: %s' % (schritt.name, status)
+            for f in folgende[schritt.name]:
+                if f in offen:
+                    del offen[f]
+                    ueberspringen(f)
+
+    pool.close()
+    pool.join()
+    return ergebnis
+
+# Laufzeiten pro Variante und Level::
+
+def bericht(ergebnis, gesamt, out=sys.stdout):
+    zeilen = {}
+    for schritt, status, dauer in ergebnis:
+        name, _, level = schritt.name.partition(':')
+        zeilen.setdefault(name, {})[level or 'extract'] = (status, dauer)
+    levels = sorted(set(l for z in zeilen.values() for l in z),
+                    key=lambda l: (not l.isdigit(), l.isdigit() and int(l),
+                                   l))
+    print >> out, '%-20s' % 'Schritt', ''.join('%8s' % l for l in levels)
+    for name in sorted(zeilen):
+        felder = []
+        for level in levels:
+            status, dauer = zeilen[name].get(level, (None, 0))
+            if status == 'erstellt':
+                felder.append('%8.2f' % dauer)
+            elif status is None:
+                felder.append('%8s' % '')
+            else:
+                felder.append('%8s' % {'aktuell': '=', 'Fehler': 'F!',
+                                        'abgebrochen': '-'}[status])
+        print >> out, '%-20s' % name, ''.join(felder)
+    summe = sum(dauer for schritt, status, dauer in ergebnis)
+    print >> out, u'Gesamt: %.2f s (Summe der Schritte %.2f s)' % (gesamt,
+                                                                   summe)
+    print >> out, u'(= aktuell, übersprungen; F! Fehler; - abgebrochen)'\
+                  .encode('utf8')
+
+
+if __name__ == '__main__':
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-W', '--wichtung', type='int', default=0,
+                      help=u'Wichtungs-Schwellwert für major/fugen/suffix '
+                      u'(wie "make major W=N"), Vorgabe 0 (alle)')
+    parser.add_option('-d', '--builddir', default='.',
+                      help=u'Verzeichnis für die Ausgabe, '
+                      u'Vorgabe: aktuelles Verzeichnis')
+    parser.add_option('-i', '--wortliste', default=None,
+                      help=u'Wortliste, Vorgabe: SRCDIR/wortliste')
+    parser.add_option('-j', '--jobs', type='int', default=None,
+                      help=u'Zahl der Prozesse, '
+                      u'Vorgabe: Zahl der Prozessoren')
+    parser.add_option('--patgen', default='patgen',
+                      help=u'patgen-Programm, Vorgabe "patgen"')
+    parser.add_option('-v', '--verbose', action='store_true', default=False,
+                      help=u'fertige Schritte sofort anzeigen')
+    (options, args) = parser.parse_args()
+
+    varianten = []
+    for arg in args or ['trad', 'refo', 'swiss']:
+        s, _, m = arg.partition('-')
+        m = m or 'all'
+        if s not in extract_tex.rechtschreibungen or m not in extract_tex.modi:
+            parser.error(u'unbekannte Variante "%s"' % arg)
+        varianten.append((s, m))
+
+    builddir = options.builddir
+    if not os.path.isdir(builddir):
+        os.makedirs(builddir)
+    zustand = Zustand(os.path.join(builddir, 'build_patterns.state'))
+    liste = schritte(varianten, builddir, options.wichtung,
+                     options.wortliste, options.jobs, options.patgen,
+                     version=git_version())
+
+    start = time.time()
+    ergebnis = build(liste, zustand, options.jobs, options.verbose)
+    bericht(ergebnis, time.time() - start)
+    if [e for e in ergebnis if e[1] in ('Fehler', 'abgebrochen')]:
+        sys.exit(1)
@@ -0,0 +1,598 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   This work may be distributed and/or modified under
+#             the conditions of the `LaTeX Project Public License`,
+#             either version 1.3 of this license or (at your option)
+#             any later  version.
+
+# extract_tex.py
+# **************
+#
+# ::
+
+u"""
+Erstelle die Eingabelisten für `patgen` aller Varianten in einem Durchgang
+über die Wortliste.
+
+Ersetzt die Kette aus ``extract-tex.pl -l``, der Nachbearbeitung mit
+`SEDMAJOR` und ``sort -d | uniq -i`` im Makefile. Für jede gewählte
+Rechtschreibung (trad, refo, swiss) und jeden Modus (all, major, fugen,
+suffix) wird die Datei ``<Verzeichnis>/words.hyphenated.<Rechtschreibung>``
+geschrieben, also z.B. ``dehypht-x/words.hyphenated.trad`` oder
+``dehyphn-x-fugen/words.hyphenated.refo`` (Verzeichnisse wie im
+Makefile). Die Listen sind sortiert, ohne Doppeleinträge (unabhängig von
+Groß-/Kleinschreibung) und in latin-9 kodiert.
+
+Die Modi major, fugen und suffix verwenden den Wichtungs-Schwellwert
+``-W`` (wie ``make major W=N``).
+"""
+
+usage = u'%prog [Optionen] [Wortliste]\n' + __doc__
+
+
+import sys, os, re, optparse, codecs, unicodedata, multiprocessing
+from itertools import count, imap, izip
+
+# path for local Python modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python'))
+
+from edit_tools.wortliste import WordEntry
+
+
+# Varianten
+# =========
+#
+# Rechtschreibungen: Verzeichnis (ohne Modus-Endung), Dateiendung und die
+# Sprachvarianten für `WordEntry.get`. Die Reihenfolge entspricht der
+# Feldauswahl in ``extract-tex.pl`` (dort gewinnt das letzte belegte Feld,
+# die Versalform mit "ss" also vor der Form mit "ß")::
+
+rechtschreibungen = {
+    'trad':  ('dehypht-x',
+              'de-1901-x-GROSS,de-x-GROSS,de-1901,de'),
+    'refo':  ('dehyphn-x',
+              'de-1996-x-GROSS,de-x-GROSS,de-1996,de'),
+    'swiss': ('dehyphts-x',
+              'de-CH-1901,de-1901-x-GROSS,de-x-GROSS,de-1901,de'),
+    }
+
+modi = ('all', 'major', 'fugen', 'suffix')
+
+# Ausgabedatei für Rechtschreibung und Modus:
+#
+# >>> from extract_tex import ausgabedatei
+# >>> ausgabedatei('trad', 'all')
+# 'dehypht-x/words.hyphenated.trad'
+# >>> ausgabedatei('refo', 'fugen')
+# 'dehyphn-x-fugen/words.hyphenated.refo'
+#
+# ::
+
+def ausgabedatei(rechtschreibung, modus, outdir=''):
+    verzeichnis = rechtschreibungen[rechtschreibung][0]
+    if modus != 'all':
+        verzeichnis += '-' + modus
+    return os.path.join(outdir, verzeichnis,
+                        'words.hyphenated.' + rechtschreibung)
+
+
+# Extraktion (wie ``extract-tex.pl``)
+# ===================================
+#
+# Spezielle Trennungen und Doppeldeutigkeiten auflösen, Markierungen für
+# unerwünschte Trennungen entfernen:
+#
+# >>> from extract_tex import bereinige
+# >>> print bereinige(u'Be[t=t/{tt/tt=t}]uch')
+# Bettuch
+# >>> print bereinige(u'Zu{ck/k-k}er')
+# Zucker
+# >>> print bereinige(u'An-al.pha-bet')
+# An-alpha-bet
+#
+# ::
+
+spezial = re.compile(ur'\{(.*?)/.*?\}')
+doppeldeutig = re.compile(ur'\[(.*?)/.*?\]')
+marker = re.compile(ur'[-=<>·]')
+unerwuenscht = re.compile(ur'[·<>=-]*\.+[·<>=-]*')
+
+def bereinige(wort):
+    if u'{' not in wort and u'[' not in wort and u'.' not in wort:
+        return wort
+    wort = spezial.sub(ur'\1', wort)
+    wort = doppeldeutig.sub(lambda m: marker.sub(u'', m.group(1)), wort)
+    return unerwuenscht.sub(u'', wort)
+
+# Alle Trennstellen (``extract-tex.pl`` ohne ``-g``) werden zu "-":
+#
+# >>> from extract_tex import reduziere
+# >>> print reduziere(u'Mit<ver<ant-wort>lich>keit')
+# Mit-ver-ant-wort-lich-keit
+#
+# ::
+
+trennstellen = re.compile(ur'[·<>=-]+')
+
+def reduziere(wort):
+    return trennstellen.sub(u'-', wort)
+
+
+# Gewichtete Trennstellen
+# -----------------------
+#
+# Wichtung der Marker (siehe ``extract-tex.pl``):
+#
+#   -1   -
+#    0   --
+#    1   <, >
+#    2   =
+#    3   ==, <=, =>
+#    4   ===, <==, ==>
+#    ..
+#
+# Unbekannte Marker werden (mit Warnung) wie "-" behandelt::
+
+lange_fuge = re.compile(ur'==*>?|<?=*=')
+
+def wichtung(m, zeile=0):
+    if m == u'-':
+        return -1
+    if m == u'--':
+        return 0
+    if m in (u'<', u'>'):
+        return 1
+    if m == u'=':
+        return 2
+    match = lange_fuge.search(m)
+    if match:
+        return len(match.group()) + 1
+    print >> sys.stderr, (u'Zeile %d: unbekannter Marker »%s« behandelt '
+                          u'als »-«' % (zeile, m)).encode('utf8')
+    return -1
+
+# Nur die Trennstellen mit den `g` höchsten Wichtungsstufen behalten
+# (``extract-tex.pl -g N`` mit N > 0). Bei Ketten von "<" hat das am
+# weitesten links, bei Ketten von ">" das am weitesten rechts stehende
+# den höchsten Rang:
+#
+# >>> from extract_tex import gewichte
+# >>> print gewichte(u'Mit<ver<ant-wort>lich>keit', 1)
+# Mit<verantwortlich>keit
+# >>> print gewichte(u'Mit<ver<ant-wort>lich>keit', 2)
+# Mit<ver<antwort>lich>keit
+# >>> print gewichte(u'Ei-gen=wirt>schaft=>lich>keit', 1)
+# Eigenwirtschaftlich>keit
+#
+# ::
+
+zerleger = re.compile(ur'([<>=-]+)')
+
+def gewichte(wort, g, zeile=0):
+
+# Zerlegen unter Beibehaltung der Marker (ungerade Indizes). Wie bei
+# Perls `split` entfallen leere Felder am Ende::
+
+    teile = zerleger.split(wort)
+    while teile and not teile[-1]:
+        del teile[-1]
+    n = len(teile)
+    marker_indizes = range(1, n-1, 2)
+
+    w = [-2] * n
+    r = [0] * n
+    for i in marker_indizes:
+        w[i] = wichtung(teile[i], zeile)
+
+# Ketten von "<" (von rechts) und ">" (von links) übernehmen die höhere
+# Wichtung; ein "-" dazwischen unterbricht die Kette nicht::
+
+    for zeichen, indizes in ((u'<', marker_indizes[::-1]),
+                             (u'>', marker_indizes)):
+        vorher = -2
+        for i in indizes:
+            if zeichen in teile[i]:
+                if vorher >= w[i]:
+                    w[i] = vorher
+                else:
+                    vorher = w[i]
+            elif teile[i] != u'-':
+                vorher = -2
+
+# Rang in Ketten von "<" (von links) und ">" (von rechts)::
+
+    for zeichen, indizes in ((u'<', marker_indizes),
+                             (u'>', marker_indizes[::-1])):
+        rang = 0
+        for i in indizes:
+            if zeichen in teile[i]:
+                r[i] = rang
+                rang -= 1
+            elif teile[i] != u'-':
+                rang = 0
+
+# Marker nach absteigender Wichtung und Rang durchgehen und zu gering
+# gewichtete Trennstellen entfernen. Wortteile (gerade Indizes) stehen
+# (stabil sortiert) am Ende::
+
+    stufe = 0
+    vorher = (-2, 0)
+    for i in sorted(range(n), key=lambda i: (-w[i], -r[i])):
+        if not i % 2:
+            break
+        if (w[i], r[i]) != vorher:
+            stufe += 1
+        vorher = (w[i], r[i])
+        if stufe > g or w[i] < 0:
+            teile[i] = u''
+    return u''.join(teile)
+
+# Wort für die Modi mit Wichtungs-Schwellwert `g` (``-g N``). Wörter mit
+# ungewichteten Trennstellen "·" werden ignoriert (Rückgabewert None)::
+
+def gewichtet(wort, g, zeile=0):
+    if u'·' in wort:
+        return None
+    if g > 0:
+        return gewichte(wort, g, zeile)
+    return wort
+
+
+# Haupttrennstellen (wie `SEDMAJOR` im Makefile)
+# ==============================================
+#
+# major: "-" entfällt, alle anderen Kombinationen von "-<>=" werden zu "-".
+# Wörter ohne verbleibende Trennstelle werden entfernt (Rückgabewert None).
+#
+# fugen: Wortfugen "=" werden zu "-", alle anderen Marker entfallen.
+#
+# suffix: Suffixgrenzen ">" werden zu "-", alle anderen Marker entfallen.
+#
+# >>> from extract_tex import sedmajor
+# >>> print sedmajor['major'](u'Mit<ver<ant-wort>lich>keit')
+# Mit-ver-antwort-lich-keit
+# >>> print sedmajor['major'](u'Hau-se')
+# None
+# >>> print sedmajor['fugen'](u'Ei-gen=wirt>schaft=>lich>keit')
+# Eigen-wirtschaftlichkeit
+# >>> print sedmajor['suffix'](u'Ei-gen=wirt>schaft=>lich>keit')
+# Eigenwirt-schaft-lich-keit
+#
+# ::
+
+def sub(muster, ersatz):
+    muster = re.compile(muster)
+    return lambda wort: muster.sub(ersatz, wort)
+
+def sed(*befehle):
+    def bearbeite(wort):
+        for befehl in befehle:
+            wort = befehl(wort)
+            if wort is None:
+                break
+        return wort
+    return bearbeite
+
+sedmajor = {
+    'major': sed(sub(ur'---*', u'='),
+                 sub(ur'-', u''),
+                 sub(ur'[=<>][=<>]*', u'-'),
+                 lambda wort: wort if u'-' in wort else None),
+    'fugen': sed(sub(ur'--*', u''),
+                 sub(ur'<=*', u''),
+                 sub(ur'=*>', u''),
+                 sub(ur'[<>][<>]*', u''),
+                 sub(ur'[=][=]*', u'-')),
+    'suffix': sed(sub(ur'-', u''),
+                  sub(ur'[<=][<=]*', u''),
+                  sub(ur'[>][>]*', u'-')),
+    }
+
+# Der sed-Befehl ``/[=<>-]/!n`` gibt ein Wort ohne Marker unverändert aus,
+# liest aber die *nächste* Zeile ohne erneute Prüfung in den Arbeitsbereich
+# ein. Bei "major" wird deshalb von zwei aufeinanderfolgenden Wörtern ohne
+# Trennstelle das zweite gelöscht. Um die bisherigen Eingabelisten genau
+# zu reproduzieren, merkt sich `SedStrom` diesen Zustand pro Ausgabe.
+# Das Ergebnis der Ersetzungen wird (für alle Rechtschreibungen
+# gemeinsam) vorab berechnet und mit übergeben.
+#
+# Beim parallelen Einlesen ist der Zustand am Anfang eines Abschnitts
+# unbekannt (None): Wörter ohne Marker werden bis zum ersten Wort mit
+# Marker zurückgestellt und mit `anschliessen` nachgetragen, sobald der
+# Zustand am Ende des vorigen Abschnitts feststeht:
+#
+# >>> from extract_tex import SedStrom
+# >>> strom = SedStrom()
+# >>> [strom(wort, None, True) for wort in (u'Aal', u'Aar', u'Aas')]
+# [u'Aal', None, u'Aas']
+# >>> abschnitt = SedStrom(None)
+# >>> abschnitt(u'Ab', None, True), abschnitt(u'ab-bau', u'abbau', False)
+# (None, u'abbau')
+# >>> abschnitt.anschliessen(strom)
+# []
+#
+# ::
+
+class SedStrom(object):
+
+    def __init__(self, ungeprueft=False):
+        self.ungeprueft = ungeprueft
+        self.anfang = []
+
+    def __call__(self, wort, bearbeitet, ohne_marker):
+        if self.ungeprueft is None and ohne_marker:
+            self.anfang.append((wort, bearbeitet))
+            return None
+        if not self.ungeprueft and ohne_marker:
+            self.ungeprueft = True
+            return wort
+        self.ungeprueft = False
+        return bearbeitet
+
+    def anschliessen(self, vorher):
+        woerter = [vorher(wort, bearbeitet, True)
+                   for wort, bearbeitet in self.anfang]
+        if self.ungeprueft is None:
+            self.ungeprueft = vorher.ungeprueft
+        self.anfang = []
+        return [wort for wort in woerter if wort is not None]
+
+
+# Sortierung (wie ``LC_COLLATE=de_DE.ISO8859-15 sort -d | uniq -i``)
+# ==================================================================
+#
+# Primärschlüssel: nur Buchstaben und Ziffern, Kleinschreibung, ohne
+# Akzente, ß wie ss. Wörter, die sich nur in der Groß-/Kleinschreibung
+# unterscheiden, stehen nebeneinander (klein vor groß); nur das erste wird
+# ausgegeben. Die meisten Wörter kommen in mehreren Ausgaben vor, deshalb
+# wird die Rangfolge aller Wörter einmal vorab bestimmt (`rangfolge`):
+#
+# >>> from extract_tex import sortiere
+# >>> list(sortiere([u'Ab-bau', u'ab-bau', u'\xc4-ra', u'Aal', u'ab-bau']))
+# [u'Aal', u'ab-bau', u'\xc4-ra']
+#
+# ::
+
+nicht_alnum = re.compile(ur'[\W_]+', re.UNICODE)
+
+def sortkey(wort):
+    key = wort.lower()
+    primaer = nicht_alnum.sub(u'', key)
+    try:
+        primaer = primaer.encode('ascii')
+    except UnicodeEncodeError:
+        primaer = unicodedata.normalize('NFKD', primaer.replace(u'ß', u'ss'))
+        primaer = primaer.encode('ascii', 'ignore')
+    return u'%s\0%s\0%s' % (primaer, key, wort.swapcase())
+
+def ohne_doppelte(woerter):
+    vorher = None
+    for wort in woerter:
+        klein = wort.lower()
+        if klein != vorher:
+            yield wort
+        vorher = klein
+
+def sortiere(woerter):
+    return ohne_doppelte(sorted(set(woerter), key=sortkey))
+
+def rangfolge(woerter):
+    geordnet = sorted(woerter, key=sortkey)
+    return geordnet, dict(izip(geordnet, count()))
+
+
+# Einlesen
+# ========
+#
+# Ein Durchgang über die Wortliste: Für jede gewählte Rechtschreibung wird
+# das Feld mit `WordEntry.get` bestimmt und (einmal pro unterschiedlichem
+# Feldinhalt) bereinigt und gewichtet. Rückgabewert ist ein Dictionary
+# ``{(rechtschreibung, modus): set(woerter)}``, die Liste aller Wörter
+# in der Reihenfolge ihres ersten Auftretens (fast sortiert, weil die
+# Wortliste sortiert ist; das beschleunigt `rangfolge`) und die
+# `SedStrom`-Objekte der Modi major, fugen und suffix.
+#
+# `start` ist die Zeilennummer der ersten Zeile (für Warnungen); bei
+# ``start > 0`` ist der Zustand der Ströme anfangs unbekannt::
+
+def extract(lines, schreibungen=('trad', 'refo', 'swiss'), moden=modi,
+            g=0, start=0):
+    ausgaben = dict(((s, m), set()) for s in schreibungen for m in moden)
+    majormodi = [m for m in moden if m != 'all']
+    stroeme = dict(((s, m), SedStrom(None if start else False))
+                   for s in schreibungen for m in majormodi)
+    varianten = [(s, rechtschreibungen[s][1]) for s in schreibungen]
+    alle = 'all' in moden
+    woerter, bekannt = [], set()
+
+    for nr, line in enumerate(lines, start+1):
+        if line.startswith('#'):
+            continue
+        line = line.decode('utf8')
+        entry = WordEntry(u''.join(line.split(u'#')[0].split()))
+        if len(entry) < 2:
+            continue
+
+# Bei Einträgen mit nur einem Feld gilt es für alle Sprachvarianten::
+
+        allgemein = len(entry) == 2
+        cache = {}
+        for s, sprachvarianten in varianten:
+            if allgemein:
+                feld = entry[1]
+            else:
+                feld = entry.get(sprachvarianten)
+            if feld is None or feld == u'-2-':
+                continue
+            try:
+                wort, major, ohne_marker, bearbeitet = cache[feld]
+            except KeyError:
+                wort = bereinige(feld)
+                major = gewichtet(wort, g, nr) if majormodi else None
+                wort = reduziere(wort)
+                neue = alle and [wort] or []
+                if major is None:
+                    ohne_marker, bearbeitet = None, None
+                else:
+                    ohne_marker = not marker.search(major)
+                    bearbeitet = dict((m, sedmajor[m](major))
+                                      for m in majormodi)
+                    if ohne_marker:
+                        neue.append(major)
+                    neue.extend(bearbeitet.values())
+                cache[feld] = wort, major, ohne_marker, bearbeitet
+                for neu in neue:
+                    if neu is not None and neu not in bekannt:
+                        bekannt.add(neu)
+                        woerter.append(neu)
+            if alle:
+                ausgaben[(s, 'all')].add(wort)
+            if major is None:
+                continue
+            for m in majormodi:
+                wort_m = stroeme[(s, m)](major, bearbeitet[m], ohne_marker)
+                if wort_m is not None:
+                    ausgaben[(s, m)].add(wort_m)
+    return ausgaben, woerter, stroeme
+
+# Paralleles Einlesen in Abschnitten von `chunksize` Zeilen. Die
+# Teilergebnisse werden in der Reihenfolge der Abschnitte zusammengeführt.
+# Die Kindprozesse erben die Zeilen (`fork`), übergeben werden nur die
+# Grenzen::
+
+_zeilen = []
+
+def _extract(args):
+    start, ende, schreibungen, moden, g = args
+    return extract(_zeilen[start:ende], schreibungen, moden, g, start)
+
+def extract_parallel(lines, schreibungen=('trad', 'refo', 'swiss'),
+                     moden=modi, g=0, processes=None, chunksize=50000):
+    processes = processes or multiprocessing.cpu_count()
+    if processes < 2:
+        return extract(lines, schreibungen, moden, g)[:2]
+    _zeilen[:] = list(lines)
+    jobs = [(start, start+chunksize, schreibungen, moden, g)
+            for start in range(0, len(_zeilen), chunksize)]
+    pool = multiprocessing.Pool(processes)
+    ausgaben, woerter, bekannt, stroeme = None, [], set(), None
+    for teil, teilwoerter, teilstroeme in pool.imap(_extract, jobs):
+        if ausgaben is None:
+            ausgaben, stroeme = teil, teilstroeme
+        else:
+            for key, menge in teil.iteritems():
+                ausgaben[key].update(menge)
+            for key, strom in teilstroeme.iteritems():
+                ausgaben[key].update(strom.anschliessen(stroeme[key]))
+                stroeme[key] = strom
+        for wort in teilwoerter:
+            if wort not in bekannt:
+                bekannt.add(wort)
+                woerter.append(wort)
+    pool.close()
+    pool.join()
+    del _zeilen[:]
+    return ausgaben, woerter
+
+
+# Ausgabe
+# =======
+#
+# Wie Perls Ausgabeschicht schreibt der Fehlerbehandler Zeichen außerhalb
+# von latin-9 als ``\x{....}``::
+
+def perlqq(error):
+    zeichen = error.object[error.start:error.end]
+    return u''.join(u'\\x{%04x}' % ord(c) for c in zeichen), error.end
+
+codecs.register_error('perlqq', perlqq)
+
+# Sortieren und Schreiben einer Ausgabe: sortiert werden nur die Ränge
+# der Wörter. Beim parallelen Schreiben erben die Kindprozesse die
+# Wortmengen und die Rangfolge (`fork`), übergeben wird nur der
+# Schlüssel::
+
+_ausgaben = {}
+_geordnet = []
+_rang = {}
+
+def schreibe(key, outdir=''):
+    pfad = ausgabedatei(key[0], key[1], outdir)
+    if os.path.dirname(pfad) and not os.path.isdir(os.path.dirname(pfad)):
+        os.makedirs(os.path.dirname(pfad))
+    raenge = sorted(imap(_rang.__getitem__, _ausgaben[key]))
+    woerter = list(ohne_doppelte(_geordnet[i] for i in raenge))
+    with open(pfad, 'w') as datei:
+        datei.write(u''.join(wort + u'\n' for wort in woerter
+                            ).encode('iso-8859-15', 'perlqq'))
+    return pfad, len(woerter)
+
+def _schreibe(args):
+    return schreibe(*args)
+
+def write_outputs(ausgaben, woerter, outdir='', processes=None):
+    _ausgaben.clear()
+    _ausgaben.update(ausgaben)
+    geordnet, rang = rangfolge(woerter)
+    _geordnet[:] = geordnet
+    _rang.clear()
+    _rang.update(rang)
+    jobs = [(key, outdir) for key in sorted(ausgaben)]
+    processes = processes or multiprocessing.cpu_count()
+    if processes > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(min(processes, len(jobs)))
+        ergebnis = pool.map(_schreibe, jobs, chunksize=1)
+        pool.close()
+        pool.join()
+    else:
+        ergebnis = map(_schreibe, jobs)
+    _ausgaben.clear()
+    del _geordnet[:]
+    _rang.clear()
+    return ergebnis
+
+
+if __name__ == '__main__':
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-s', '--schreibungen',
+                      help=u'Komma-getrennte Liste der Rechtschreibungen, '
+                      u'Vorgabe "trad,refo,swiss"',
+                      default='trad,refo,swiss')
+    parser.add_option('-m', '--modi',
+                      help=u'Komma-getrennte Liste der Modi, '
+                      u'Vorgabe "all,major,fugen,suffix"',
+                      default=','.join(modi))
+    parser.add_option('-W', '--wichtung', type='int', default=0,
+                      help=u'Wichtungs-Schwellwert für major/fugen/suffix '
+                      u'(wie "make major W=N"), Vorgabe 0 (alle)')
+    parser.add_option('-d', '--outdir', default='',
+                      help=u'Basisverzeichnis der Ausgabe, '
+                      u'Vorgabe: aktuelles Verzeichnis')
+    parser.add_option('-j', '--jobs', type='int', default=None,
+                      help=u'Zahl der Prozesse, '
+                      u'Vorgabe: Zahl der Prozessoren')
+    parser.add_option('-v', '--verbose', action='store_true', default=False,
+                      help=u'Ausgabedateien und Wortzahlen anzeigen')
+    (options, args) = parser.parse_args()
+
+    schreibungen = options.schreibungen.split(',')
+    moden = options.modi.split(',')
+    for s in schreibungen:
+        if s not in rechtschreibungen:
+            parser.error(u'unbekannte Rechtschreibung "%s"' % s)
+    for m in moden:
+        if m not in modi:
+            parser.error(u'unbekannter Modus "%s"' % m)
+
+    if args:
+        lines = open(args[0])
+    else:
+        lines = sys.stdin
+
+    ausgaben, woerter = extract_parallel(lines, schreibungen, moden,
+                                         options.wichtung, options.jobs)
+    for pfad, n in write_outputs(ausgaben, woerter, options.outdir,
+                                 options.jobs):
+        if options.verbose:
+            print '%-40s %8d' % (pfad, n)
@@ -29,8 +29,9 @@ Bsp: python abgleich_neueintraege.py < dict-fail.txt > neu.todo
 
 import sys, os, codecs, optparse
 from collections import defaultdict  # Wörterbuch mit Default
-from wortliste import WordFile, WordEntry, join_word, toggle_case, sortkey_duden
-from expand_teilwoerter import expand_wordfile
+from wortliste import WordEntry, join_word, toggle_case, sortkey_duden
+from expand_teilwoerter import ExpansionCache
+from wortindex import WordIndex
 
 # Funktionen
 # -----------
@@ -649,6 +650,84 @@ endungen = [
             (u'=öl', u'=öle'),
            ]
 
+# Index der Präfixe und Endungen
+# ------------------------------
+#
+# Statt alle Präfixe und Endungen einzeln zu testen, werden die zu einem
+# Schlüssel passenden in einem Durchgang über einen Präfixbaum (Trie)
+# ermittelt. Für Endungen wird der Baum über die umgekehrten Zeichenketten
+# aufgebaut.
+#
+# `AffixTrie.matches` gibt die Indizes aller Zeichenketten zurück, mit
+# denen `key` beginnt (bzw. endet)::
+#
+# >>> from abgleich_neueintraege import AffixTrie
+# >>> trie = AffixTrie([u'ab', u'a', u'abo', u'b'])
+# >>> trie.matches(u'abort')
+# [0, 1, 2]
+# >>> AffixTrie([u'ne', u'en', u'e'], reverse=True).matches(u'Linne')
+# [0, 2]
+#
+# ::
+
+class AffixTrie(object):
+
+    def __init__(self, strings, reverse=False):
+        self.reverse = reverse
+        self.root = {}
+        for i, s in enumerate(strings):
+            if reverse:
+                s = s[::-1]
+            node = self.root
+            for char in s:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(i)
+
+    def matches(self, key):
+        if self.reverse:
+            key = reversed(key)
+        node = self.root
+        indices = list(node.get(None, []))
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            indices.extend(node.get(None, []))
+        indices.sort()
+        return indices
+
+# Präfixe werden bei großgeschriebenen Schlüsseln ebenfalls
+# großgeschrieben (siehe `praefixabgleich`)::
+
+endungsindex = AffixTrie([join_word(neu) for alt, neu in endungen],
+                         reverse=True)
+praefixindex = AffixTrie([join_word(praefix) for praefix in praefixe])
+praefixindex_title = AffixTrie([join_word(praefix.title())
+                                for praefix in praefixe])
+
+# Gib die zu `key` passenden Paare aus `endungen` bzw. Präfixe aus
+# `praefixe` in der Reihenfolge der Listen zurück::
+#
+# >>> from abgleich_neueintraege import passende_endungen, passende_praefixe
+# >>> (u'z', u'-zen') in passende_endungen(u'Spitzen')
+# True
+# >>> passende_praefixe(u'abzugeben')
+# [u'ab<zu', u'ab']
+# >>> passende_praefixe(u'Abbau')
+# [u'ab']
+#
+# ::
+
+def passende_endungen(key):
+    return [endungen[i] for i in endungsindex.matches(key)]
+
+def passende_praefixe(key):
+    if key.istitle():
+        index = praefixindex_title
+    else:
+        index = praefixindex
+    return [praefixe[i] for i in index.matches(key)]
+
 # Zerlege einen String mit von vorn bis hinten wandernder Bruchstelle::
 #
 # >>> from abgleich_neueintraege import zerlege
@@ -673,6 +752,29 @@ def zerlege(s):
 def split_composits(entry):
     return [w for w in entry[1].split(u'=') if w]
 
+# Finde die Bruchstellen, an denen beide Teile in der Wortliste vorhanden
+# sind (Schlüssel der Einträge). Die meisten Bruchstellen werden über die
+# Menge der kleingeschriebenen Schlüssel (`folded`) verworfen, ohne Einträge
+# zu erzeugen oder die Groß-/Kleinschreibung zu prüfen::
+
+def teilungen(key, grossklein=False):
+    for k1, k2 in zerlege(key):
+        if k1.lower() not in folded:
+            continue
+        if grossklein:
+            k1 = toggle_case(k1)
+        if k1 not in words:
+            continue
+        if k1.istitle():
+            k2 = k2.title()
+        if k2.lower() not in folded:
+            continue
+        if k2 not in words:
+            k2 = toggle_case(k2)
+            if k2 not in words:
+                continue
+        yield k1, k2
+
 # Zerlege String, wenn die Teile in der Wortliste vorhanden sind, setze
 # sie neu zusammen und übernimm die Trennmarkierer:
 
@@ -680,50 +782,43 @@ def split_composits(entry):
 def trenne_key(key, grossklein = False):
     entries = []
     sep = u'='
-    for k1, k2 in zerlege(key):
-        if grossklein:
-            k1 = toggle_case(k1)
-        if k1.istitle():
-            k2 = k2.title()
-        e1 = words.get(k1)
-        e2 = words.get(k2)
-        if not e2:
-            e2 = words.get(toggle_case(k2))
-        if e1 and e2:
-            if len(e1) != len(e2):
-                if len(e1) == 2:
-                    e1 = [e1[1]] * len(e2)
-                elif len(e2) == 2:
-                    e2 = [e2[1]] * len(e1)
-                else:
-                    continue
-            entry = WordEntry(key)
-            for w1, w2 in zip(e1,e2)[1:]:
-                if w1.startswith(u'-'): # empty column -2-, -3-, ...
-                    wort = w1
-                elif w2.startswith(u'-'):
-                    wort = w2
-                else:
-                    if grossklein:
-                        w1 = toggle_case(w1)
-                    w2 = w2.lower()
-                    level = 1
-                    while (level*sep in w1) or (level*sep in w2):
-                        level += 1
-                    wort = (level*sep).join([w1, w2])
-                entry.append(wort)
-            entry.conflate_fields()
-            entries.append(entry)
-            # Teste auf 3-teilige Composita und entferne die Wichtung:
-            # ['Kau==zahn=weh', 'Kau=zahn=weh'] -> ['Kau=zahn=weh']
-            if len(entries) == 2:
-                teile = [split_composits(entry) for entry in entries]
-                if teile[0] == teile[1]:
-                    level = 1
-                    while level*sep in teile[0]:
-                        level += 1
-                    entries = [entries[0]]
-                    entries[0][1] = entries[0][1].replace((level+1)*sep, level*sep)
+    for k1, k2 in teilungen(key, grossklein):
+        e1 = words[k1]
+        e2 = words[k2]
+        if len(e1) != len(e2):
+            if len(e1) == 2:
+                e1 = [e1[1]] * len(e2)
+            elif len(e2) == 2:
+                e2 = [e2[1]] * len(e1)
+            else:
+                continue
+        entry = WordEntry(key)
+        for w1, w2 in zip(e1,e2)[1:]:
+            if w1.startswith(u'-'): # empty column -2-, -3-, ...
+                wort = w1
+            elif w2.startswith(u'-'):
+                wort = w2
+            else:
+                if grossklein:
+                    w1 = toggle_case(w1)
+                w2 = w2.lower()
+                level = 1
+                while (level*sep in w1) or (level*sep in w2):
+                    level += 1
+                wort = (level*sep).join([w1, w2])
+            entry.append(wort)
+        entry.conflate_fields()
+        entries.append(entry)
+        # Teste auf 3-teilige Composita und entferne die Wichtung:
+        # ['Kau==zahn=weh', 'Kau=zahn=weh'] -> ['Kau=zahn=weh']
+        if len(entries) == 2:
+            teile = [split_composits(entry) for entry in entries]
+            if teile[0] == teile[1]:
+                level = 1
+                while level*sep in teile[0]:
+                    level += 1
+                entries = [entries[0]]
+                entries[0][1] = entries[0][1].replace((level+1)*sep, level*sep)
     return entries
 
 def filter_neuliste(liste, words):
@@ -816,13 +911,11 @@ if __name__ == '__main__':
 
     # sys.stdout mit UTF8 encoding.
     sys.stdout = codecs.getwriter('UTF-8')(sys.stdout)
-    
-    wordfile = WordFile(options.wortliste)
 
 # Filtern::
 
     if options.filter:
-        words = wordfile.asdict()
+        words = WordIndex(options.wortliste)
         for line in filter_neuliste(sys.stdin, words):
             print line
         sys.exit()
@@ -834,20 +927,12 @@ if __name__ == '__main__':
 
 # `Wortliste` einlesen
 
-# Wörter, Teilwörter und Kombinationen (siehe expand_teilwoerter.py)
-# entweder vom "cache", oder "live" expandiert::
+# Wörter, Teilwörter und Kombinationen (siehe expand_teilwoerter.py),
+# nach Änderungen der Wortliste werden nur die geänderten Einträge neu
+# expandiert::
 
-    cache = "wortliste-expandiert"
-    try:
-        cache_mtime = os.path.getmtime(cache)
-    except OSError:
-        cache_mtime = 0
+    words = ExpansionCache(options.wortliste).update()
 
-    if os.path.getmtime(options.wortliste) <= cache_mtime:
-        words = WordFile(cache).asdict()
-    else:
-        words = expand_wordfile(wordfile)
-    
 # Aussortieren von Wörtern, die zu "false positives" führen::
 
     # Wörter, die oft als Endungen auftauchen:
@@ -857,6 +942,9 @@ if __name__ == '__main__':
     for unwort in [u'Em', u'Gen']:
         words.pop(unwort, None)
 
+    # kleingeschriebene Schlüssel (siehe `teilungen`)
+    folded = set(key.lower() for key in words)
+
 # Erstellen der neuen Einträge::
 
     neue = []
@@ -893,7 +981,7 @@ if __name__ == '__main__':
 
 # Endungsabgleich::
 
-        for alt, neu in endungen:
+        for alt, neu in passende_endungen(key):
             entry = endungsabgleich(key, alt, neu, grossklein=False)
             if entry:
                 entry.comment = newentry.comment
@@ -903,7 +991,7 @@ if __name__ == '__main__':
         if OK:
             continue
 
-        for alt, neu in endungen:
+        for alt, neu in passende_endungen(key):
             entry = endungsabgleich(key, alt, neu, grossklein=True)
             if entry:
                 entry.comment = newentry.comment
@@ -915,7 +1003,7 @@ if __name__ == '__main__':
 
 # Präfixabgleich::
 
-        for praefix in praefixe:
+        for praefix in passende_praefixe(key):
             entry = praefixabgleich(key, praefix, grossklein=False)
             if entry:
                 entry.comment = newentry.comment
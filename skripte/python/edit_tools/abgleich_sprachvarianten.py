@@ -20,6 +20,7 @@
 
 import re, sys, codecs, copy
 from wortliste import WordFile, WordEntry, join_word, udiff, sprachabgleich
+from wortindex import WordIndex
 
 
 # Zusammenfassen von Feldern mit gleichem Inhalt z.B.
@@ -52,16 +53,14 @@ if __name__ == '__main__':
     wortliste = list(wordfile)
     wortliste_neu = []
 
-    wordfile.seek(0)            # Pointer zurücksetzen
-    words = wordfile.asdict()
+    # Nachschlagen über den Index (siehe wortindex.py):
+    words = WordIndex('../../../wortliste')
 
     for oldentry in wortliste:
         if len(oldentry) <= 2:
             # Ggf. Ergänzen der GROSS-Variante:
             if (u'ß' in oldentry[0]
-                and oldentry[0].replace(u'ß', u'ss') not in words
-                and oldentry[0].replace(u'ß', u'ss').lower() not in words
-                and oldentry[0].replace(u'ß', u'ss').title() not in words
+                and words.lookup(oldentry[0].replace(u'ß', u'ss')) is None
                ):
                 entry = WordEntry(oldentry[0].replace(u'ß', u'ss')
                                   + u';-2-;-3-;-4-;'
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+# benchmark.py: Messungen zu den Werkzeugen für die Wortliste
+# ===========================================================
+
+u"""Zeit- und Speicherbedarf beim Einlesen der Wortliste.
+
+Aufruf: python benchmark.py [Optionen] [Wortliste]
+
+Vergleicht (jeweils in einem eigenen Prozess):
+
+  dict     `WordEntry` mit `__dict__` pro Instanz (bisherige Klasse),
+  slots    `WordEntry` mit `__slots__`,
+  table    `WordTable` (spaltenweise Speicherung, Einlesen ohne
+           `WordEntry`-Instanzen).
+
+Angezeigt werden Ladezeit und Zuwachs des residenten Speichers.
+
+Mit --udiff werden stattdessen die Laufzeiten von `udiff` und
+`keyed_udiff` nach zufälligen Änderungen der Wortliste verglichen.
+
+Mit --validate werden die Laufzeiten des Syntax-Tests mit
+``skripte/validate.lua`` (falls `texlua` installiert ist) und `validate.py`
+(ein Prozess, parallel, mit Zwischenspeicher nach Änderung einer Zeile)
+verglichen.
+"""
+
+import sys, os, time, optparse, random, shutil, subprocess, tempfile
+import multiprocessing
+
+from wortliste import (WordFile, WordEntry, WordTable,
+                       udiff, keyed_udiff, sortkey_duden)
+import validate
+
+# Pfad zu "../../../wortliste" unabhängig vom Arbeitsverzeichnis::
+
+default_wortliste = os.path.relpath(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))),
+    'wortliste'))
+
+# Hilfsfunktionen
+# ---------------
+
+# Residenter Speicher des aktuellen Prozesses in kB::
+
+def rss():
+    try:
+        for line in open('/proc/self/status'):
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    except IOError:
+        import resource # nur Maximalwert verfügbar
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Einträge mit `__dict__` pro Instanz (Initialisierung wie `WordEntry` vor
+# der Umstellung auf `__slots__`, ohne die übrigen Methoden)::
+
+class DictEntry(list):
+
+    comment = u''
+
+    def __init__(self, line, delimiter=';'):
+        self.delimiter = delimiter
+        if '#' in line:
+            line = line.split(u'#')
+            self.comment = u'#'.join(line[1:])
+            line = line[0].rstrip()
+        list.__init__(self, line.split(delimiter))
+
+def load_dict(path):
+    return [DictEntry(line.rstrip().decode('utf8')) for line in open(path)]
+
+def load_slots(path):
+    return [WordEntry(line.rstrip().decode('utf8')) for line in open(path)]
+
+def load_table(path):
+    return WordTable.fromfile(path)
+
+loaders = {'dict': load_dict,
+           'slots': load_slots,
+           'table': load_table,
+          }
+
+# Messung (im Kindprozess)::
+
+def measure(loader, path, queue):
+    mem = rss()
+    start = time.time()
+    entries = loaders[loader](path)
+    load_time = time.time() - start
+    queue.put((len(entries), load_time, rss() - mem))
+
+def run_benchmark(loader, path):
+    """Lies `path` mit `loader` in einem eigenen Prozess. Gib ein Tupel
+    (Zahl der Einträge, Ladezeit, RSS-Zuwachs in kB) zurück."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure,
+                                      args=(loader, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+# Laufzeitvergleich `udiff`/`keyed_udiff`: `n` zufällige Einträge werden
+# geändert, entfernt oder (als Kopie mit geändertem Schlüssel) eingefügt.
+# Die neue Liste wird wieder sortiert::
+
+def edit(wortliste, n, seed=1):
+    random.seed(seed)
+    neu = list(wortliste)
+    for k in range(n):
+        i = random.randrange(len(neu))
+        action = k % 3
+        if action == 0:   # Trennstelle ändern
+            entry = WordEntry(unicode(neu[i]))
+            entry[-1] = entry[-1].replace(u'-', u'·', 1)
+            neu[i] = entry
+        elif action == 1: # Eintrag entfernen
+            del neu[i]
+        else:             # Eintrag hinzufügen
+            entry = WordEntry(unicode(neu[i]))
+            entry[0] += u'x'
+            neu.append(entry)
+    neu.sort(key=sortkey_duden)
+    return neu
+
+def compare_udiff(path, edits=(0, 10, 100, 1000)):
+    wortliste = list(WordFile(path))
+    print '%-10s %10s %12s %8s' % ('Änderungen', 'udiff/s', 'keyed/s',
+                                   'gleich')
+    for n in edits:
+        neu = edit(wortliste, n)
+        start = time.time()
+        patch = udiff(wortliste, neu)
+        t_udiff = time.time() - start
+        start = time.time()
+        keyed_patch = keyed_udiff(wortliste, neu)
+        t_keyed = time.time() - start
+        print '%-10d %10.2f %12.2f %8s' % (n, t_udiff, t_keyed,
+                                           patch == keyed_patch)
+
+# Laufzeitvergleich der Syntax-Tests. `validate.lua` wird im Verzeichnis
+# ``skripte`` aufgerufen (dort findet es die Lua-Module und die
+# Ausnahmeliste)::
+
+skripte = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+def run_lua_validate(path):
+    start = time.time()
+    try:
+        process = subprocess.Popen(['texlua', 'validate.lua'], cwd=skripte,
+                                   stdin=open(path), stdout=subprocess.PIPE,
+                                   stderr=open(os.devnull, 'w'))
+    except OSError:
+        return None, None
+    output = process.communicate()[0]
+    invalid = [line.split('\t')[-1].strip() for line in output.split('\n')
+               if line.startswith('ungültig')]
+    return time.time() - start, invalid and int(invalid[0])
+
+def run_validate(lines, exceptions, cachefile=None, processes=None):
+    start = time.time()
+    cache = validate.ResultCache(cachefile)
+    info = validate.validate_file(lines, exceptions, cache, processes,
+                                  err=open(os.devnull, 'w'))
+    cache.save()
+    return time.time() - start, info['cnt_invalid']
+
+def compare_validate(path):
+    fname_ex, exceptions = validate.read_exceptions()
+    lines = open(path).read().split('\n')
+    if lines[-1] == '':
+        del lines[-1]
+    tmpdir = tempfile.mkdtemp()
+    cachefile = os.path.join(tmpdir, 'validate-cache')
+    print '%-26s %10s %10s' % ('Variante', 'Zeit/s', 'ungültig')
+    t, invalid = run_lua_validate(path)
+    if t is None:
+        print '%-26s %10s' % ('texlua validate.lua', '(texlua fehlt)')
+    else:
+        print '%-26s %10.2f %10s' % ('texlua validate.lua', t, invalid)
+    for name, args in (('validate.py -j 1', (None, 1)),
+                       ('validate.py (%d Prozesse)'
+                        % multiprocessing.cpu_count(), (None, None)),
+                       ('validate.py (Aufbau Cache)', (cachefile, None))):
+        t, invalid = run_validate(lines, exceptions, *args)
+        print '%-26s %10.2f %10d' % (name, t, invalid)
+    lines[len(lines)//2] += 'x' # eine geänderte Zeile
+    t, invalid = run_validate(lines, exceptions, cachefile)
+    print '%-26s %10.2f %10d' % ('validate.py (mit Cache)', t, invalid)
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+
+    usage = u'%prog [Optionen] [Wortliste]\n\n' + __doc__
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-l', '--loaders',
+                      help='Komma-getrennte Liste der Varianten, '
+                      'Vorgabe "dict,slots,table"',
+                      default='dict,slots,table')
+    parser.add_option('-u', '--udiff', action='store_true', default=False,
+                      help='Laufzeitvergleich udiff/keyed_udiff')
+    parser.add_option('-v', '--validate', action='store_true',
+                      default=False,
+                      help='Laufzeitvergleich validate.lua/validate.py')
+    (options, args) = parser.parse_args()
+
+    path = args and args[0] or default_wortliste
+
+    if options.udiff:
+        compare_udiff(path)
+    if options.validate:
+        if options.udiff:
+            print
+        compare_validate(path)
+    if options.udiff or options.validate:
+        sys.exit()
+
+    print 'Wortliste:', path
+    print
+    print '%-8s %10s %10s %12s %10s' % ('Variante', 'Zeilen', 'Laden/s',
+                                       'RSS/kB', 'Bytes/Zeile')
+    for loader in options.loaders.split(','):
+        n, load_time, mem = run_benchmark(loader, path)
+        print '%-8s %10d %10.2f %12d %10.0f' % (loader, n, load_time, mem,
+                                               1024.0 * mem / (n or 1))
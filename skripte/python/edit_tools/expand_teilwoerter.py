@@ -15,8 +15,8 @@
 #
 # ::
 
-import os, re, sys, codecs, copy
-from wortliste import (WordFile, WordEntry, join_word,
+import os, re, sys, codecs, copy, marshal
+from wortliste import (WordFile, WordEntry, join_word, out_of_order,
                       sprachabgleich, toggle_case, sortkey_duden)
 
 
@@ -197,6 +197,245 @@ def expand_wordfile(wordfile):
 
     return words
 
+# Zwischenspeicher
+# ----------------
+#
+# Das Zerlegen aller Einträge mit `split_entry` dauert einige Minuten. Die
+# Klasse `ExpansionCache` speichert die Zerlegungen jeder Zeile der
+# Wortliste und das Ergebnis von `expand_wordfile` in einer Binärdatei
+# (`marshal`). Nach Änderungen der Wortliste werden nur die neuen Zeilen
+# zerlegt und die Einträge der betroffenen Schlüssel neu bestimmt.
+#
+# Die Auswahl in `expand_wordfile` hängt nur von Einträgen mit gleichem
+# kleingeschriebenem Schlüssel ab (Test auf ``key.lower()`` und
+# ``key.title()``). Für jeden kleingeschriebenen Schlüssel wird deshalb
+# gespeichert, welche Zeilen Teilwörter mit diesem Schlüssel ergeben.
+#
+# >>> import tempfile, shutil
+# >>> tmpdir = tempfile.mkdtemp()
+# >>> wortliste = os.path.join(tmpdir, 'wortliste')
+# >>> open(wortliste, 'w').write('Aalbestand;Aal=be<stand\n'
+# ...                            'Bestand;Be<stand # Test\n')
+# >>> cache = ExpansionCache(wortliste, os.path.join(tmpdir, 'cache'))
+# >>> words = cache.update()
+# >>> sorted(words.keys())
+# [u'Aal', u'Aalbestand', u'Bestand']
+# >>> print words[u'Bestand']
+# Bestand;Be<stand # Test
+#
+# >>> open(wortliste, 'a').write('Aalfang;Aal=fang\n')
+# >>> words = ExpansionCache(wortliste, os.path.join(tmpdir, 'cache')).update()
+# >>> sorted(words.keys())
+# [u'Aal', u'Aalbestand', u'Aalfang', u'Bestand', u'Fang']
+# >>> shutil.rmtree(tmpdir)
+#
+# Version des Dateiformats, bei Änderungen erhöhen::
+
+cache_format = '1'
+
+# Dictionary mit Einträgen der erweiterten Wortliste. Die Einträge werden
+# als Zeilen gespeichert und erst beim Zugriff in `WordEntry`-Instanzen
+# gewandelt::
+
+class ExpandedWords(dict):
+
+    def __getitem__(self, key):
+        return WordEntry(dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        line = dict.get(self, key)
+        if line is None:
+            return default
+        return WordEntry(line)
+
+    def pop(self, key, *default):
+        line = dict.pop(self, key, None)
+        if line is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return WordEntry(line)
+
+    def itervalues(self):
+        for line in dict.itervalues(self):
+            yield WordEntry(line)
+
+    def values(self):
+        return list(self.itervalues())
+
+    def iteritems(self):
+        for key, line in dict.iteritems(self):
+            yield key, WordEntry(line)
+
+    def items(self):
+        return list(self.iteritems())
+
+# Schlüssel einer Zeile (ohne `WordEntry` zu erzeugen)::
+
+def _key(line):
+    key = line.split(u';', 1)[0]
+    if u'#' in key:
+        key = key.split(u'#')[0].rstrip()
+    return key
+
+class ExpansionCache(object):
+
+    def __init__(self, wortliste, path='wortliste-expandiert.cache'):
+        self.wortliste = wortliste
+        self.path = path
+        self.stamp = None
+        self.expansions = [] # Nummer -> (Zeile, einzeln, Teilwort-Zeilen)
+        self.groups = {}     # kleingeschriebener Schlüssel ->
+                             # [(Nummer, Index des Teilworts), ...]
+        self.position = {}   # Nummer -> Zeilennummer(n)
+        self.words = ExpandedWords()
+        self.load()
+
+    def load(self):
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = marshal.load(f)
+            finally:
+                f.close()
+            if data[0] != cache_format:
+                return
+            (self.stamp, self.expansions, self.groups, self.position,
+             words) = data[1:]
+            self.words = ExpandedWords(words)
+        except (IOError, EOFError, ValueError, TypeError):
+            pass
+
+    def save(self):
+        # in temporäre Datei schreiben und umbenennen (atomar unter POSIX)
+        tmpfile = '%s.%d' % (self.path, os.getpid())
+        f = open(tmpfile, 'wb')
+        try:
+            marshal.dump((cache_format, self.stamp, self.expansions,
+                          self.groups, self.position, dict(self.words)),
+                         f, 2)
+        finally:
+            f.close()
+        os.rename(tmpfile, self.path)
+
+# Zerlege eine neue Zeile, gib ihre Nummer zurück::
+
+    def add(self, line):
+        entry = WordEntry(line)
+        try:
+            entries = split_entry(entry)
+        except IndexError:  # unterschiedliche Zerlegung je nach Sprache
+            entries = [entry]
+        i = len(self.expansions)
+        self.expansions.append((line, len(entries) == 1,
+                                [unicode(e) for e in entries]))
+        for k, e in enumerate(entries):
+            self.groups.setdefault(e[0].lower(), []).append((i, k))
+        return i
+
+# Bestimme die Einträge mit kleingeschriebenem Schlüssel `fold` neu (wie
+# in `expand_wordfile`). `position` bildet die Nummer einer Zeile auf ihre
+# Zeilennummer ab (eine Liste bei mehrfach vorkommenden Zeilen)::
+
+    def assemble(self, fold, position):
+        group = self.groups.get(fold, [])
+        for i, k in group:
+            self.words.pop(_key(self.expansions[i][2][k]), None)
+        group = [(i, k) for (i, k) in group if i in position]
+        order = []
+        for i, k in group:
+            n = position[i]
+            if isinstance(n, list): # mehrfach vorkommende Zeile
+                order.extend((m, i, k) for m in n)
+            else:
+                order.append((n, i, k))
+        order.sort()
+        for n, i, k in order:
+            line, single, parts = self.expansions[i]
+            part = parts[k]
+            key = _key(part)
+            if (single
+                or (key.lower() not in self.words
+                    and key.title() not in self.words)
+                or len(key) <= 3 and part.split(u'#')[0].count(u';') == 1
+               ):
+                dict.__setitem__(self.words, key, part)
+        if group:
+            self.groups[fold] = group
+        else:
+            self.groups.pop(fold, None)
+
+# Aktualisiere den Zwischenspeicher, gib die erweiterte Wortliste zurück.
+#
+# Neu bestimmt werden die Schlüssel der Teilwörter von neuen und
+# entfernten Zeilen sowie von Zeilen, deren Reihenfolge gegenüber dem
+# letzten Stand vertauscht ist oder die nun seltener vorkommen::
+
+    def update(self):
+        stat = os.stat(self.wortliste)
+        stamp = (stat.st_mtime, stat.st_size)
+        if stamp == self.stamp:
+            return self.words
+        numbers = dict((expansion[0], i)
+                       for i, expansion in enumerate(self.expansions)
+                       if expansion is not None)
+        old_position = self.position
+        position = {}
+        changed = set()
+        kept = [] # (alte Zeilennummer, Nummer) unveränderter Zeilen
+        wordfile = WordFile(self.wortliste)
+        for n, entry in enumerate(wordfile.scan()):
+            i = numbers.get(entry.line)
+            if i is None:
+                i = numbers[entry.line] = self.add(entry.line)
+            # Zeilennummer im letzten Stand
+            old = old_position.get(i)
+            if i not in position:
+                position[i] = n
+                if isinstance(old, list):
+                    old = old[0]
+            else:
+                if not isinstance(position[i], list):
+                    position[i] = [position[i]]
+                k = len(position[i])
+                position[i].append(n)
+                if isinstance(old, list) and k < len(old):
+                    old = old[k]
+                else:
+                    old = None
+            if old is None:
+                changed.add(i)
+            else:
+                kept.append((old, i))
+        wordfile.close()
+        if any(a > b for (a, i), (b, j) in zip(kept, kept[1:])):
+            changed.update(kept[j][1] for j in out_of_order(kept))
+        for i, old in old_position.iteritems():
+            if i not in position:
+                changed.add(i) # entfernt
+            elif isinstance(old, list) and (
+                not isinstance(position[i], list)
+                or len(position[i]) < len(old)):
+                changed.add(i)
+
+        folds = set()
+        for i in changed:
+            folds.update(_key(line).lower() for line in self.expansions[i][2])
+        for fold in folds:
+            self.assemble(fold, position)
+        for i in changed:
+            if i not in position:
+                self.expansions[i] = None
+
+        self.stamp = stamp
+        self.position = position
+        try:
+            self.save()
+        except (IOError, OSError):
+            pass
+        return self.words
+
+
 def exists(wort):
     key = join_word(wort)
     return (key.title() in words) or (key.lower() in words) or (len(wort)<4)
@@ -239,9 +478,10 @@ if __name__ == '__main__':
     #
     # sys.exit()
 
-# expandieren und Speichern::
+# expandieren (nur geänderte Einträge, siehe `ExpansionCache`) und
+# Speichern::
 
-    words = expand_wordfile(wordfile)
+    words = ExpansionCache(wordfile.name).update()
 
     print len(words), "expandiert"
 
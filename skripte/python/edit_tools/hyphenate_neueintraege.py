@@ -53,48 +53,20 @@ sys.path.insert(0,
 from wortliste import WordFile, WordEntry, join_word, toggle_case, sortkey_duden
 from abgleich_neueintraege import print_proposal
 import patuse
-from patuse.hyphenation import Hyphenator
+from patuse.hyphenation import MultiHyphenator
 
-# Trenne mit Hyphenator::
+# Trenne mit Hyphenator:
+#
+# Ein `MultiHyphenator` mit den Pattern-Dateien für alle Trennstellen,
+# Wortfugen, Suffixe und Morphemgrenzen ermittelt alle Trennstellen in einem
+# Durchgang. Jede Trennstelle erhält die Markierung der ersten weiteren
+# Pattern-Datei, die sie ebenfalls erlaubt (sonst "-")::
+
+marken = u'-=><' # alle, Wortfugen, Suffixe, Morphemgrenzen
 
 def trenne(entry):
     key = entry[0]
-    parts_fugen = h_fugen.split_word(key)
-    parts_major = h_major.split_word(key)
-    parts_suffix = h_suffix.split_word(key)
-    parts_all = h_all.split_word(key)
-
-    parts = [] # Liste von Silben und Trennzeichen, wird am Ende zusammengefügt.
-    p_major = '' # zum Vergleich mit parts_major
-    p_fugen = ''
-    p_suffix = ''
-    # Kategorisierung der Trennstellen
-    for part_all in parts_all[:-1]:
-        parts.append(part_all)
-        p_major += part_all
-        p_fugen += part_all
-        p_suffix += part_all
-        if p_fugen == parts_fugen[0]:
-            parts_fugen.pop(0)
-            p_fugen = ''
-            parts.append(u'=')
-        elif p_suffix == parts_suffix[0]:
-            parts_suffix.pop(0)
-            p_suffix = ''
-            parts.append(u'>')
-        elif p_major == parts_major[0]:
-            parts_major.pop(0)
-            p_major = ''
-            parts.append(u'<')
-        else:
-            parts.append(u'-')
-    parts.append(parts_all[-1])
-    word = u''.join(parts)
-
-    # Alternative Kategorisierung über Zerlegung der Teilwörter/Wortteile:
-    # word = u'='.join([u'<'.join([h_all.hyphenate_word(part, '-')
-    #                              for part in h_major.split_word(teilwort)])
-    #                   for teilwort in h_fugen.split_word(key)])
+    word = hyphenator.hyphenate_categorized(key, marken)
     newentry = WordEntry(key + u';' + word)
     newentry.comment = entry.comment
     return newentry
@@ -135,18 +107,20 @@ if __name__ == '__main__':
     parser.add_option('--patterns_suffix',
                       help='Pattern-Datei (Trennstellen vor Suffixen), '
                       'Vorgabe "%s"'%p_suffix, default=p_suffix)
+    parser.add_option('--no-cache', dest='cache', action="store_false",
+                      default=True, help='Trennmuster nicht aus dem Cache '
+                      'laden (siehe patuse/pattern_cache.py).')
     (options, args) = parser.parse_args()
 
     # sys.stdout mit UTF8 encoding.
     sys.stdout = codecs.getwriter('UTF-8')(sys.stdout)
 
-# Trenner-Instanzen::
+# Trenner-Instanz (Reihenfolge wie in `marken`)::
 
-    h_all = Hyphenator(options.patterns)
-    h_major = Hyphenator(options.patterns_major)
-    h_fugen = Hyphenator(options.patterns_fugen)
-    h_suffix = Hyphenator(options.patterns_suffix)
-    
+    hyphenator = MultiHyphenator([options.patterns, options.patterns_fugen,
+                                  options.patterns_suffix,
+                                  options.patterns_major],
+                                 cache=options.cache)
 
 
 # Erstellen der neuen Einträge::
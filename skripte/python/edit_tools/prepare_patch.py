@@ -23,18 +23,30 @@ AKTION ist eine von:
   neu:            Einträge hinzufügen,
   reformschreibung: Eintrag in "nur Reformschreibung" ändern.
   zusammenfassen: Sprachvarianten zusammenfassen wenn gleich.
+
+Mehrere Aktionen (AKTION oder AKTION:DATEI) werden nacheinander in einem
+Durchgang über die (sortierte) Wortliste ausgeführt und ergeben einen
+gemeinsamen Patch, z.B. ``prepare_patch.py korrektur fehleintraege:fe.todo``.
 """
 
 # Die ``<AKTION>.todo`` Dateien in diesem Verzeichnis beschreiben das
 # jeweils erforderliche Datenformat im Dateikopf.
 #
+# Jede Aktion liest ihre Korrekturdatei und gibt eine Generatorfunktion
+# ("Stufe") zurück, die aus einem Iterator über die Einträge der sortierten
+# Wortliste die Einträge der korrigierten Liste erzeugt. Mehrere Stufen
+# werden hintereinandergeschaltet (siehe `apply_stages`), die Wortliste
+# wird nur einmal durchlaufen. Unveränderte Einträge werden als dasselbe
+# Objekt weitergegeben.
+#
 # ::
 
 import optparse, sys, os, codecs
-from copy import copy, deepcopy
+from copy import copy
 
 
-from wortliste import WordFile, WordEntry, join_word, udiff, sortkey_duden
+from wortliste import (WordFile, WordEntry, join_word, keyed_udiff,
+                       sortkey_duden, variante)
 
 def teste_datei(datei):
     """Teste, ob Datei geöffnet werden kann."""
@@ -67,7 +79,7 @@ sprachvariante = 'de-1901'         # "traditionell"
 #
 # ::
 
-def korrektur(wordfile, datei):
+def korrektur(datei):
     """Patch aus korrigierten Einträgen"""
 
     if not datei:
@@ -91,26 +103,24 @@ def korrektur(wordfile, datei):
             
         korrekturen[key] = entry
 
-    wortliste = list(wordfile)
-    wortliste_neu = [] # korrigierte Liste
-
-    for entry in wortliste:
-        key = entry[0]
-        if key in korrekturen:
-            entry = korrekturen.pop(key)
-        wortliste_neu.append(entry)
+    def stufe(wortliste):
+        for entry in wortliste:
+            key = entry[0]
+            if key in korrekturen:
+                entry = korrekturen.pop(key)
+            yield entry
 
-    if korrekturen:
-        print korrekturen # übrige Einträge
+        if korrekturen:
+            print korrekturen # übrige Einträge
 
-    return (wortliste, wortliste_neu)
+    return stufe
 
 
 # Fehleinträge
 # ------------
 #::
 
-def fehleintraege(wordfile, datei):
+def fehleintraege(datei):
     """Entfernen der Einträge aus einer Liste von Fehleinträgen """
 
 # Fehleinträge aus Datei.
@@ -129,20 +139,20 @@ def fehleintraege(wordfile, datei):
                 line.decode('utf8').strip().replace(u';', u' ').split()[0])
                       for line in open(datei, 'r')
                       if line.strip() and not line.startswith('#'))
-    wortliste = list(wordfile)
-    wortliste_neu = [] # korrigierte Liste
-    for entry in wortliste:
-        if entry[0] in korrekturen: # nicht kopieren
-            korrekturen.discard(entry[0]) # erledigt
-        else:
-            wortliste_neu.append(entry)
 
-    if korrekturen:
-        print 'nicht gefunden:'
-        for w in korrekturen:
-            print w.encode('utf8')
+    def stufe(wortliste):
+        for entry in wortliste:
+            if entry[0] in korrekturen: # nicht kopieren
+                korrekturen.discard(entry[0]) # erledigt
+            else:
+                yield entry
+
+        if korrekturen:
+            print 'nicht gefunden:'
+            for w in korrekturen:
+                print w.encode('utf8')
 
-    return (wortliste, wortliste_neu)
+    return stufe
 
 
 # Groß-/Kleinschreibung ändern
@@ -156,15 +166,13 @@ def fehleintraege(wordfile, datei):
 #
 # ::
 
-def grossklein(wordfile, datei):
+def grossklein(datei):
     """Groß-/Kleinschreibung umstellen"""
 
     if not datei:
         datei = 'grossklein.todo'
     teste_datei(datei)
 
-    wortliste = list(wordfile)
-
     # Dekodieren, Feldtrenner zu Leerzeichen
     korrekturen = [line.decode('utf8').replace(';',' ')
                    for line in open(datei, 'r')
@@ -174,26 +182,28 @@ def grossklein(wordfile, datei):
     korrekturen = [join_word(line.split()[0]) for line in korrekturen
                    if line.strip() and not line.startswith('#')]
     korrekturen = set(korrekturen)
-    wortliste_neu = deepcopy(wortliste) # korrigierte Liste
-
-    for entry in wortliste_neu:
-        if entry[0] in korrekturen:
-            korrekturen.discard(entry[0]) # gefunden
-            # Anfangsbuchstabe mit geänderter Großschreibung:
-            if entry[0][0].islower():
-                anfangsbuchstabe = entry[0][0].title()
-            else:
-                anfangsbuchstabe = entry[0][0].lower()
-            # Einträge korrigieren:
-            for i in range(len(entry)):
-                if entry[i].startswith('-'): # -2-, -3-, ...
-                    continue
-                entry[i] = anfangsbuchstabe + entry[i][1:]
-
-    if korrekturen:
-        print korrekturen # übrige Einträge
 
-    return (wortliste, wortliste_neu)
+    def stufe(wortliste):
+        for entry in wortliste:
+            if entry[0] in korrekturen:
+                korrekturen.discard(entry[0]) # gefunden
+                entry = copy(entry)
+                # Anfangsbuchstabe mit geänderter Großschreibung:
+                if entry[0][0].islower():
+                    anfangsbuchstabe = entry[0][0].title()
+                else:
+                    anfangsbuchstabe = entry[0][0].lower()
+                # Einträge korrigieren:
+                for i in range(len(entry)):
+                    if entry[i].startswith('-'): # -2-, -3-, ...
+                        continue
+                    entry[i] = anfangsbuchstabe + entry[i][1:]
+            yield entry
+
+        if korrekturen:
+            print korrekturen # übrige Einträge
+
+    return stufe
 
 # Anpassung der Großschreibung der Trennmuster an das erste Feld
 # (ungetrenntes Wort). Siehe "wortliste.py" für einen Test auf Differenzen.
@@ -201,16 +211,18 @@ def grossklein(wordfile, datei):
 # zurückzuführen.)
 # ::
 
-def grossabgleich(wordfile):
-    wortliste = list(wordfile)
-    wortliste_neu = deepcopy(wortliste) # korrigierte Liste
-    for entry in wortliste_neu:
-        # Übertrag des Anfangsbuchstabens
-        for i in range(1,len(entry)):
-            if entry[i].startswith('-'):
-                continue
-            entry[i] = entry[0][0] + entry[i][1:]
-    return (wortliste, wortliste_neu)
+def grossabgleich(datei=None):
+    def stufe(wortliste):
+        for entry in wortliste:
+            # Übertrag des Anfangsbuchstabens
+            for i in range(1,len(entry)):
+                if not entry[i] or entry[i].startswith('-'):
+                    continue
+                if entry[i][:1] != entry[0][:1]:
+                    entry = copy(entry)
+                    entry[i] = entry[0][:1] + entry[i][1:]
+            yield entry
+    return stufe
 
 
 # Sprachvariante ändern
@@ -224,7 +236,7 @@ def grossabgleich(wordfile):
 #
 # ::
 
-def reformschreibung(wordfile, datei):
+def reformschreibung(datei):
     """Wörter die nur in (allgemeiner) Reformschreibung existieren"""
 
     if not datei:
@@ -239,23 +251,22 @@ def reformschreibung(wordfile, datei):
     korrekturen = [line.split(';')[0] for line in korrekturen]
     korrekturen = set(korrekturen)
 
-    wortliste = list(wordfile)
-    wortliste_neu = [] # korrigierte Liste
+    def stufe(wortliste):
+        for entry in wortliste:
+            if entry[0] in korrekturen:
+                key = entry[0]
+                wort = entry.get('de-1996')
+                if u'ss' in wort:
+                    entry = WordEntry('%s;-2-;-3-;%s;%s' % (key, wort, wort))
+                else:
+                    entry = WordEntry('%s;-2-;-3-;%s' % (key, wort))
+                korrekturen.discard(key) # erledigt
+            yield entry
 
-    for entry in wortliste:
-        if entry[0] in korrekturen:
-            key = entry[0]
-            wort = entry.get('de-1996')
-            if u'ss' in wort:
-                entry = WordEntry('%s;-2-;-3-;%s;%s' % (key, wort, wort))
-            else:
-                entry = WordEntry('%s;-2-;-3-;%s' % (key, wort))
-            korrekturen.discard(key) # erledigt
-        wortliste_neu.append(entry)
+        if korrekturen:
+            print korrekturen # übrige Einträge
 
-    if korrekturen:
-        print korrekturen # übrige Einträge
-    return wortliste, wortliste_neu
+    return stufe
 
 
 # Getrennte Einträge für Sprachvarianten
@@ -268,22 +279,20 @@ def reformschreibung(wordfile, datei):
 #
 # ::
 
-def sprachvariante_split(wordfile, alt, neu,
+def sprachvariante_split(alt, neu,
                          altsprache='de-1901', neusprache='de-1996'):
 
-    wortliste = list(wordfile)
-    wortliste_neu = [] # korrigierte Liste
-
-    for entry in wortliste:
-        if len(entry) == 2: # Allgemeine Schreibung
-            altwort = entry.get(altsprache)
-            neuwort = altwort.replace(alt, neu)
-            if altwort != neuwort:
-                entry = WordEntry('%s;-2-;3;4' % (join_word(altwort)))
-                entry.set(altwort, altsprache)
-                entry.set(neuwort, neusprache)
-        wortliste_neu.append(entry)
-    return (wortliste, wortliste_neu)
+    def stufe(wortliste):
+        for entry in wortliste:
+            if len(entry) == 2: # Allgemeine Schreibung
+                altwort = entry.get(altsprache)
+                neuwort = altwort.replace(alt, neu)
+                if altwort != neuwort:
+                    entry = WordEntry('%s;-2-;3;4' % (join_word(altwort)))
+                    entry.set(altwort, altsprache)
+                    entry.set(neuwort, neusprache)
+            yield entry
+    return stufe
 
 
 
@@ -306,19 +315,15 @@ def sprachvariante_split(wordfile, alt, neu,
 #
 # ::
 
-def neu(wordfile, datei):
+def neu(datei):
     """Neueinträge prüfen und vorbereiten."""
 
     if not datei:
         datei = 'neu.todo'
     teste_datei(datei)
-    korrekturen = open(datei, 'r')
-
-    wortliste = list(wordfile)
-    wortliste_neu = copy(wortliste)
-    words = set(entry[0] for entry in wortliste)     # vorhandene Wörter
 
-    for line in korrekturen:
+    neue = []
+    for line in open(datei, 'r'):
         if line.startswith('#'):
             continue
         # Dekodieren, Zeilenende entfernen
@@ -328,62 +333,132 @@ def neu(wordfile, datei):
         # Eintrag ggf. komplettieren:
         if u';' not in line:
             line = u'%s;%s' % (join_word(line), line)
-        entry = WordEntry(line)
+        neue.append(WordEntry(line))
+
+    # Sortieren (bei gleichem Schlüssel in der Reihenfolge der Datei)
+    neue.sort(key=sortkey_duden)
+    sortkeys = [sortkey_duden(entry) for entry in neue]
+
+# Einträge mit gleichem Schlüssel bis auf Groß-/Kleinschreibung haben
+# denselben Sortierschlüssel und stehen beim Einsortieren nebeneinander.
+# Für den Test auf "Neuwert" genügen daher die vorhandenen Einträge mit
+# gleichem Sortierschlüssel (`vorhanden`) und die bereits aufgenommenen
+# Neueinträge::
+
+    aufgenommen = set()
+
+    def pruefe(entry, vorhanden):
         key = entry[0]
-        # Test auf "Neuwert":
-        if key in words:
+        if key in vorhanden or key in aufgenommen:
             print key.encode('utf8'), 'schon vorhanden'
-            continue
-        if key.lower() in words or key.title() in words:
+            return None
+        if (key.lower() in vorhanden or key.title() in vorhanden
+            or key.lower() in aufgenommen or key.title() in aufgenommen):
             print key.encode('utf8'), 'mit anderer Großschreibung vorhanden'
-            continue
-
+            return None
         entry.regelaenderungen() # teste auf Dinge wie s-t/-st
-        wortliste_neu.append(entry)
-        words.add(key)
-
-    # Sortieren
-    wortliste_neu.sort(key=sortkey_duden)
+        aufgenommen.add(key)
+        return entry
+
+    def stufe(wortliste):
+        i = 0
+        letzter = None    # Sortierschlüssel des letzten Eintrags
+        vorhanden = set() # Schlüssel der Einträge mit diesem Sortierschlüssel
+        for entry in wortliste:
+            if i < len(neue):
+                key = sortkey_duden(entry)
+                while i < len(neue) and sortkeys[i] < key:
+                    if sortkeys[i] == letzter:
+                        entry_neu = pruefe(neue[i], vorhanden)
+                    else:
+                        entry_neu = pruefe(neue[i], ())
+                    if entry_neu:
+                        yield entry_neu
+                    i += 1
+                if key != letzter:
+                    letzter = key
+                    vorhanden = set()
+                vorhanden.add(entry[0])
+            yield entry
+        for i in range(i, len(neue)):
+            if sortkeys[i] == letzter:
+                entry_neu = pruefe(neue[i], vorhanden)
+            else:
+                entry_neu = pruefe(neue[i], ())
+            if entry_neu:
+                yield entry_neu
 
-    return (wortliste, wortliste_neu)
+    return stufe
 
 
-def doppelte(wordfile, use_first=False):
+def doppelte(datei=None, use_first=False):
     """Doppeleinträge entfernen (ohne Berücksichtigung der Großschreibung).
 
     Boolscher Wert `use_first` bestimmt, ob der erste oder der letzte von
     Einträgen mit gleichem Schlüssel in der Liste verbleibt.
 
-    Die neue Liste ist sortiert.
+    Die Wortliste muss sortiert sein (Einträge mit gleichem Schlüssel
+    stehen dann nebeneinander). Varianten ß/ss bleiben erhalten, sie
+    listet ``wortindex.py --doppelte``.
     """
-    wortliste = list(wordfile)
-    worddict = {}
-    for entry in wortliste:
-        key = entry[0].lower()
-        if use_first and key in worddict:
-            continue
-        worddict[key] = entry
+    def stufe(wortliste):
+        entfernt = {'doppelt': 0, 'grossklein': 0}
+        vorige = None
+        schluessel = set() # Schlüssel im aktuellen Lauf
+        for entry in wortliste:
+            if (vorige is not None
+                and variante(entry[0], vorige[0]) in entfernt):
+                if entry[0] in schluessel:
+                    entfernt['doppelt'] += 1
+                else:
+                    entfernt['grossklein'] += 1
+                    schluessel.add(entry[0])
+                if not use_first:
+                    vorige = entry
+                continue
+            if vorige is not None:
+                yield vorige
+            vorige = entry
+            schluessel = set([entry[0]])
+        if vorige is not None:
+            yield vorige
 
-    wortliste_neu = worddict.values() # korrigierte Liste
-    wortliste_neu.sort(key=sortkey_duden)
+        print sum(entfernt.values()), "Einträge entfernt",
+        print "(%(doppelt)d doppelt, %(grossklein)d Großschreibung)" % entfernt
 
-    print len(wortliste) - len(wortliste_neu), "Einträge entfernt"
-    return (wortliste, wortliste_neu)
+    return stufe
 
 
-def conflate(wortliste):
+def conflate(datei=None):
 
-    wortliste = list(wordfile)
-    wortliste_neu = [] # korrigierte Liste
+    def stufe(wortliste):
+        for entry in wortliste:
+            if len(entry) > 2:
+                # Felder zusammenfassen:
+                entry = copy(entry)
+                entry.conflate_fields()
+            yield entry
+
+    return stufe
 
-    for entry in wortliste:
-        if len(entry) > 2:
-            # Felder zusammenfassen:
-            entry = copy(entry)
-            entry.conflate_fields()
-        wortliste_neu.append(entry)
 
-    return (wortliste, wortliste_neu)
+# Hintereinanderschalten von Stufen: Die Wortliste wird nur einmal
+# durchlaufen::
+
+def apply_stages(wortliste, stufen):
+    for stufe in stufen:
+        wortliste = stufe(wortliste)
+    return list(wortliste)
+
+aktionen = {'neu': neu,
+            'doppelte': doppelte,
+            'fehleintraege': fehleintraege,
+            'grossklein': grossklein,
+            'grossabgleich': grossabgleich,
+            'korrektur': korrektur,
+            'reformschreibung': reformschreibung,
+            'zusammenfassen': conflate,
+           }
 
 
 # Default-Aktion::
@@ -392,63 +467,59 @@ if __name__ == '__main__':
 
 # Optionen::
 
-    usage = '%prog [Optionen] AKTION\n' + __doc__
+    usage = '%prog [Optionen] AKTION [AKTION[:DATEI] ...]\n' + __doc__
 
     parser = optparse.OptionParser(usage=usage)
     parser.add_option('-i', '--file', dest='wortliste',
                       help='Eingangsdatei, Vorgabe "../../../wortliste"',
                       default='../../../wortliste')
     parser.add_option('-k', '--todofile', dest='todo',
-                      help='Korrekturdatei, Vorgabe "<AKTION>.todo"')
+                      help='Korrekturdatei (bei einer AKTION), '
+                      'Vorgabe "<AKTION>.todo"')
     parser.add_option('-o', '--outfile', dest='patchfile',
                       help='Ausgangsdatei, Vorgabe "../../../wortliste.patch"',
                       default='../../../wortliste.patch')
 
     (options, args) = parser.parse_args()
 
-    if args:
-        aktion = args[0]
-    else:
+    if not args:
         print 'Nichts zu tun: AKTION Argument fehlt.', '\n'
         parser.print_help()
         sys.exit()
 
+# Die Aktionen (Einlesen und Test der Korrekturdateien)::
+
+    stufen = []
+    for arg in args:
+        aktion, sep, datei = arg.partition(':')
+        if aktion not in aktionen:
+            print 'Unbekannte AKTION', aktion, '\n'
+            parser.print_help()
+            sys.exit()
+        if not datei and len(args) == 1:
+            datei = options.todo
+        stufen.append(aktionen[aktion](datei))
+
+    # stufen = [sprachvariante_split(u'knien', u'kni-en')]
+
 # Die `Wortliste`::
+
     wordfile = WordFile(options.wortliste)
 
     # Da der Aufruf von `wortliste = list(wordfile)` lange dauert, wird er
-    # in den Aktionsroutinen nach dem Test auf die Eingabedatei ausgeführt.
-
-# Behandeln::
-
-    if aktion == 'neu':
-        (wortliste, wortliste_neu) = neu(wordfile, options.todo)
-    elif aktion == 'doppelte':
-        (wortliste, wortliste_neu) = doppelte(wordfile)
-    elif aktion == 'fehleintraege':
-        (wortliste, wortliste_neu) = fehleintraege(wordfile, options.todo)
-    elif aktion == 'grossklein':
-        (wortliste, wortliste_neu) = grossklein(wordfile, options.todo)
-    elif aktion == 'grossabgleich':
-        (wortliste, wortliste_neu) = grossabgleich(wordfile)
-    elif aktion == 'korrektur':
-        (wortliste, wortliste_neu) = korrektur(wordfile, options.todo)
-    elif aktion == 'reformschreibung':
-        (wortliste, wortliste_neu) = reformschreibung(wordfile, options.todo)
-    elif aktion == 'zusammenfassen':
-        (wortliste, wortliste_neu) = conflate(wordfile)
-    else:
-        print 'Unbekannte AKTION', '\n'
-        parser.print_help()
-        sys.exit()
+    # erst nach dem Test auf die Korrekturdateien ausgeführt.
+
+    wortliste = list(wordfile)
+
+# Behandeln (alle Aktionen in einem Durchgang)::
 
-    # (wortliste, wortliste_neu) = sprachvariante_split(wordfile,
-    #                                                   u'knien', u'kni-en')
+    wortliste_neu = apply_stages(wortliste, stufen)
 
-# Patch erstellen::
+# Patch erstellen (Abgleich der sortierten Listen in einem Durchgang, siehe
+# `keyed_udiff`)::
 
-    patch = udiff(wortliste, wortliste_neu, 'wortliste', 'wortliste-neu',
-                  encoding=wordfile.encoding)
+    patch = keyed_udiff(wortliste, wortliste_neu, 'wortliste', 'wortliste-neu',
+                        encoding=wordfile.encoding)
     if patch:
         # print patch
         patchfile = open(options.patchfile, 'w')
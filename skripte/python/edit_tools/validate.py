@@ -0,0 +1,678 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+# validate.py: Syntax-Test der Wortliste
+# ======================================
+
+u"""Prüfe die Wortliste auf Wohlgeformtheit.
+
+Aufruf: python validate.py [Optionen] [Wortliste]
+
+Python-Gegenstück zu ``skripte/validate.lua`` (mit den Lua-Modulen
+``helper_records`` und ``helper_words``): Datensatztypen, Wortgrammatik
+und Eszett-Ersatzschreibungen werden nach denselben Regeln geprüft.
+
+Ohne Angabe der Wortliste wird von der Standardeingabe gelesen.
+Die Zeilen werden abschnittsweise parallel geprüft. Die Ergebnisse werden
+pro Zeile (MD5-Prüfsumme) im Cache-Verzeichnis ("$PATUSE_CACHE" oder
+"~/.cache/patuse") gespeichert, so dass bei erneutem Aufruf nur geänderte
+Zeilen geprüft werden.
+"""
+
+# .. contents::
+#
+# Vorspann
+# --------
+#
+# ::
+
+import sys, os, re, hashlib, marshal, optparse
+import multiprocessing
+
+
+# Wortgrammatik
+# -------------
+#
+# Siehe die Grammatik `word` in ``skripte/lua/helper_words.lua``. Die
+# Prüfung folgt den Regeln einer "Parsing Expression Grammar": Bei einer
+# Auswahl gilt die erste passende Alternative, Wiederholungen sind "gierig"
+# und werden nicht zurückgenommen.
+#
+# Zulässige Buchstaben (ISO-8859-15 bis auf ï, Ï, ý, Ý wie in
+# daten/german.tr)::
+
+letters = (u'a-zA-Z'
+           u'àÀáÁäÄâÂãÃåÅæÆçÇèÈéÉêÊëËìÌíÍîÎñÑòÒóÓôÔõÕöÖøØœŒšŠßùÙúÚûÛüÜÿŸžŽ')
+
+_letter_run = re.compile(u'[%s]+' % letters)
+
+# Morphologische Trennstellenmarkierung (die Reihenfolge der Alternativen
+# ist relevant: gemischte vor reinen Trennzeichen) und Bewertung (ein bis
+# drei Punkte)::
+
+_morph = re.compile(u'<=+|=+>|-+|<+|>+|=+|·')
+_quality = re.compile(u'\\.{1,3}')
+
+# Beginn einer Spezialtrennung (ck-Trennung und Dreikonsonantenregel)::
+
+_nonstd = re.compile(u'\\{(?:(ck)/k|(bb|ff|ll|mm|nn|pp|rr|tt|ss)/\\2)')
+
+# Trennstellenmarkierung ab `pos`: Gib das Ende und die normalisierte
+# Form zurück ('-' ohne, '' mit Bewertung) oder `None`.
+#
+# Eine Markierung ohne Bewertung ist eine morphologische Markierung, der
+# kein Punkt folgt, sonst folgen beliebig viele morphologische Markierungen
+# und eine Bewertung::
+
+def _hyphen(s, pos):
+    m = _morph.match(s, pos)
+    if m and not s.startswith(u'.', m.end()):
+        return m.end(), u'-'
+    while m:
+        pos = m.end()
+        m = _morph.match(s, pos)
+    m = _quality.match(s, pos)
+    if m:
+        return m.end(), u''
+    return None
+
+# Die folgenden Funktionen geben bei Erfolg ein Tupel (Ende, Teile,
+# ungleiche Alternativen) zurück, sonst `None`. Die Teile ergeben
+# aneinandergehängt das normalisierte Wort.
+#
+# Spezialtrennung, z.B. ``{ck/k-k}`` -> 'ck'::
+
+def _cl_nonstd(s, pos):
+    m = _nonstd.match(s, pos)
+    if not m:
+        return None
+    chars = m.group(1) or m.group(2)
+    hyphen = _hyphen(s, m.end())
+    if hyphen is None:
+        return None
+    end = hyphen[0]
+    if s[end:end+2] != chars[-1] + u'}':
+        return None
+    return end + 2, [chars], False
+
+# Teilwort einer Alternative (mit optionaler Trennstellenmarkierung am
+# Anfang und Ende, ohne Trennzeichen in der Capture)::
+
+def _alt_part_word(s, pos):
+    hyphen = _hyphen(s, pos)
+    if hyphen:
+        pos = hyphen[0]
+    word = _word(s, pos)
+    if word is None:
+        return None
+    pos, parts, invalid_alt = word
+    hyphen = _hyphen(s, pos)
+    if hyphen:
+        pos = hyphen[0]
+    return pos, u''.join(parts).replace(u'-', u''), invalid_alt
+
+# Alternative, z.B. ``[t=tu-/{tt/tt=t}u.]`` -> 'ttu'. Die Buchstaben beider
+# Alternativen müssen übereinstimmen::
+
+def _cl_alt(s, pos):
+    first = _alt_part_word(s, pos + 1)
+    if first is None:
+        return None
+    pos, a, invalid_a = first
+    if not s.startswith(u'/', pos):
+        return None
+    second = _alt_part_word(s, pos + 1)
+    if second is None:
+        return None
+    pos, b, invalid_b = second
+    if not s.startswith(u']', pos):
+        return None
+    return pos + 1, [a], invalid_a or invalid_b or a != b
+
+# Kluster: Folge von Buchstaben, Spezialtrennungen und Alternativen ohne
+# Trennstellenmarkierung::
+
+def _cluster(s, pos):
+    parts = []
+    invalid_alt = False
+    while True:
+        m = _letter_run.match(s, pos)
+        if m:
+            parts.append(m.group())
+            pos = m.end()
+            continue
+        if s.startswith(u'{', pos):
+            result = _cl_nonstd(s, pos)
+        elif s.startswith(u'[', pos):
+            result = _cl_alt(s, pos)
+        else:
+            result = None
+        if result is None:
+            break
+        pos, more, invalid = result
+        parts += more
+        invalid_alt = invalid_alt or invalid
+    if not parts:
+        return None
+    return pos, parts, invalid_alt
+
+# Wort: Kluster, getrennt durch Trennstellenmarkierungen::
+
+def _word(s, pos):
+    cluster = _cluster(s, pos)
+    if cluster is None:
+        return None
+    pos, parts, invalid_alt = cluster
+    while True:
+        hyphen = _hyphen(s, pos)
+        if hyphen is None:
+            break
+        cluster = _cluster(s, hyphen[0])
+        if cluster is None:
+            break
+        parts.append(hyphen[1])
+        parts += cluster[1]
+        pos = cluster[0]
+        invalid_alt = invalid_alt or cluster[2]
+    return pos, parts, invalid_alt
+
+# Wörter ohne Spezialtrennungen und Alternativen (die große Mehrheit)
+# werden mit einem einzigen regulären Ausdruck geprüft. Damit dieser wie
+# `_hyphen` nicht auf eine andere Alternative zurückgreift, wird die
+# morphologische Markierung in einem Lookahead erfasst (``(?=(M))\1``
+# entspricht einer atomaren Gruppe). Eine Markierung mit Bewertung ist
+# nur zulässig, wenn die ohne Bewertung nicht passt::
+
+_M = u'(?:<=+|=+>|-+|<+|>+|=+|·)'
+_simple_word = re.compile(
+    u'[{L}]+(?:(?:(?=({M}))\\1(?!\\.)'
+    u'|(?!(?=({M}))\\2(?!\\.))(?:(?=({M}))\\3)*\\.{{1,3}})[{L}]+)*\\Z'
+    .format(L=letters, M=_M))
+_quality_hyphen = re.compile(u'[-<>=·]*\\.+')
+_plain_hyphen = re.compile(u'[-<>=·]+')
+
+def _simple_norm_word(word):
+    return _plain_hyphen.sub(u'-', _quality_hyphen.sub(u'', word))
+
+# normalize_word
+# ~~~~~~~~~~~~~~
+#
+# Prüfe `word` gegen die Wortgrammatik. Gib `None` zurück, falls das Wort
+# eine unzulässige Struktur hat, sonst ein Dictionary mit den
+# Worteigenschaften (vgl. `normalize_word` in helper_words.lua):
+#
+# ===============  =========================================
+# norm_word        normalisiertes Wort (Trennzeichen '-')
+# has_invalid_alt  Alternativen sind nicht identisch
+# has_eszett       Wort enthält Buchstaben 'ß'
+# has_nonstd       Wort enthält Spezialtrennung
+# has_nonstd_sss   Wort enthält Spezialtrennung für das 's'
+# ===============  =========================================
+#
+# >>> from validate import normalize_word, validate_word
+# >>> print normalize_word(u'Lei-nen==be[t=tu-/{tt/tt=t}u.]ches')['norm_word']
+# Lei-nen-bettuches
+# >>> print normalize_word(u'Wach[-s/s-]tu-be')['norm_word']
+# Wachstu-be
+# >>> print normalize_word(u'Ab-fluss-<-rohr')
+# None
+#
+# Da die Struktur bei Erfolg feststeht, werden die übrigen Eigenschaften
+# direkt am Wort abgelesen::
+
+def normalize_word(word):
+    if u'{' in word or u'[' in word:
+        result = _word(word, 0)
+        if result is None or result[0] != len(word):
+            return None
+        end, parts, invalid_alt = result
+        norm_word = u''.join(parts)
+    elif _simple_word.match(word):
+        norm_word, invalid_alt = _simple_norm_word(word), False
+    else:
+        return None
+    return {'norm_word': norm_word,
+            'has_invalid_alt': invalid_alt,
+            'has_eszett': u'ß' in word,
+            'has_nonstd': u'{' in word,
+            'has_nonstd_sss': u'{ss/' in word,
+           }
+
+# validate_word
+# ~~~~~~~~~~~~~
+#
+# Prüfe ein Wort auf Wohlgeformtheit. Gib ein Tupel (Eigenschaften,
+# Fehlermeldung) zurück; bei unzulässigen Wörtern sind die Eigenschaften
+# `None`:
+#
+# >>> validate_word(u'Ab<fluss')[1]
+# >>> print validate_word(u'Ab<flu[s/ss]s')[1]
+# ungleiche Alternativen
+# >>> print validate_word(u'Ufo')[1]
+# weniger als vier Buchstaben
+# >>> print validate_word(u'A-bend')[1]
+# Trennzeichen am Wortanfang
+#
+# ::
+
+def validate_word(word):
+    props = normalize_word(word)
+    if props is None:
+        return None, u'ungültiges Wort'
+    if props['has_invalid_alt']:
+        return None, u'ungleiche Alternativen'
+    norm_word = props['norm_word']
+    if len(norm_word.replace(u'-', u'')) < 4:
+        return None, u'weniger als vier Buchstaben'
+    if norm_word[1] == u'-':
+        return None, u'Trennzeichen am Wortanfang'
+    if norm_word[-2] == u'-':
+        return None, u'Trennzeichen am Wortende'
+    return props, None
+
+
+# Datensätze
+# ----------
+#
+# Siehe ``skripte/lua/helper_records.lua``: Bis zu acht Felder, getrennt
+# durch Semikolon, ohne Leerzeichen und Kommentarzeichen. Leere Felder
+# bestehen aus der Feldnummer zwischen Minuszeichen. Vor einem Kommentar
+# sind beliebige Leerzeichen erlaubt::
+
+_record = re.compile(u'([^ #]+) *(?:#(.*))?\\Z', re.DOTALL)
+_empty = re.compile(u'-[0-9]-')
+
+# Zerlege einen Datensatz in eine Liste der Felder (`None` für leere
+# Felder) und den Kommentar. Gib `None` zurück, wenn der Datensatz kein
+# zulässiges Format hat:
+#
+# >>> from validate import split_record, identify_record
+# >>> split_record(u'Abfluss;-2-;-3-;Ab-fluss;Ab-fluss # Test')
+# ([u'Abfluss', None, None, u'Ab-fluss', u'Ab-fluss'], u' Test')
+# >>> split_record(u'Abfluss;-3-;Ab-fluss')
+#
+# ::
+
+def split_record(record):
+    m = _record.match(record)
+    if not m:
+        return None
+    fields = m.group(1).split(u';')
+    if len(fields) > 8:
+        return None
+    for i, field in enumerate(fields):
+        if not field:
+            return None
+        if _empty.match(field):
+            if i == 0 or field != u'-%d-' % (i + 1):
+                return None
+            fields[i] = None
+    return fields, m.group(2)
+
+# Datensatztypen: Die Zeichenposition entspricht der Feldnummer, das
+# Zeichen beschreibt, ob das Feld belegt ist (u: ungetrennt, a: alle,
+# t: traditionell, r: reformiert, c: Versalschreibung alle, s: Schweiz)
+# oder leer ('x' für die Felder 2 und 5, sonst '_')::
+
+rectypes = ('ua', 'uxt_', 'ux_r', 'uxtr',
+            'ux__c', 'ux__xt__', 'ux__x_r_', 'ux__x__s', 'ux__xt_s',
+            'ux__xtr_', 'ux__xtrs',
+            'ux_rc', 'ux_rxtr_', 'ux_rxtrs')
+
+_flags_full = 'uatrctrs'
+_flags_empty = ' x__x___'
+
+def _rectype(fields):
+    rectype = ''.join(_flags_empty[i] if field is None else _flags_full[i]
+                      for i, field in enumerate(fields))
+    if rectype in rectypes:
+        return rectype
+    return None
+
+# Ermittle den Typ eines Datensatzes (oder `None`):
+#
+# >>> identify_record(u'Abfluss;-2-;-3-;Ab-fluss;Ab-fluss # Test')
+# 'ux_rc'
+#
+# ::
+
+def identify_record(record):
+    split = split_record(record)
+    if split is None:
+        return None
+    return _rectype(split[0])
+
+# validate_record
+# ~~~~~~~~~~~~~~~
+#
+# Prüfe einen Datensatz auf Wohlgeformtheit (Format des Datensatzes und
+# Zulässigkeit sämtlicher Wörter). Gib ein Tupel (gültig, info) zurück.
+# Bei unzulässigem Format ist `info` `None`, sonst ein Dictionary mit dem
+# Datensatztyp ('type'), den Feldern ('fields') und ggf. der Nummer des
+# fehlerhaften Feldes ('errfield') und der Fehlerbeschreibung ('errmsg').
+# Datensätze aus `exceptions` werden nur auf das Format geprüft:
+#
+# >>> from validate import validate_record
+# >>> validate_record(u'Abfluss;-2-;-3-;Ab-fluss;Ab-fluss')[0]
+# True
+# >>> valid, info = validate_record(u'Abfluss;-2-;-3-;Ab-fluss;Ab-flu{ss/ss-s}')
+# >>> print valid, info['errfield']
+# False 5
+# >>> valid, info = validate_record(u'Abfluss;Ab-flus')
+# >>> print valid, info['errfield'], info['errmsg']
+# False 2 ungleich Feld 1
+#
+# ::
+
+def validate_record(record, exceptions=()):
+    split = split_record(record)
+    rectype = split and _rectype(split[0])
+    if not rectype:
+        return False, None
+    info = {'type': rectype}
+    if record in exceptions:
+        info['is_exception'] = True
+        return True, info
+    fields = info['fields'] = split[0]
+    field1 = fields[0]
+    for i, word in enumerate(fields):
+        if word is None:
+            continue
+        nr = i + 1
+        props, msg = validate_word(word)
+        if props is None:
+            info['errfield'], info['errmsg'] = nr, msg
+            return False, info
+        if i == 0:
+            info['has_eszett'] = props['has_eszett']
+        if props['norm_word'].replace(u'-', u'') != field1:
+            info['errfield'], info['errmsg'] = nr, u'ungleich Feld 1'
+            return False, info
+        if props['has_nonstd'] and nr in (2, 4, 5, 7):
+            info['errfield'] = nr
+            info['errmsg'] = u'unzulässige Spezialtrennung'
+            return False, info
+        if props['has_nonstd_sss'] and nr != 8:
+            info['errfield'] = nr
+            info['errmsg'] = u'unzulässige Spezialtrennung'
+            return False, info
+        if props['has_eszett'] and nr > 4:
+            info['errfield'], info['errmsg'] = nr, u'unzulässiges Eszett'
+            return False, info
+    return True, info
+
+
+# Ausnahmeliste
+# -------------
+#
+# Datensätze mit bekannten "Fehlern" werden nicht auf Wohlgeformtheit der
+# einzelnen Wörter geprüft. Die Datei wird im aktuellen Verzeichnis, in
+# ``lua/`` und ``skripte/lua/`` gesucht (wie in helper_records.lua),
+# zuletzt in ``skripte/lua/`` relativ zu diesem Skript.
+#
+# Gib den Pfad der gelesenen Datei und die Menge der Datensätze
+# (UTF-8-kodiert) zurück::
+
+def read_exceptions(fname='wortliste.ausnahmen'):
+    search_path = ['', 'lua', os.path.join('skripte', 'lua'),
+                   os.path.join(os.path.dirname(os.path.dirname(
+                       os.path.dirname(os.path.abspath(__file__)))), 'lua')]
+    for path in search_path:
+        path = os.path.join(path, fname)
+        if os.path.exists(path):
+            break
+    exceptions = set(line.rstrip('\n') for line in open(path))
+    return path, exceptions
+
+
+# Eszett-Ersatzschreibungen
+# -------------------------
+#
+# Zu jedem Wort mit Eszett muss es einen Datensatz mit Doppel-s-Schreibung
+# geben, der in jeder Rechtschreibung existiert, in der die
+# Eszett-Schreibung gültig ist. Die Funktionen wählen das Feld der
+# jeweiligen Rechtschreibung (Felder ab 0 gezählt)::
+
+spellings = (
+    ('trad', (1, 2, 4, 5)),
+    ('refo', (1, 3, 4, 6)),
+    ('swiss', (1, 2, 4, 7, 5)),
+    )
+
+def _extract(fields, indices):
+    for i in indices:
+        if i < len(fields) and fields[i] is not None:
+            return fields[i]
+    return None
+
+# `eszett_forms` ist eine Liste von Paaren (Zeilennummer, Felder) der
+# Datensätze mit Eszett im ersten Feld, `ss_forms` ein Dictionary, das die
+# kleingeschriebenen Doppel-s-Schreibungen auf diese Paare abbildet.
+# Gib die Zeilennummern fehlerhafter Datensätze zurück und schreibe die
+# Fehlermeldungen nach `err`::
+
+def check_eszett(eszett_forms, ss_forms, err=sys.stderr):
+    bad_lineno = set()
+    for lineno, fields in eszett_forms:
+        ss_form = fields[0].lower().replace(u'ß', u'ss')
+        if ss_form not in ss_forms:
+            bad_lineno.add(lineno)
+            err.write((u'Zeile %d fehlende Doppel-s-Schreibung: %s\n'
+                       % (lineno, fields[0])).encode('utf8'))
+            continue
+        ss_lineno, ss_fields = ss_forms[ss_form]
+        for spelling, indices in spellings:
+            if (_extract(fields, indices) is not None
+                and _extract(ss_fields, indices) is None):
+                bad_lineno.add(ss_lineno)
+                err.write((u'Zeile %d fehlende Doppel-s-Schreibung (%s): %s\n'
+                           % (ss_lineno, spelling, ss_fields[0])
+                          ).encode('utf8'))
+    return bad_lineno
+
+
+# Zwischenspeicher
+# ----------------
+#
+# Das Prüfergebnis einer Zeile hängt nur von der Zeile ab (bis auf die
+# Ausnahmeliste, die nicht zwischengespeichert wird). Gespeichert wird ein
+# Tupel (Datensatztyp, Feldnummer, Fehlermeldung) pro MD5-Prüfsumme der
+# Zeile, vgl. `SortKeyCache` in ``skripte/sort.py``.
+#
+# Bei Änderungen der Prüfregeln `cache_format` erhöhen::
+
+cache_format = '1'
+
+def check_line(line):
+    valid, info = validate_record(line.decode('utf8'))
+    if info is None:
+        return None, 0, None
+    return info['type'], info.get('errfield', 0), info.get('errmsg')
+
+def check_lines(lines):
+    return [check_line(line) for line in lines]
+
+class ResultCache(object):
+
+    def __init__(self, path=None):
+        self.path = path
+        self.results = {} # Prüfsumme -> Ergebnis
+        self.used = {}    # im aktuellen Lauf verwendete Ergebnisse
+        self.computed = 0
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = marshal.load(f)
+            finally:
+                f.close()
+        except (IOError, EOFError, ValueError, TypeError):
+            return
+        if data[0] == cache_format:
+            self.results = data[1]
+
+    def save(self):
+        if not self.path:
+            return
+        if not self.computed and len(self.used) == len(self.results):
+            return # keine Änderungen
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            tmpfile = '%s.%d' % (self.path, os.getpid())
+            f = open(tmpfile, 'wb')
+            try:
+                marshal.dump((cache_format, self.used), f, 2)
+            finally:
+                f.close()
+            os.rename(tmpfile, self.path)
+        except (IOError, OSError):
+            pass
+
+
+# validate_file
+# -------------
+#
+# Prüfe die Zeilen `lines` (UTF-8-kodiert, ohne Zeilenende) und gib ein
+# Dictionary mit der Gesamtzahl ('cnt_total'), der Zahl der ungültigen
+# Datensätze ('cnt_invalid'), den Häufigkeiten der Datensatztypen
+# ('cnt_rectypes') und den Zeilennummern der ungültigen Datensätze
+# ('bad_lineno') zurück. Fehlermeldungen werden nach `err` geschrieben.
+#
+# Zeilen ohne gespeichertes Ergebnis werden in Abschnitten von `chunksize`
+# Zeilen auf `processes` Prozesse verteilt (bei wenigen Zeilen lohnt sich
+# der Start der Prozesse nicht)::
+
+def validate_file(lines, exceptions=(), cache=None, processes=None,
+                  chunksize=10000, err=sys.stderr):
+    if cache is None:
+        cache = ResultCache()
+    digests = [hashlib.md5(line).digest() for line in lines]
+    results = [cache.results.get(digest) for digest in digests]
+    todo = [i for i, result in enumerate(results)
+            if result is None and lines[i] not in exceptions]
+    chunks = [[lines[i] for i in todo[start:start+chunksize]]
+              for start in range(0, len(todo), chunksize)]
+    if processes == 1 or len(chunks) < 2:
+        checked = map(check_lines, chunks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            checked = pool.map(check_lines, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    for i, result in zip(todo, (result for chunk in checked
+                                for result in chunk)):
+        results[i] = cache.results[digests[i]] = result
+    cache.computed += len(todo)
+
+# Auswertung in der Reihenfolge der Zeilen::
+
+    cnt_rectypes = dict((rectype, 0) for rectype in rectypes)
+    eszett = u'ß'.encode('utf8')
+    bad_lineno = set()
+    eszett_forms = []
+    ss_forms = {}
+    for lineno, line in enumerate(lines, 1):
+        if line in exceptions:
+            rectype = identify_record(line.decode('utf8'))
+            if rectype:
+                cnt_rectypes[rectype] += 1
+            else:
+                bad_lineno.add(lineno)
+                err.write('Zeile %d ungültiger Datensatz: %s\n'
+                          % (lineno, line))
+            continue
+        cache.used[digests[lineno-1]] = result = results[lineno-1]
+        rectype, errfield, errmsg = result
+        if rectype is None:
+            bad_lineno.add(lineno)
+            err.write('Zeile %d ungültiger Datensatz: %s\n' % (lineno, line))
+        elif errfield:
+            bad_lineno.add(lineno)
+            err.write('Zeile %d Feld %d: %s: %s\n'
+                      % (lineno, errfield, errmsg.encode('utf8'), line))
+        else:
+            cnt_rectypes[rectype] += 1
+            # Vorbereitung der Eszett-Prüfung (Test auf "ß" und "ss"
+            # vor dem Dekodieren)
+            key = line.split(';', 1)[0]
+            if eszett in key:
+                eszett_forms.append((lineno,
+                                     split_record(line.decode('utf8'))[0]))
+            elif 'ss' in key.lower():
+                ss_forms[key.decode('utf8').lower()] = (
+                    lineno, split_record(line.decode('utf8'))[0])
+    bad_lineno |= check_eszett(eszett_forms, ss_forms, err)
+    return {'cnt_total': len(lines),
+            'cnt_invalid': len(bad_lineno),
+            'cnt_rectypes': cnt_rectypes,
+            'bad_lineno': bad_lineno,
+           }
+
+
+# Hauptfunktion
+# -------------
+#
+# ::
+
+if __name__ == '__main__':
+
+    usage = '%prog [Optionen] [Wortliste]\n\n' + __doc__
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-s', '--statistics', action='store_true',
+                      default=False, help='Häufigkeiten der Datensatztypen')
+    parser.add_option('-j', '--jobs', type='int',
+                      help='Zahl der Prozesse, Vorgabe: Zahl der CPUs')
+    parser.add_option('-c', '--cache',
+                      help='Zwischenspeicher, Vorgabe '
+                      '"<Wortliste>.validate-cache" im Cache-Verzeichnis')
+    parser.add_option('--no-cache', action='store_true', default=False,
+                      help='Alle Zeilen prüfen, Ergebnisse nicht speichern')
+    parser.add_option('-x', '--exceptions', default='wortliste.ausnahmen',
+                      help='Ausnahmeliste, Vorgabe "wortliste.ausnahmen"')
+    (options, args) = parser.parse_args()
+
+    fname_ex, exceptions = read_exceptions(options.exceptions)
+    print 'Verwende Ausnahmeliste', fname_ex
+
+    if args:
+        infile = open(args[0])
+        if options.cache:
+            cachefile = options.cache
+        else:
+            # Cache-Verzeichnis wie für die Trennmuster (patuse/)
+            sys.path.insert(0, os.path.dirname(os.path.dirname(
+                                               os.path.abspath(__file__))))
+            from patuse.pattern_cache import cache_file
+            cachefile = cache_file(args[0], '.validate-cache')
+    else:
+        infile = sys.stdin
+        cachefile = options.cache
+    if options.no_cache:
+        cachefile = None
+    lines = infile.read().split('\n')
+    if lines[-1] == '':
+        del lines[-1]
+
+    cache = ResultCache(cachefile)
+    info = validate_file(lines, exceptions, cache, options.jobs)
+    cache.save()
+
+    if options.statistics:
+        for rectype in rectypes:
+            print '%-10s\t%d' % (rectype, info['cnt_rectypes'][rectype])
+    print 'gesamt    \t%d' % info['cnt_total']
+    print 'ungültig  \t%d' % info['cnt_invalid']
+
+    if info['cnt_invalid']:
+        sys.exit(1)
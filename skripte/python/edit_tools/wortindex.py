@@ -0,0 +1,648 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Copyright: © 2016 Günter Milde.
+#             Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+# :Id:        $Id:  $
+
+# wortindex.py: Indizierter Zugriff auf die Wortliste
+# ===================================================
+
+u"""Nachschlagen von Einträgen der Wortliste ohne vollständiges Einlesen.
+
+Statt die ≅ 400 000 Zeilen der Wortliste bei jedem Aufruf mit
+`WordFile.asdict()` in ein Dictionary von `WordEntry`-Instanzen zu lesen,
+wird einmalig eine Indexdatei erstellt (sortierte Schlüssel mit
+Positionstabelle, zusätzlich die gefalteten Schlüssel: kleingeschrieben,
+ß als ss). Index und
+Wortliste werden über `mmap` eingebunden, ein `WordEntry` wird nur für
+gefundene Einträge erzeugt.
+
+Ändert sich die Wortliste, werden nur die geänderten Blöcke (Vergleich
+von Prüfsummen über Blöcke mit inhaltsabhängigen Grenzen) neu indiziert
+und in einer Zusatzdatei ("<index>.delta") gespeichert. Erst wenn die
+geänderten Blöcke mehr als ein Viertel der Wortliste ausmachen, wird der
+Index neu erstellt.
+
+Über die sortierten gefalteten Schlüssel findet der Index doppelte
+Einträge sowie Einträge, die sich nur in Groß-/Kleinschreibung oder der
+Schreibung ß/ss unterscheiden (--doppelte). Neueinträge können gegen den
+Index geprüft werden, ohne die Wortliste einzulesen (--check).
+
+Aufruf: python wortindex.py [Optionen] [Wort ...]
+"""
+
+# .. contents::
+#
+# Vorspann
+# --------
+#
+# ::
+
+import sys, os, codecs, mmap, struct, zlib, bisect, heapq, optparse
+import itertools
+from array import array
+
+from wortliste import WordEntry, join_word, fold_key, variante
+
+# Version des Dateiformats, bei Änderungen erhöhen::
+
+format_version = '2'
+
+# Blöcke für den Vergleich von Index und Wortliste enden nach Zeilen, deren
+# Prüfsumme mit `chunkmask` verknüpft 0 ergibt (im Mittel 256 Zeilen).
+# Eingefügte oder gelöschte Zeilen verschieben die übrigen Blockgrenzen
+# nicht::
+
+chunkmask = 0xff
+
+# Maximaler Anteil der geänderten Blöcke an der Wortliste, bis zu dem der
+# Index inkrementell aktualisiert wird::
+
+max_delta = 0.25
+
+
+# Schlüsseltabelle
+# ----------------
+#
+# Eine Tabelle enthält die sortierten, UTF-8-kodierten Schlüssel mit der
+# Position der zugehörigen Zeile in der Wortliste sowie die sortierten
+# gefalteten Schlüssel (siehe `fold_key`) mit dem Index des
+# Originalschlüssels.
+#
+# Schlüssel und Zeilenpositionen einer Zeile im Bereich `start` bis `end`
+# von `data` (Kommentarzeilen und Leerzeilen werden übergangen)::
+
+def key_records(data, start=0, end=None):
+    if end is None:
+        end = len(data)
+    records = []
+    pos = start
+    for line in data[start:end].split('\n'):
+        semi = line.find(';')
+        key = line[:semi] if semi >= 0 else line.rstrip()
+        if '#' in key:
+            key = key.split('#')[0].rstrip()
+        if key:
+            records.append((key, pos))
+        pos += len(line) + 1
+    return records
+
+# Binärdarstellung einer Tabelle: sechs Längenangaben gefolgt von den
+# Abschnitten
+#
+# ======  ==============================================================
+# keys    sortierte Schlüssel (aneinandergehängt)
+# kpos    Anfang der Schlüssel in `keys` (uint32, n+1 Werte)
+# lpos    Zeilenposition in der Wortliste (uint32, n Werte)
+# fkeys   sortierte gefaltete Schlüssel
+# fpos    Anfang der Schlüssel in `fkeys` (uint32, n+1 Werte)
+# fidx    Index des zugehörigen Schlüssels in `keys` (uint32, n Werte)
+# ======  ==============================================================
+#
+# ::
+
+def pack_table(records):
+    records.sort()
+    keys = [key for key, pos in records]
+    lpos = array('I', [pos for key, pos in records])
+    # falten in einem Schritt (Schlüssel enthalten kein '\n'):
+    folded = fold_key('\n'.join(keys).decode('utf8')).encode('utf8')
+    folded = folded.split('\n') if keys else []
+    order = sorted(range(len(keys)), key=folded.__getitem__)
+    fkeys = [folded[i] for i in order]
+    fidx = array('I', order)
+    sections = [''.join(keys), _offsets(keys).tostring(), lpos.tostring(),
+                ''.join(fkeys), _offsets(fkeys).tostring(), fidx.tostring()]
+    return (struct.pack('<6I', *[len(s) for s in sections])
+            + ''.join(sections))
+
+def _offsets(strings):
+    offsets = array('I', [0])
+    total = 0
+    for s in strings:
+        total += len(s)
+        offsets.append(total)
+    return offsets
+
+# Zugriff auf eine Tabelle in einem Puffer (String oder `mmap`) ab Position
+# `offset` ohne Kopie der Daten::
+
+class KeyTable(object):
+
+    def __init__(self, buf, offset=0):
+        self.buf = buf
+        lengths = struct.unpack_from('<6I', buf, offset)
+        offsets = [offset + 24]
+        for length in lengths[:-1]:
+            offsets.append(offsets[-1] + length)
+        (self.keys, self.kpos, self.lpos,
+         self.fkeys, self.fpos, self.fidx) = offsets
+        self.n = lengths[2] // 4
+
+    def __len__(self):
+        return self.n
+
+    def _string(self, strings, positions, i):
+        start, end = struct.unpack_from('<2I', self.buf, positions + 4*i)
+        return self.buf[strings+start:strings+end]
+
+    def _bisect(self, strings, positions, key):
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(strings, positions, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        end = lo
+        while (end < self.n
+               and self._string(strings, positions, end) == key):
+            end += 1
+        return lo, end
+
+    def key(self, i):
+        return self._string(self.keys, self.kpos, i)
+
+    def position(self, i):
+        return struct.unpack_from('<I', self.buf, self.lpos + 4*i)[0]
+
+# Zeilenpositionen der Einträge mit Schlüssel `key` (UTF-8)::
+
+    def positions(self, key):
+        start, end = self._bisect(self.keys, self.kpos, key)
+        return [self.position(i) for i in range(start, end)]
+
+# Zeilenpositionen der Einträge, deren gefalteter Schlüssel `folded`
+# ist::
+
+    def folded_positions(self, folded):
+        start, end = self._bisect(self.fkeys, self.fpos, folded)
+        return [self.position(struct.unpack_from('<I', self.buf,
+                                                 self.fidx + 4*i)[0])
+                for i in range(start, end)]
+
+# Alle Gruppen von Einträgen mit gleichem gefalteten Schlüssel als Paare
+# (Schlüssel, Zeilenpositionen), nach Schlüssel sortiert. Die Tabellen
+# werden dafür einmal als Ganzes gelesen::
+
+    def folded_runs(self):
+        fpos = array('I', self.buf[self.fpos:self.fpos + 4*(self.n+1)])
+        fidx = array('I', self.buf[self.fidx:self.fidx + 4*self.n])
+        lpos = array('I', self.buf[self.lpos:self.lpos + 4*self.n])
+        fkeys = self.buf[self.fkeys:self.fkeys + fpos[-1]]
+        start = 0
+        folded = fkeys[fpos[0]:fpos[1]] if self.n else None
+        for i in xrange(1, self.n + 1):
+            key = fkeys[fpos[i]:fpos[i+1]] if i < self.n else None
+            if key != folded:
+                yield folded, [lpos[fidx[k]] for k in xrange(start, i)]
+                start, folded = i, key
+
+
+# Hilfsfunktionen
+# ---------------
+#
+# ::
+
+def _stamp(path):
+    stat = os.stat(path)
+    return repr(stat.st_mtime), stat.st_size
+
+def _map(path):
+    f = open(path, 'rb')
+    try:
+        if not os.fstat(f.fileno()).st_size:
+            return ''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+
+def _write(path, content):
+    # in temporäre Datei schreiben und umbenennen (atomar unter POSIX)
+    tmpfile = '%s.%d' % (path, os.getpid())
+    f = open(tmpfile, 'wb')
+    try:
+        f.write(content)
+    finally:
+        f.close()
+    os.rename(tmpfile, path)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+# Blockgrenzen (Anfänge aller Blöcke und Dateiende) und Prüfsummen::
+
+def _chunks(data):
+    starts = array('I', [0])
+    pos = 0
+    for line in data[:].split('\n'):
+        pos += len(line) + 1
+        if not zlib.crc32(line) & chunkmask and starts[-1] < pos < len(data):
+            starts.append(pos)
+    if starts[-1] < len(data):
+        starts.append(len(data))
+    crcs = array('I', [zlib.crc32(data[start:end]) & 0xffffffff
+                       for start, end in zip(starts, starts[1:])])
+    return starts, crcs
+
+# Markierung für gelöschte oder geänderte Blöcke::
+
+_dropped = 0xffffffff
+
+
+# WordIndex
+# ---------
+#
+# Index der Wortliste `wortliste` in der Datei `index`. Der Index wird beim
+# Öffnen erstellt oder aktualisiert (``update=False``: keine Prüfung).
+#
+# >>> import os, tempfile
+# >>> from wortindex import WordIndex
+# >>> tmpdir = tempfile.mkdtemp()
+# >>> path = os.path.join(tmpdir, 'wortliste')
+# >>> open(path, 'w').write('Aal;Aal\nAalbestand;Aal=be<stand # Test\n'
+# ...                       'aalen;aa-len\nAalen;Aa-len\n')
+# >>> words = WordIndex(path, os.path.join(tmpdir, 'wortliste-index'))
+# >>> print words.get(u'Aalbestand')
+# Aalbestand;Aal=be<stand # Test
+# >>> u'Aalbestand' in words, u'aalbestand' in words
+# (True, False)
+# >>> print words.get(u'Aalfang')
+# None
+#
+# Suche nach Groß- und Kleinschreibung (wie die Abfrage von `key`,
+# `key.lower()` und `key.title()`):
+#
+# >>> print words.lookup(u'AALBESTAND')
+# Aalbestand;Aal=be<stand # Test
+# >>> [unicode(entry) for entry in words.case_variants(u'AALEN')]
+# [u'aalen;aa-len', u'Aalen;Aa-len']
+#
+# Nach einer Änderung der Wortliste wird der Index aktualisiert (bei
+# großen Dateien nur für die geänderten Blöcke):
+#
+# >>> open(path, 'a').write('Aalfang;Aal=fang\n')
+# >>> words = WordIndex(path, os.path.join(tmpdir, 'wortliste-index'))
+# >>> print words[u'Aalfang']
+# Aalfang;Aal=fang
+#
+# ::
+
+class WordIndex(object):
+
+    def __init__(self, wortliste, index='wortliste-index', update=True):
+        self.wortliste = os.path.abspath(wortliste)
+        self.index = index
+        self.main = self.delta = None
+        if not (self.open() or update):
+            raise IOError('Index "%s" fehlt oder ist ungültig' % index)
+        if update:
+            self.update()
+
+# Öffne den Index (und falls vorhanden die Zusatzdatei). Gib `False`
+# zurück, wenn die Indexdatei fehlt oder ungültig ist::
+
+    def open(self):
+        try:
+            buf = _map(self.index)
+            end1 = buf.find('\n')
+            end2 = buf.find('\n', end1 + 1)
+            header = buf[:end1].split()
+            path = buf[end1+1:end2].decode('utf8')
+            if (header[:2] != ['wortindex', format_version]
+                or path != self.wortliste):
+                return False
+            self.stamp = header[2], int(header[3])
+            nchunks = int(header[4])
+        except (IOError, OSError, ValueError, TypeError, IndexError):
+            return False
+        offset = end2 + 1
+        self.chunk_starts = array('I', buf[offset:offset + 4*(nchunks+1)])
+        offset += 4*(nchunks+1)
+        self.chunk_crcs = array('I', buf[offset:offset + 4*nchunks])
+        offset += 4*nchunks
+        self.main = KeyTable(buf, offset)
+        self.data = _map(self.wortliste)
+        self.open_delta()
+        return True
+
+# Die Zusatzdatei enthält für jeden Block des Index den Anfang in der
+# aktuellen Wortliste (oder `_dropped`) und die Schlüsseltabelle der
+# geänderten Blöcke::
+
+    def open_delta(self):
+        self.delta = None
+        try:
+            buf = _map(self.index + '.delta')
+            end = buf.find('\n')
+            header = buf[:end].split()
+            if (header[:2] != ['wortindex-delta', format_version]
+                or int(header[4]) != len(self.chunk_crcs)):
+                return
+            self.delta_stamp = header[2], int(header[3])
+            offset = end + 1
+            self.remap = array('I', buf[offset:offset + 4*int(header[4])])
+            self.delta = KeyTable(buf, offset + 4*int(header[4]))
+        except (IOError, OSError, ValueError, TypeError, IndexError,
+                struct.error):
+            self.delta = None
+
+# Aktualisieren
+# ~~~~~~~~~~~~~
+#
+# Vergleiche Zeitstempel und Größe der Wortliste mit den im Index
+# gespeicherten Werten::
+
+    def update(self):
+        stamp = _stamp(self.wortliste)
+        if self.main is None:
+            return self.build()
+        if stamp == self.stamp:
+            if self.delta is not None:
+                _remove(self.index + '.delta')
+                self.delta = None
+            return
+        if self.delta is not None and self.delta_stamp == stamp:
+            return
+        self.data = data = _map(self.wortliste)
+
+# Vergleiche die Blöcke der aktuellen Wortliste mit denen des Index: Zeilen
+# in unveränderten Blöcken werden nur verschoben, die Schlüssel in
+# geänderten Blöcken neu indiziert::
+
+        starts, crcs = _chunks(data)
+        old_starts = self.chunk_starts
+        unchanged = dict(((crc, old_starts[k+1] - old_starts[k]), k)
+                         for k, crc in enumerate(self.chunk_crcs))
+        remap = array('I', [_dropped] * len(self.chunk_crcs))
+        records = []
+        changed = 0
+        for k, crc in enumerate(crcs):
+            start, end = starts[k], starts[k+1]
+            old = unchanged.pop((crc, end - start), None)
+            if old is None:
+                records.extend(key_records(data, start, end))
+                changed += end - start
+            else:
+                remap[old] = start
+        if changed > max_delta * len(data):
+            return self.build()
+        header = 'wortindex-delta %s %s %d %d\n' % (format_version, stamp[0],
+                                                  stamp[1], len(remap))
+        _write(self.index + '.delta',
+               header + remap.tostring() + pack_table(records))
+        self.open_delta()
+
+# Index vollständig neu erstellen::
+
+    def build(self):
+        stamp = _stamp(self.wortliste)
+        data = _map(self.wortliste)
+        starts, crcs = _chunks(data)
+        header = 'wortindex %s %s %d %d\n%s\n' % (format_version, stamp[0],
+                                stamp[1], len(crcs),
+                                self.wortliste.encode('utf8'))
+        _write(self.index, header + starts.tostring() + crcs.tostring()
+                           + pack_table(key_records(data)))
+        _remove(self.index + '.delta')
+        self.open()
+
+# Nachschlagen
+# ~~~~~~~~~~~~
+#
+# Zeilenpositionen in der aktuellen Wortliste aus Index und Zusatzdatei::
+
+    def _positions(self, key, folded=False):
+        key = key.encode('utf8')
+        if folded:
+            positions = self.main.folded_positions(key)
+        else:
+            positions = self.main.positions(key)
+        if self.delta is None:
+            return sorted(positions)
+        moved = self._moved(positions)
+        if folded:
+            moved += self.delta.folded_positions(key)
+        else:
+            moved += self.delta.positions(key)
+        return sorted(moved)
+
+# Positionen aus dem Index in der aktuellen Wortliste (Zeilen in geänderten
+# Blöcken entfallen)::
+
+    def _moved(self, positions):
+        starts, remap = self.chunk_starts, self.remap
+        moved = []
+        for pos in positions:
+            k = bisect.bisect_right(starts, pos) - 1
+            if remap[k] != _dropped:
+                moved.append(pos - starts[k] + remap[k])
+        return moved
+
+    def _entry(self, pos):
+        end = self.data.find('\n', pos)
+        if end < 0:
+            end = len(self.data)
+        return WordEntry(self.data[pos:end].decode('utf8'))
+
+# Alle Einträge mit Schlüssel `key` (in der Reihenfolge der Wortliste)::
+
+    def getall(self, key):
+        return [self._entry(pos) for pos in self._positions(key)]
+
+# Erster Eintrag mit Schlüssel `key` oder `default`::
+
+    def get(self, key, default=None):
+        positions = self._positions(key)
+        if positions:
+            return self._entry(positions[0])
+        return default
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __contains__(self, key):
+        return bool(self._positions(key))
+
+# Alle Einträge mit gleichem gefalteten Schlüssel (Varianten in
+# Groß-/Kleinschreibung und ß/ss)::
+
+    def variants(self, key):
+        return [self._entry(pos)
+                for pos in self._positions(fold_key(key), folded=True)]
+
+# Alle Einträge, deren Schlüssel kleingeschrieben ``key.lower()`` ist::
+
+    def case_variants(self, key):
+        key = key.lower()
+        return [entry for entry in self.variants(key)
+                if entry[0].lower() == key]
+
+# Eintrag für `key`, ``key.lower()`` oder ``key.title()`` (in dieser
+# Reihenfolge) oder `None`::
+
+    def lookup(self, key):
+        entries = dict((entry[0], entry) for entry in self.case_variants(key))
+        for probe in (key, key.lower(), key.title()):
+            if probe in entries:
+                return entries[probe]
+        return None
+
+# Doppeleinträge und Varianten
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+# Zeilenpositionen der Gruppen von Einträgen mit gleichem gefalteten
+# Schlüssel (Läufe in der sortierten Tabelle). Bei einer Zusatzdatei werden
+# die Läufe beider Tabellen zusammengeführt::
+
+    def _folded_groups(self):
+        runs = self.main.folded_runs()
+        if self.delta is not None:
+            runs = ((folded, self._moved(positions))
+                    for folded, positions in runs)
+            runs = heapq.merge(runs, self.delta.folded_runs())
+            runs = ((folded, sum((positions for f, positions in group), []))
+                    for folded, group in itertools.groupby(runs,
+                                                           lambda r: r[0]))
+        for folded, positions in runs:
+            if len(positions) > 1:
+                yield sorted(positions)
+
+# Doppeleinträge und Varianten in der Wortliste als Tupel (Art, Eintrag,
+# Vorbild), siehe `vergleiche`:
+#
+# >>> open(path, 'w').write('Masse;Mas-se\nmasse;mas-se\nMaße;Ma-ße\n'
+# ...                       'Messe;Mes-se\nMasse;Mas-se\n')
+# >>> words = WordIndex(path, os.path.join(tmpdir, 'wortliste-index'))
+# >>> for art, entry, vorbild in words.conflicts():
+# ...     print art, entry, vorbild
+# grossklein masse;mas-se Masse;Mas-se
+# ss Maße;Ma-ße Masse;Mas-se
+# doppelt Masse;Mas-se Masse;Mas-se
+#
+# ::
+
+    def conflicts(self):
+        for positions in self._folded_groups():
+            for conflict in vergleiche([self._entry(pos)
+                                        for pos in positions]):
+                yield conflict
+
+# Prüfe Neueinträge (`WordEntry` Instanzen) gegen den Index und
+# untereinander:
+#
+# >>> from wortliste import WordEntry
+# >>> neue = [WordEntry(u'MASSE;MAS-SE'), WordEntry(u'Aal;Aal'),
+# ...         WordEntry(u'Aal;Aal')]
+# >>> for art, entry, vorbild in words.check(neue):
+# ...     print art, entry, vorbild
+# grossklein MASSE;MAS-SE Masse;Mas-se
+# doppelt Aal;Aal Aal;Aal
+#
+# >>> import shutil; shutil.rmtree(tmpdir)
+#
+# ::
+
+    def check(self, entries):
+        neue = {}
+        for entry in entries:
+            folded = fold_key(entry[0])
+            vorhanden = self.variants(entry[0]) + neue.get(folded, [])
+            for conflict in vergleiche([entry], vorhanden):
+                yield conflict
+            neue.setdefault(folded, []).append(entry)
+
+
+# Gib für jeden Eintrag aus `entries`, dessen Schlüssel mit dem eines
+# vorhergehenden Eintrags (oder eines aus `vorige`) übereinstimmt, ein Tupel
+# (Art, Eintrag, Vorbild) aus. Art ist 'doppelt', 'grossklein' oder 'ss'
+# (siehe `wortliste.variante`), bei mehreren Vorbildern gilt die engste
+# Übereinstimmung::
+
+arten = ('doppelt', 'grossklein', 'ss')
+
+def vergleiche(entries, vorige=()):
+    vorige = list(vorige)
+    for entry in entries:
+        treffer = [(arten.index(art), art, other) for other, art in
+                   ((other, variante(entry[0], other[0])) for other in vorige)
+                   if art]
+        if treffer:
+            rang, art, vorbild = min(treffer, key=lambda t: t[0])
+            yield art, entry, vorbild
+        vorige.append(entry)
+
+
+# Hauptfunktion
+# -------------
+#
+# Erstelle/aktualisiere den Index und schlage die Argumente nach::
+
+if __name__ == '__main__':
+
+    import time
+
+# Pfad zu "../../../wortliste" unabhängig vom Arbeitsverzeichnis::
+
+    default_wortliste = os.path.relpath(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))),
+        'wortliste'))
+
+    usage = '%prog [Optionen] [Wort ...]\n' + __doc__
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-i', '--file', dest='wortliste',
+                      help='Wortliste, Vorgabe "%s"'%default_wortliste,
+                      default=default_wortliste)
+    parser.add_option('-x', '--index',
+                      help='Indexdatei, Vorgabe "wortliste-index"',
+                      default='wortliste-index')
+    parser.add_option('-r', '--rebuild', action="store_true", default=False,
+                      help='Index vollständig neu erstellen')
+    parser.add_option('-d', '--doppelte', action="store_true", default=False,
+                      help='Doppeleinträge und Varianten (Groß-/Klein-'
+                      'schreibung, ß/ss) der Wortliste auflisten')
+    parser.add_option('-c', '--check', metavar='DATEI',
+                      help='Neueinträge (ein Eintrag oder Wort pro Zeile) '
+                      'gegen den Index prüfen')
+    (options, args) = parser.parse_args()
+
+    # sys.stdout mit UTF8 encoding.
+    sys.stdout = codecs.getwriter('UTF-8')(sys.stdout)
+
+    start = time.time()
+    words = WordIndex(options.wortliste, options.index)
+    if options.rebuild:
+        words.build()
+    sys.stderr.write('Index: %.3f s\n' % (time.time() - start))
+
+    conflicts = []
+    if options.doppelte:
+        conflicts = words.conflicts()
+    elif options.check:
+        neue = []
+        for line in open(options.check):
+            line = line.decode('utf8').strip()
+            if not line or line.startswith(u'#'):
+                continue
+            if u';' not in line:
+                line = u'%s;%s' % (join_word(line), line)
+            neue.append(WordEntry(line))
+        conflicts = words.check(neue)
+    for art, entry, vorbild in conflicts:
+        print u'%s (%s: %s)' % (entry, art, vorbild)
+
+    for key in args:
+        key = key.decode('utf8')
+        entries = words.getall(key) or words.case_variants(key)
+        if not entries:
+            print u'# %s: nicht gefunden' % key
+        for entry in entries:
+            print unicode(entry)
@@ -25,10 +25,16 @@
 # ::
 
 import difflib
+import bisect
 import re
+from array import array
 import codecs
 import unicodedata
 
+# Leerzeichen am Zeilenende (siehe `WordFile.scan`)::
+
+_trailing_whitespace = re.compile(u'[ \t\r\x0b\x0c]+\n')
+
 # WordFile
 # ========
 #
@@ -49,13 +55,84 @@ class WordFile(file):
 # Die spezielle Funktion `__iter__` wird aufgerufen wenn über eine
 # Klasseninstanz iteriert wird.
 #
-# Liefer einen Iterator über die "geparsten" Zeilen (Datenfelder)::
+# Liefer einen Iterator über die "geparsten" Zeilen (Datenfelder).
+# Leerzeilen ergeben leere Einträge (und beenden die Iteration nicht)::
 
     def __iter__(self):
-        line = self.readline().rstrip().decode(self.encoding)
-        while line:
-            yield WordEntry(line)
-            line = self.readline().rstrip().decode(self.encoding)
+        return self.scan(lazy=False)
+
+# scan
+# ----
+#
+# Schneller Iterator über die Einträge: Die Datei wird in großen Blöcken
+# gelesen und blockweise dekodiert. Mit ``lazy=True`` werden `LazyEntry`
+# Instanzen geliefert, welche die Zeile erst beim Zugriff auf die
+# Datenfelder zerlegen.
+#
+# Filter (werden vor dem Erzeugen der Einträge angewendet):
+#
+# :lang:          nur Einträge mit Datenfeld für diese Sprachvariante(n)
+#                 (Komma-getrennte Liste, vgl. `WordEntry.get`),
+# :prefix:        nur Einträge, deren Schlüssel mit `prefix` beginnt,
+# :comment_lines: bei ``False`` Leerzeilen und reine Kommentarzeilen
+#                 übergehen.
+#
+# >>> import tempfile, os
+# >>> from wortliste import WordFile
+# >>> path = tempfile.mktemp()
+# >>> open(path, 'w').write('# Kopf\nAal;Aal\n\nabbeissen;-2-;-3-;-4-;-5-;'
+# ...                       'ab<bei-ssen;ab<beis-sen;ab<beis-sen\n'
+# ...                       'Aalbestand;Aal=be<stand # Test\n')
+# >>> [unicode(entry) for entry in WordFile(path)]
+# [u' # Kopf', u'Aal;Aal', u'', u'abbeissen;-2-;-3-;-4-;-5-;ab<bei-ssen;ab<beis-sen;ab<beis-sen', u'Aalbestand;Aal=be<stand # Test']
+# >>> [entry[0] for entry in WordFile(path).scan(comment_lines=False)]
+# [u'Aal', u'abbeissen', u'Aalbestand']
+# >>> [entry[0] for entry in WordFile(path).scan(prefix=u'Aal')]
+# [u'Aal', u'Aalbestand']
+# >>> [entry.get('de-CH-1901') for entry in WordFile(path).scan(lang='de-CH-1901')]
+# [u'Aal', u'ab<beis-sen', u'Aal=be<stand']
+# >>> os.remove(path)
+#
+# ::
+
+    def scan(self, lang=None, prefix=None, comment_lines=True, lazy=True,
+             blocksize=1<<20):
+        if lazy:
+            entry_class = LazyEntry
+        else:
+            entry_class = WordEntry
+        rest = ''
+        while True:
+            block = self.read(blocksize)
+            if block:
+                block = rest + block
+                end = block.rfind('\n') + 1
+                rest = block[end:]
+                text = block[:end].decode(self.encoding)
+                # wie `str.rstrip()` beim zeilenweisen Lesen:
+                for ws in u' \t\r\x0b\x0c':
+                    if ws + u'\n' in text:
+                        text = _trailing_whitespace.sub(u'\n', text)
+                        break
+                lines = text.split(u'\n')[:-1]
+            else:
+                lines = [rest.decode(self.encoding).rstrip(
+                                        u' \t\r\x0b\x0c')] if rest else []
+            if not comment_lines:
+                lines = [line for line in lines
+                         if line and not line.startswith(u'#')]
+            if prefix is not None:
+                lines = [line for line in lines if line.startswith(prefix)]
+            if lang is not None:
+                # Einträge mit zwei Feldern gelten für alle Sprachvarianten
+                lines = [line for line in lines
+                         if line.count(u';') == 1 and u'#' not in line
+                         or _Fields(line.split(u'#')[0].rstrip().split(u';')
+                                   ).get(lang) is not None]
+            for entry in map(entry_class, lines):
+                yield entry
+            if not block:
+                break
 
 # asdict
 # ------
@@ -113,9 +190,16 @@ class WordEntry(list):
 # Argumente
 # ---------
 #
-# Kommentare (aktualisiert, wenn Kommentar vorhanden)::
+# Die Attribute stehen in "slots" statt in einem `__dict__` pro Instanz
+# (spart ≅ 300 Bytes pro Eintrag):
+#
+# :delimiter: Trennzeichen der Datenfelder,
+# :comment:   Kommentar (leer, wenn kein Kommentar vorhanden),
+# :proposal:  Vorschlag (optional, z.B. in abgleich_neueintraege.py).
+#
+# ::
 
-    comment = u''
+    __slots__ = ('delimiter', 'comment', 'proposal')
 
 # Feldbelegung:
 #
@@ -158,6 +242,7 @@ class WordEntry(list):
 
     def __init__(self, line, delimiter=';'):
         self.delimiter = delimiter
+        self.comment = u''
 
 # eventuell vorhandenen Kommentar abtrennen und speichern::
 
@@ -170,6 +255,16 @@ class WordEntry(list):
 
         list.__init__(self, line.split(delimiter))
 
+# Zustand für `copy` und `pickle` (nötig wegen `__slots__`)::
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__
+                    if hasattr(self, name))
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            setattr(self, name, value)
+
 
 # Rückverwandlung in String
 # -----------------------------------
@@ -476,6 +571,215 @@ class WordEntry(list):
 
 
 
+
+
+# LazyEntry
+# =========
+#
+# Eintrag, der die Zeile erst beim Zugriff auf die Datenfelder (außer dem
+# Schlüssel) zerlegt, siehe `WordFile.scan`. Alle Attribute und Methoden
+# von `WordEntry` sind verfügbar:
+#
+# >>> from wortliste import LazyEntry
+# >>> entry = LazyEntry(u'Aalbestand;Aal=be<stand # Test')
+# >>> entry[0]
+# u'Aalbestand'
+# >>> entry.get('de-1901'), entry.comment
+# (u'Aal=be<stand', u' Test')
+# >>> print entry
+# Aalbestand;Aal=be<stand # Test
+# >>> entry == WordEntry(u'Aalbestand;Aal=be<stand')
+# True
+#
+# ::
+
+class LazyEntry(object):
+
+    __slots__ = ('line', '_entry')
+
+    def __init__(self, line):
+        self.line = line
+        self._entry = None
+
+# Der `WordEntry` (wird beim ersten Zugriff erzeugt)::
+
+    @property
+    def entry(self):
+        if self._entry is None:
+            self._entry = WordEntry(self.line)
+        return self._entry
+
+    def __getattr__(self, name):
+        return getattr(self.entry, name)
+
+    def __getitem__(self, i):
+        if i == 0 and self._entry is None:
+            key = self.line.split(u';', 1)[0]
+            if u'#' in key:
+                key = key.split(u'#')[0].rstrip()
+            return key
+        return self.entry[i]
+
+    def __setitem__(self, i, value):
+        self.entry[i] = value
+
+    def __len__(self):
+        return len(self.entry)
+
+    def __iter__(self):
+        return iter(self.entry)
+
+    def __eq__(self, other):
+        return self.entry == other
+
+    def __ne__(self, other):
+        return self.entry != other
+
+    def __unicode__(self):
+        if self._entry is None and u'#' not in self.line:
+            return self.line
+        return unicode(self.entry)
+
+    def __str__(self):
+        return unicode(self).encode('utf8')
+
+# Datenfelder ohne `WordEntry`-Instanz (für die Filter in `WordFile.scan`)::
+
+class _Fields(list):
+    sprachvarianten = WordEntry.sprachvarianten
+    lang_index = WordEntry.__dict__['lang_index']
+    get = WordEntry.__dict__['get']
+
+
+# WordTable
+# =========
+#
+# Speichersparender Container für viele Einträge (z.B. die ganze
+# Wortliste). Die Einträge werden spaltenweise gespeichert: die Zeilen als
+# UTF-8-kodierte Byte-Strings und die Schlüssellängen (in Bytes) in einem
+# `array`. Ein `WordEntry` wird erst beim Zugriff erzeugt, Änderungen
+# müssen mit ``table[i] = entry`` zurückgeschrieben werden.
+#
+# >>> from wortliste import WordTable
+# >>> table = WordTable([WordEntry(u'Aalbestand;Aal=be<stand # Test'),
+# ...                    WordEntry(u'auffrass;-2-;-3-;-4-;auf-frass')])
+# >>> len(table)
+# 2
+# >>> print table[0]
+# Aalbestand;Aal=be<stand # Test
+# >>> table.key(1)
+# u'auffrass'
+# >>> table.find(u'auffrass')
+# 1
+# >>> print table.find(u'Auffrass')
+# None
+#
+# Die Einträge bieten alle Methoden von `WordEntry`:
+#
+# >>> entry = table[1]
+# >>> entry.get('de-1996-x-GROSS')
+# u'auf-frass'
+# >>> entry.expand_fields()
+# >>> table[1] = entry
+# >>> print table[1]
+# auffrass;-2-;-3-;-4-;auf-frass;auf-frass;auf-frass;auf-frass
+#
+# ::
+
+class WordTable(object):
+
+    encoding = 'utf8'
+
+    def __init__(self, entries=()):
+        self.rows = []                # Zeilen (Byte-Strings)
+        self.keylengths = array('I')  # Länge der Schlüssel in Bytes
+        self._index = None            # Schlüssel -> Zeilennummer
+        self.extend(entries)
+
+# Einlesen einer Datei im Format der Wortliste, ohne `WordEntry`-Instanzen
+# zu erzeugen::
+
+    @classmethod
+    def fromfile(cls, path):
+        table = cls()
+        f = open(path)
+        try:
+            rows = [line.rstrip() for line in f.read().split('\n')]
+        finally:
+            f.close()
+        if rows and not rows[-1]:
+            rows.pop() # Zeilenende am Dateiende
+        table.rows = rows
+        table.keylengths = array('I', [_keylength(row) for row in rows])
+        return table
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return WordEntry(self.rows[i].decode(self.encoding))
+
+    def __setitem__(self, i, entry):
+        self.rows[i], self.keylengths[i] = self._encode(entry)
+        self._index = None
+
+    def __iter__(self):
+        for row in self.rows:
+            yield WordEntry(row.decode(self.encoding))
+
+    def _encode(self, entry):
+        return (unicode(entry).encode(self.encoding),
+                len(entry[0].encode(self.encoding)))
+
+    def append(self, entry):
+        row, keylength = self._encode(entry)
+        self.rows.append(row)
+        self.keylengths.append(keylength)
+        self._index = None
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+# Ungetrenntes Wort (erstes Feld) des Eintrags `i`::
+
+    def key(self, i):
+        return self.rows[i][:self.keylengths[i]].decode(self.encoding)
+
+# Nummer des (ersten) Eintrags mit Schlüssel `key` oder `None`. Das
+# Verzeichnis der Schlüssel wird beim ersten Aufruf erstellt::
+
+    def find(self, key):
+        if self._index is None:
+            self._index = {}
+            for i in range(len(self.rows)-1, -1, -1):
+                self._index[self.rows[i][:self.keylengths[i]]] = i
+        return self._index.get(key.encode(self.encoding))
+
+# Schreibe die Einträge in die Datei `destination`::
+
+    def write(self, destination):
+        outfile = open(destination, 'w')
+        try:
+            for row in self.rows:
+                outfile.write(row + '\n')
+        finally:
+            outfile.close()
+
+# Länge des Schlüssels (in Bytes) einer Zeile wie in `WordEntry.__init__`
+# (Felder vor einem eventuellen Kommentar)::
+
+def _keylength(line):
+    semi = line.find(';')
+    comment = line.find('#')
+    if comment < 0 or 0 <= semi < comment:
+        return semi if semi >= 0 else len(line)
+    return len(line[:comment].rstrip())
+
+
+
 # Funktionen
 # ==========
 #
@@ -976,6 +1280,253 @@ def udiff(a, b, fromfile='', tofile='',
         return None
 
 
+# keyed_udiff
+# -----------
+#
+# Wie `udiff`, aber für zwei nach `key` sortierte Sequenzen von
+# `WordEntries` (z.B. Wortliste vor und nach einer Korrektur). Statt des
+# heuristischen, im ungünstigen Fall mehr als linearen Abgleichs von
+# `difflib` werden die Sequenzen in einem Durchgang zusammengeführt
+# ("merge join"):
+#
+# * gleiche Zeilen werden einander zugeordnet,
+# * bei verschiedenen Zeilen wird die mit dem kleineren Sortierschlüssel
+#   entfernt bzw. eingefügt,
+# * Gruppen von Zeilen mit gleichem Schlüssel werden mit `difflib`
+#   abgeglichen.
+#
+# Sortierschlüssel werden nur für verschiedene Zeilen berechnet, Zeilen
+# nur für verschiedene Einträge (ein unveränderter Eintrag ist meist
+# dasselbe Objekt in beiden Sequenzen) und für den Patch kodiert. Ist eine
+# der Sequenzen an den Vergleichsstellen nicht sortiert, wird `udiff`
+# verwendet.
+#
+# >>> from wortliste import keyed_udiff
+# >>> alt = [WordEntry(u'Aal;Aal'), WordEntry(u'Abbau;Ab<bau'),
+# ...        WordEntry(u'Abend;Abend')]
+# >>> neu = [WordEntry(u'Aal;Aal'), WordEntry(u'abbauen;ab<bau-en'),
+# ...        WordEntry(u'Abend;Abend'), WordEntry(u'Abende;Aben-de')]
+# >>> print keyed_udiff(alt, neu, 'alt', 'neu')
+# --- alt
+# +++ neu
+# @@ -1,3 +1,4 @@
+#  Aal;Aal
+# -Abbau;Ab<bau
+# +abbauen;ab<bau-en
+#  Abend;Abend
+# +Abende;Aben-de
+# >>> keyed_udiff(alt, neu) == udiff(alt, neu)
+# True
+#
+# ::
+
+def keyed_udiff(a, b, fromfile='', tofile='',
+                fromfiledate='', tofiledate='', n=1, encoding='utf8',
+                key=sortkey_duden):
+
+    lines_a = _EncodedLines(a, encoding)
+    lines_b = _EncodedLines(b, encoding)
+
+    matches = _keyed_matches(a, b, lines_a, lines_b, key)
+    if matches is None: # nicht sortiert
+        return udiff(a, b, fromfile, tofile, fromfiledate, tofiledate,
+                     n, encoding)
+    opcodes = matching_opcodes(matches, len(lines_a), len(lines_b))
+    return '\n'.join(format_udiff(lines_a, lines_b, opcodes,
+                                  fromfile, tofile,
+                                  fromfiledate, tofiledate, n))
+
+# Gib eine Liste zugeordneter Indexpaare zurück (`None`, falls die
+# Sortierung verletzt ist)::
+
+class _Unsorted(Exception):
+    pass
+
+class _EncodedLines(object):
+    """Kodierte Zeilen einer Sequenz, bei Bedarf berechnet."""
+
+    def __init__(self, entries, encoding):
+        self.entries = entries
+        self.encoding = encoding
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [unicode(entry).encode(self.encoding)
+                    for entry in self.entries[i]]
+        return unicode(self.entries[i]).encode(self.encoding)
+
+class _KeyColumn(object):
+    """Sortierschlüssel einer Sequenz, bei Bedarf berechnet."""
+
+    def __init__(self, entries, key):
+        self.entries = entries
+        self.key = key
+        self.keys = {}
+        self.last = None  # zuletzt berechneter Schlüssel
+
+    def __getitem__(self, i):
+        try:
+            return self.keys[i]
+        except KeyError:
+            pass
+        key = self.keys[i] = self.key(self.entries[i])
+        if self.last is not None and key < self.last:
+            raise _Unsorted
+        self.last = key
+        return key
+
+def _keyed_matches(a, b, lines_a, lines_b, key):
+    keys_a = _KeyColumn(a, key)
+    keys_b = _KeyColumn(b, key)
+    len_a, len_b = len(lines_a), len(lines_b)
+    matches = []
+    i = j = 0
+    try:
+        while i < len_a and j < len_b:
+            if a[i] is b[j] or lines_a[i] == lines_b[j]:
+                matches.append((i, j))
+                i += 1
+                j += 1
+                continue
+            key_a, key_b = keys_a[i], keys_b[j]
+            if key_a < key_b:
+                i += 1
+            elif key_b < key_a:
+                j += 1
+            else: # Gruppen mit gleichem Schlüssel
+                i2, j2 = i + 1, j + 1
+                while i2 < len_a and keys_a[i2] == key_a:
+                    i2 += 1
+                while j2 < len_b and keys_b[j2] == key_b:
+                    j2 += 1
+                matcher = difflib.SequenceMatcher(None, lines_a[i:i2],
+                                                  lines_b[j:j2])
+                for x, y, size in matcher.get_matching_blocks():
+                    matches.extend((i+x+k, j+y+k) for k in range(size))
+                i, j = i2, j2
+    except _Unsorted:
+        return None
+    return matches
+
+
+# unified diff aus bekannten Übereinstimmungen
+# --------------------------------------------
+#
+# Ist bekannt, welche Zeilen zweier Sequenzen einander entsprechen (z.B.
+# beim Umsortieren oder beim Vergleich sortierter Listen), ist ein Abgleich
+# mit `difflib` unnötig.
+#
+# `matching_opcodes` wandelt eine (in `i` und `j` aufsteigende) Folge von
+# Indexpaaren ``(i, j)`` mit ``a[i] == b[j]`` in Operationscodes im Format
+# von `difflib.SequenceMatcher.get_opcodes` um::
+#
+# >>> from wortliste import matching_opcodes
+# >>> matching_opcodes([(0, 0), (1, 1), (3, 2)], 4, 4)
+# [('equal', 0, 2, 0, 2), ('delete', 2, 3, 2, 2), ('equal', 3, 4, 2, 3), ('insert', 4, 4, 3, 4)]
+#
+# ::
+
+def matching_opcodes(matches, len_a, len_b):
+    opcodes = []
+    i = j = 0
+    for mi, mj in matches + [(len_a, len_b)]:
+        if i < mi and j < mj:
+            opcodes.append(('replace', i, mi, j, mj))
+        elif i < mi:
+            opcodes.append(('delete', i, mi, j, j))
+        elif j < mj:
+            opcodes.append(('insert', i, i, j, mj))
+        if mi == len_a:
+            break
+        if opcodes and opcodes[-1][0] == 'equal':
+            opcodes[-1] = ('equal', opcodes[-1][1], mi+1,
+                           opcodes[-1][3], mj+1)
+        else:
+            opcodes.append(('equal', mi, mi+1, mj, mj+1))
+        i, j = mi+1, mj+1
+    return opcodes
+
+# `format_udiff` erzeugt aus den Operationscodes einen "unified diff" (wie
+# `difflib.unified_diff`, Zeilen ohne Zeilenende)::
+
+class _OpcodeMatcher(difflib.SequenceMatcher):
+    """`SequenceMatcher` mit vorgegebenen Operationscodes."""
+
+    def __init__(self, opcodes):
+        self.opcodes = opcodes
+
+    def get_opcodes(self):
+        return list(self.opcodes) # wird von `get_grouped_opcodes` geändert
+
+def _format_range(start, stop):
+    length = stop - start
+    if length == 1:
+        return '%d' % (start + 1)
+    if not length:
+        start -= 1 # leerer Bereich beginnt vor der ersten Zeile
+    return '%d,%d' % (start + 1, length)
+
+def format_udiff(a, b, opcodes, fromfile='', tofile='',
+                 fromfiledate='', tofiledate='', n=1):
+    started = False
+    for group in _OpcodeMatcher(opcodes).get_grouped_opcodes(n):
+        if not started:
+            started = True
+            yield '--- %s%s' % (fromfile, fromfiledate and '\t'+fromfiledate)
+            yield '+++ %s%s' % (tofile, tofiledate and '\t'+tofiledate)
+        first, last = group[0], group[-1]
+        yield '@@ -%s +%s @@' % (_format_range(first[1], last[2]),
+                                 _format_range(first[3], last[4]))
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+# Gib die Indizes der Elemente von `seq` zurück, die nicht zu einer
+# längsten aufsteigenden Teilfolge gehören (z.B. verschobene Zeilen einer
+# sonst sortierten Liste)::
+#
+# >>> from wortliste import out_of_order
+# >>> out_of_order([0, 5, 2, 3, 4, 1, 6])
+# [1, 5]
+#
+# ::
+
+def out_of_order(seq):
+    tails = []       # kleinster Endwert einer Teilfolge der Länge k+1
+    tail_index = []  # Index dieses Endwerts in `seq`
+    previous = [None] * len(seq)
+    for j, value in enumerate(seq):
+        if not tails or value > tails[-1]:
+            k = len(tails) # schneller Pfad für fast sortierte Folgen
+        else:
+            k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(j)
+        else:
+            tails[k] = value
+            tail_index[k] = j
+        if k:
+            previous[j] = tail_index[k-1]
+    in_order = [False] * len(seq)
+    j = tail_index[-1] if tail_index else None
+    while j is not None:
+        in_order[j] = True
+        j = previous[j]
+    return [j for j, ok in enumerate(in_order) if not ok]
+
+
 def test_keys(wortliste):
     """Teste Übereinstimmung des ungetrennten Wortes in Feld 1
     mit den Trennmustern nach Entfernen der Trennmarker.
@@ -1000,6 +1551,42 @@ def test_keys(wortliste):
     return is_OK
 
 
+# Doppeleinträge und Varianten
+# ----------------------------
+#
+# Schlüssel, die sich nur in Groß-/Kleinschreibung oder in der Schreibung
+# ß/ss unterscheiden, haben denselben "gefalteten" Schlüssel:
+#
+# >>> from wortliste import fold_key, variante
+# >>> print fold_key(u'Ma\xdfe'), fold_key(u'MASSE')
+# masse masse
+#
+# ::
+
+def fold_key(key):
+    return key.lower().replace(u'ß', u'ss')
+
+# Art der Übereinstimmung zweier Schlüssel: 'doppelt' (gleich),
+# 'grossklein' (nur Groß-/Kleinschreibung verschieden), 'ss' (Schreibung
+# ß/ss verschieden) oder None:
+#
+# >>> variante(u'Masse', u'Masse'), variante(u'Masse', u'masse')
+# ('doppelt', 'grossklein')
+# >>> variante(u'Masse', u'Ma\xdfe'), variante(u'Masse', u'Messe')
+# ('ss', None)
+#
+# ::
+
+def variante(key, other):
+    if key == other:
+        return 'doppelt'
+    if key.lower() == other.lower():
+        return 'grossklein'
+    if fold_key(key) == fold_key(other):
+        return 'ss'
+    return None
+
+
 # Test
 # ====
 #
@@ -1044,21 +1631,25 @@ if __name__ == '__main__':
         print u"OK",
     print
 
-# Doppeleinträge::
+# Doppeleinträge und ß/ss-Varianten (über den Index der gefalteten
+# Schlüssel, siehe wortindex.py)::
 
-    doppelte = 0
-    words = set()
-    for entry in wortliste:
-        key = entry[0].lower()
-        if key in words:
+    from wortindex import WordIndex
+
+    doppelte = varianten = 0
+    for art, entry, vorbild in WordIndex('../../../wortliste').conflicts():
+        print u'%s (%s: %s)' % (entry, art, vorbild)
+        if art == 'ss':
+            varianten += 1
+        else:
             doppelte += 1
-            print unicode(entry)
-        words.add(key)
     print doppelte,
     print u"Doppeleinträge (ohne Berücksichtigung der Großschreibung)."
     if doppelte:
         print u"  Entfernen mit `prepare-patch.py doppelte`."
         print u"  Patch vor Anwendung durchsehen!"
+    print varianten, u"Einträge, die sich nur in der Schreibung ß/ss",
+    print u"unterscheiden."
 
 
 # Ein Wörterbuch (dict Instanz)::
@@ -13,4 +13,13 @@
 # long_s_conversion.py
 #   Rund-S nach Lang-S Wandlung über "hyphenation patterns".
 #
+# long_s_hyphenation.py
+#   Lang-S Wandlung und Silbentrennung in einem Durchlauf.
+#
+# evaluate.py
+#   Bewertung von Trennmustern anhand der Wortliste (JSON-Bericht).
+#
+# patgen.py
+#   Generierung von Trennmustern wie mit `patgen`, auch inkrementell.
+#
 # ============================================================
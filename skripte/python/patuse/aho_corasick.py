@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Aho-Corasick automaton for the hyphenation patterns.
+
+    `PatternTree.points()` and `PackedTrie.points()` restart the trie walk
+    at every position of the word (cost: word length times pattern
+    length). A `PatternAutomaton` finds all pattern occurrences in one
+    left-to-right pass:
+
+    * `goto[s]` maps characters to the child states of state `s` (the
+      nodes of the pattern trie, numbered breadth-first, 0 is the root),
+    * `fail[s]` is the state of the longest proper suffix of the path to
+      `s` that is also a path in the trie (failure link),
+    * `output[s]` is an index into the list of (interned) point vectors:
+      the maximum of the points of all patterns ending in state `s` or in
+      a state on its chain of failure links. Offsets are relative to the
+      position after the last matched character.
+
+    >>> from hyphenation import PatternTree
+    >>> automaton = PatternAutomaton(PatternTree([u'1ba', u'a1b', u'2bc']).root)
+    >>> automaton.points(u'.abc.')
+    [0, 0, 2, 0, 0, 0]
+    >>> automaton.points(u'.abc.') == PatternTree([u'1ba', u'a1b', u'2bc']).points(u'.abc.')
+    True
+
+    Command-line usage: ``./aho_corasick.py pattern-file [wordlist]``
+    compares the points of the automaton and of the `PatternTree` for all
+    words (first field of the "wortliste" format).
+"""
+
+import sys
+
+class PatternAutomaton(object):
+
+    def __init__(self, tree=None):
+        self.goto = [{}]      # state -> {character: state}
+        self.fail = [0]       # state -> state
+        self.output = [0]     # state -> index into `vectors`
+        self.vectors = [()]   # interned point vectors
+        if tree is not None:
+            self.compile(tree)
+
+    def compile(self, tree):
+        """Build the automaton from a `PatternTree` root (nested
+        dictionaries, point lists stored under the key `None`).
+        """
+        goto, fail, output = [{}], [0], [0]
+        vectors = [()]
+        interned = {(): 0}
+        merged = [{}]         # state -> {offset: point} (while building)
+
+        # Breadth-first, so the failure link of a state (a shorter path)
+        # is complete before the state is processed.
+        queue = [(tree, 0, 0)]
+        for t, s, depth in queue:
+            for c in sorted(c for c in t if c is not None):
+                sub = t[c]
+                child = len(goto)
+                goto[s][c] = child
+                goto.append({})
+                # failure link
+                if s:
+                    f = fail[s]
+                    while f and c not in goto[f]:
+                        f = fail[f]
+                    f = goto[f].get(c, 0)
+                else:
+                    f = 0
+                fail.append(f)
+                # points: own pattern and patterns of the failure link
+                points = dict(merged[f])
+                if None in sub:
+                    length = depth + 1
+                    for j, p in enumerate(sub[None]):
+                        if p > points.get(j - length, 0):
+                            points[j - length] = p
+                merged.append(points)
+                vector = tuple(sorted(points.items()))
+                if vector not in interned:
+                    interned[vector] = len(vectors)
+                    vectors.append(vector)
+                output.append(interned[vector])
+                queue.append((sub, child, depth + 1))
+
+        self.goto, self.fail, self.output = goto, fail, output
+        self.vectors = vectors
+
+    def dump(self):
+        """Return the automaton as `marshal`-able data
+        (see pattern_cache.py).
+        """
+        return (self.goto, self.fail, self.output, tuple(self.vectors))
+
+    @classmethod
+    def load(cls, data):
+        """Return a `PatternAutomaton` with data from `dump()`."""
+        automaton = cls()
+        goto, fail, output, vectors = data
+        automaton.goto, automaton.fail = goto, fail
+        automaton.output, automaton.vectors = output, list(vectors)
+        return automaton
+
+    def points(self, work):
+        """Return the list of maximal points for all patterns matching
+        in `work` (the lowercased word with '.' at both ends).
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        vectors = self.vectors
+        points = [0] * (len(work)+1)
+        s = 0
+        end = 1 # position after the current character
+        for c in work:
+            while True:
+                t = goto[s].get(c)
+                if t is not None:
+                    s = t
+                    break
+                if not s:
+                    break
+                s = fail[s]
+            if output[s]:
+                for j, p in vectors[output[s]]:
+                    if p > points[end+j]:
+                        points[end+j] = p
+            end += 1
+        return points
+
+
+# Equivalence check
+# -----------------
+#
+# Compare the points of the automaton and of the `PatternTree` for all words
+# of a word list. Return the number of words and the list of words with
+# different points::
+
+def compare(tree, words):
+    automaton = PatternAutomaton(tree.root)
+    count = 0
+    differences = []
+    for word in words:
+        work = u'.' + word.lower() + u'.'
+        if automaton.points(work) != tree.points(work):
+            differences.append(word)
+        count += 1
+    return count, differences
+
+
+if __name__ == '__main__':
+
+    import os, optparse
+    from hyphenation import Hyphenator
+
+    wortliste = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '../../../wortliste')
+    usage = u'%prog [options] pattern-file [wordlist]\n\n' + __doc__
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('--encoding', default='utf8',
+                      help='encoding of the pattern file, default "utf8"')
+    (options, args) = parser.parse_args()
+    if not args:
+        parser.error('pattern file missing')
+
+    tree = Hyphenator(args[0], engine='tree', encoding=options.encoding).tree
+    words = (line.split(';')[0].split('#')[0].strip().decode('utf8')
+             for line in open(len(args) > 1 and args[1] or wortliste))
+    count, differences = compare(tree, (word for word in words if word))
+    for word in differences:
+        print word.encode('utf8')
+    print '%d words, %d differences' % (count, len(differences))
+    if differences:
+        sys.exit(1)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+# benchmark.py: Vergleich der Pattern-Engines des Hyphenator
+# ==========================================================
+
+u"""Vergleiche Geschwindigkeit (Wörter/Sekunde) und Speicherbedarf
+(zusätzlicher residenter Speicher nach dem Laden der Trennmuster und
+Größe der Datenstruktur) der Pattern-Engines von `hyphenation.Hyphenator`.
+
+Eingabe: Wortliste-Datei oder Liste mit einem Wort pro Zeile
+         (Vorgabe: die `Wortliste`).
+
+Jede Engine wird in einem eigenen Prozess gemessen. Abweichende
+Trennergebnisse werden gemeldet.
+
+Mit der Option ``--jobs N`` wird zusätzlich die Skalierung der parallelen
+Textverarbeitung (``hyphenation.py --jobs``) mit 1 bis N Prozessen
+gemessen (Engine: erste der mit ``--engines`` gewählten).
+
+Mit der Option ``--numpy N`` wird `Hyphenator.split_word()` (Wort für
+Wort) mit dem NumPy-Pfad `Hyphenator.split_words()` (vectorized.py) für
+N Token (Vorgabe 1000000, Wörter der Liste wiederholt) verglichen.
+"""
+
+import sys, os, codecs, glob, time, zlib, optparse
+import multiprocessing
+
+from hyphenation import Hyphenator, engines, hyphenate_parallel
+import vectorized
+
+# Konfiguration
+# -------------
+
+# Die neuesten Pattern-Dateien welche über "make pattern-refo" im
+# Wurzelverzeichnis der wortliste generiert werden, sonst die
+# englischen Trennmuster::
+
+basedir = os.path.dirname(os.path.abspath(__file__))
+pfiles = (glob.glob(os.path.join(basedir,
+                                 '../../../dehyphn-x/dehyphn-x-*.pat'))
+          or [os.path.join(basedir, 'en-US.pat')])
+default_pfile = os.path.relpath(sorted(pfiles)[-1])
+default_wortliste = os.path.relpath(os.path.join(basedir, '../../../wortliste'))
+
+# Hilfsfunktionen
+# ---------------
+
+# Lies die Wörter (erstes Feld, ohne Kommentar) aus einer Datei::
+
+def read_words(path, max_words=0):
+    words = []
+    for line in open(path):
+        word = line.split(';')[0].split('#')[0].strip()
+        if word:
+            words.append(word.decode('utf8'))
+            if len(words) == max_words:
+                break
+    return words
+
+# Residenter Speicher des aktuellen Prozesses in kB::
+
+def rss():
+    try:
+        for line in open('/proc/self/status'):
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    except IOError:
+        import resource # nur Maximalwert verfügbar
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Speicherbedarf einer Datenstruktur in kB (Summe über alle erreichbaren
+# Container und Werte, gemeinsam genutzte Objekte einfach gezählt)::
+
+def sizeof(obj):
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.iterkeys())
+            stack.extend(obj.itervalues())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+    return size // 1024
+
+# Messung für eine Engine (im Kindprozess)::
+
+def measure(pattern_file, engine, words, queue):
+    mem = rss()
+    start = time.time()
+    hyphenator = Hyphenator(pattern_file, engine=engine)
+    load_time = time.time() - start
+    mem = rss() - mem
+    size = sizeof(hyphenator.tree)
+
+    start = time.time()
+    checksum = 0
+    for word in words:
+        checksum = zlib.crc32(
+            hyphenator.hyphenate_word(word, u'-').encode('utf8'), checksum)
+    run_time = time.time() - start
+
+    queue.put((load_time, mem, size, len(words)/run_time, checksum))
+
+def run_benchmark(pattern_file, engine, words):
+    """Messe `engine` in einem eigenen Prozess. Gib ein Tupel
+    (Ladezeit, RSS-Zuwachs in kB, Größe der Struktur in kB,
+    Wörter/Sekunde, Prüfsumme) zurück."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure,
+                            args=(pattern_file, engine, words, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+# Skalierung der parallelen Verarbeitung: Gib eine Liste mit (Zahl der
+# Prozesse, Zeilen/Sekunde) zurück. Die Wörter werden zu Zeilen mit je
+# 10 Wörtern zusammengefasst, das Wortgedächtnis ist abgeschaltet::
+
+def run_scaling(pattern_file, engine, words, max_jobs):
+    hyphenator = Hyphenator(pattern_file, engine=engine, cache_size=0)
+    lines = [u' '.join(words[i:i+10]) for i in range(0, len(words), 10)]
+    results = []
+    for jobs in range(1, max_jobs+1):
+        start = time.time()
+        if jobs == 1:
+            output = list(hyphenator.hyphenate_stream(lines, u'-'))
+        else:
+            output = list(hyphenate_parallel(hyphenator, lines, jobs,
+                                             u'-', chunk_size=200))
+        results.append((jobs, len(output)/(time.time() - start)))
+    return results
+
+# Skalare und vektorisierte Trennung von `n_tokens` Token (Wiederholung der
+# Wörter): Gib (Token/Sekunde skalar, Token/Sekunde NumPy, Zahl der
+# abweichenden Ergebnisse) zurück::
+
+def run_vectorized(pattern_file, words, n_tokens):
+    hyphenator = Hyphenator(pattern_file, engine='packed')
+    tokens = (words * (n_tokens // len(words) + 1))[:n_tokens]
+    start = time.time()
+    scalar = [hyphenator.split_word(token) for token in tokens]
+    scalar_speed = len(tokens)/(time.time() - start)
+    start = time.time()
+    vector = hyphenator.split_words(tokens)
+    vector_speed = len(tokens)/(time.time() - start)
+    differences = sum(a != b for a, b in zip(scalar, vector))
+    return scalar_speed, vector_speed, differences
+
+
+if __name__ == '__main__':
+
+    usage = u'%prog [Optionen] [Wortliste]\n\n' + __doc__
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-f', '--pattern-file',
+                      help='Pattern-Datei, Vorgabe "%s"' % default_pfile,
+                      default=default_pfile)
+    parser.add_option('-e', '--engines',
+                      help='Komma-getrennte Liste der Engines, '
+                      'Vorgabe "%s"' % ','.join(sorted(engines)),
+                      default=','.join(sorted(engines)))
+    parser.add_option('-n', '--max-words', type='int', default=0,
+                      help=u'Höchstzahl der Testwörter, Vorgabe 0 (alle)')
+    parser.add_option('-j', '--jobs', type='int', default=0,
+                      help=u'Skalierung mit 1 bis JOBS Prozessen messen')
+    parser.add_option('--numpy', type='int', metavar='N', default=0,
+                      help=u'skalare und NumPy-Trennung von N Token '
+                      u'vergleichen (z.B. 1000000)')
+
+    (options, args) = parser.parse_args()
+
+    # sys.stdout mit UTF8 encoding.
+    sys.stdout = codecs.getwriter('UTF-8')(sys.stdout)
+
+    words = read_words(args and args[0] or default_wortliste,
+                       options.max_words)
+
+    print u'Pattern-Datei:', options.pattern_file
+    print len(words), u'Wörter'
+    print
+    print u'%-8s %10s %12s %12s %12s' % (u'Engine', u'Laden/s', u'RSS/kB',
+                                         u'Struktur/kB', u'Wörter/s')
+
+    checksums = {}
+    for engine in options.engines.split(','):
+        load_time, mem, size, speed, checksum = run_benchmark(
+                                        options.pattern_file, engine, words)
+        print u'%-8s %10.3f %12d %12d %12.0f' % (engine, load_time, mem,
+                                                 size, speed)
+        checksums[engine] = checksum
+
+    if options.jobs:
+        engine = options.engines.split(',')[0]
+        print
+        print u'Parallele Verarbeitung (Engine %s):' % engine
+        print u'%-8s %12s %10s' % (u'Prozesse', u'Zeilen/s', u'Faktor')
+        results = run_scaling(options.pattern_file, engine, words,
+                              options.jobs)
+        for jobs, speed in results:
+            print u'%-8d %12.0f %10.2f' % (jobs, speed, speed/results[0][1])
+
+    if options.numpy:
+        print
+        if not vectorized.available:
+            print u'NumPy-Pfad: NumPy nicht installiert.'
+        else:
+            scalar_speed, vector_speed, differences = run_vectorized(
+                options.pattern_file, words, options.numpy)
+            print u'NumPy-Pfad (Engine packed, %d Token):' % options.numpy
+            print u'%-8s %12s %10s' % (u'', u'Token/s', u'Faktor')
+            print u'%-8s %12.0f %10.2f' % (u'skalar', scalar_speed, 1)
+            print u'%-8s %12.0f %10.2f' % (u'NumPy', vector_speed,
+                                           vector_speed/scalar_speed)
+            if differences:
+                print u'Achtung: %d abweichende Trennergebnisse!' % differences
+                sys.exit(1)
+
+    if len(set(checksums.values())) > 1:
+        print
+        print u'Achtung: unterschiedliche Trennergebnisse!'
+        sys.exit(1)
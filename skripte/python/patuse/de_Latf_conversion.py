@@ -10,8 +10,9 @@
 
 u"""Rund-S nach Lang-S Wandlung über "hyphenation patterns"."""
 
-import sys, codecs, re, optparse
+import sys, codecs, optparse
 from hyphenation import Hyphenator
+from textstream import transform_text, transform_file
 
 
 # Konfiguration
@@ -57,16 +58,10 @@ def transformiere(wort, hyphenator):
 
     return u''.join(parts)
 
+# Text wortweise konvertieren (siehe textstream.py)::
+
 def transformiere_text(text, hyphenator):
-    # Text zerlegen: finde (ggf. leere) Folgen von nicht-Wort-Zeichen
-    # gefolgt von Wort-Zeichen. Der Iterator liefert Match-Objekte, mit
-    # den Untergruppen 0: nicht-Wort und 1: Wort.
-    it = re.finditer(r"([\W0-9_]*)(\w*)", text, flags=re.UNICODE)
-    # Konvertierung und Zusammenfügen
-    parts = [match.groups()[0] # nicht-Wort Zeichen
-             + transformiere(match.groups()[1], hyphenator)
-             for match in it]
-    return u''.join(parts)
+    return transform_text(text, lambda wort: transformiere(wort, hyphenator))
 
 if __name__ == '__main__':
 
@@ -76,6 +71,9 @@ if __name__ == '__main__':
     parser.add_option('-f', '--pattern-file', dest='pattern_file',
                       help='Pattern file, Default "%s"' % default_pfile,
                       default=default_pfile)
+    parser.add_option('--no-cache', dest='cache', action="store_false",
+                      default=True, help='Trennmuster nicht aus dem Cache '
+                      'laden (siehe pattern_cache.py).')
     parser.add_option('-t', '--test', action="store_true", default=False,
                       help='Vergleiche Eingabe mit Rekonstruktion, '
                       'Melde Differenzen.')
@@ -83,7 +81,13 @@ if __name__ == '__main__':
     (options, args) = parser.parse_args()
     
 
-    h_Latf = Hyphenator(options.pattern_file)
+    h_Latf = Hyphenator(options.pattern_file, cache=options.cache)
+
+    # Standardeingabe blockweise konvertieren und ausgeben:
+    if len(args) == 0 and not options.test:
+        transform_file(sys.stdin, sys.stdout,
+                       lambda wort: transformiere(wort, h_Latf))
+        sys.exit()
 
     # sys.stdout mit UTF8 encoding.
     sys.stdout = codecs.getwriter('utf8')(sys.stdout)
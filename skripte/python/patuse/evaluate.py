@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+# evaluate.py: Bewertung von Trennmustern anhand der Wortliste
+# ============================================================
+
+u"""Bewerte Trennmuster anhand der Wortliste.
+
+Trennt die Wörter einer Sprachvariante der Wortliste mit
+`hyphenation.Hyphenator` und vergleicht mit den Trennstellen der Liste.
+Gezählt werden für jede Kategorie der Trennstellen der Wortliste
+
+  =  Wortfuge (auch "==", "<=", "=>"),
+  <  nach Präfix,
+  >  vor Suffix,
+  -  einfache Trennstelle,
+  ·  ungewichtete Trennstelle,
+
+die gefundenen ("good") und nicht gefundenen ("missed") Trennstellen sowie
+die falschen ("bad"): Trennstellen der Muster an als unerwünscht markierten
+Stellen (z.B. "-.") in deren Kategorie, sonst in der Kategorie "none".
+
+Die Einträge werden wie für patgen aufbereitet (erste Alternative bei
+``{ck/k-k}`` und ``[·/-]``). Trennstellen innerhalb von ``--lmin``/``--rmin``
+Buchstaben am Wortrand werden nicht gezählt.
+
+Die Auswertung läuft parallel in Blöcken von Zeilen (``--jobs``). Mit
+``--report`` wird ein maschinenlesbarer Bericht (JSON) mit Zählern,
+Laufzeit und Wörtern/Sekunde geschrieben, mit ``--errors`` die Liste der
+abweichend getrennten Wörter (wie ``hyphenation.py --test``).
+"""
+
+import sys, os, re, glob, time, json, codecs, optparse
+import multiprocessing
+
+from hyphenation import Hyphenator, engines
+from textstream import line_chunks
+
+# path for local Python modules (parent dir of this file's dir)
+sys.path.insert(0,
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from edit_tools.wortliste import WordEntry
+
+# Konfiguration
+# -------------
+
+# Die neuesten Pattern-Dateien welche über "make pattern-refo" im
+# Wurzelverzeichnis der wortliste generiert werden, sonst die
+# englischen Trennmuster (wie in benchmark.py)::
+
+basedir = os.path.dirname(os.path.abspath(__file__))
+pfiles = (glob.glob(os.path.join(basedir,
+                                 '../../../dehyphn-x/dehyphn-x-*.pat'))
+          or [os.path.join(basedir, 'en-US.pat')])
+default_pfile = os.path.relpath(sorted(pfiles)[-1])
+default_wortliste = os.path.relpath(os.path.join(basedir, '../../../wortliste'))
+
+# Kategorien der Trennstellen (in der Reihenfolge der Prüfung) und für
+# falsche Trennstellen ohne Markierung::
+
+kategorien = (u'=', u'<', u'>', u'-', u'·')
+ohne_kategorie = u'none'
+
+# Trennstellen der Wortliste
+# --------------------------
+
+# Alternativen wie in ``extract_tex.py``: Die erste Alternative gilt, bei
+# Doppeldeutigkeiten ohne Trennstellen::
+
+spezial = re.compile(ur'\{(.*?)/.*?\}')
+doppeldeutig = re.compile(ur'\[(.*?)/.*?\]')
+marker = re.compile(ur'[-=<>·]')
+trennzeichen = re.compile(ur'([-=<>·.]+)')
+
+def kategorie(marken):
+    for k in kategorien:
+        if k in marken:
+            return k
+    return u'-'
+
+# Gib das ungetrennte Wort, die Trennstellen und die unerwünschten
+# Trennstellen als Dictionaries {Position: Kategorie} zurück. Die Position
+# ist die Zahl der Buchstaben vor der Trennstelle:
+#
+# >>> from evaluate import trennstellen
+# >>> wort, soll, unerwuenscht = trennstellen(u'Ab<ar-.ten=zu{ck/k-k}er')
+# >>> print wort
+# Abartenzucker
+# >>> sorted(soll.items()), unerwuenscht.items()
+# ([(2, u'<'), (7, u'=')], [(4, u'-')])
+#
+# ::
+
+def trennstellen(wort):
+    if u'{' in wort or u'[' in wort:
+        wort = spezial.sub(ur'\1', wort)
+        wort = doppeldeutig.sub(lambda m: marker.sub(u'', m.group(1)), wort)
+    teile = trennzeichen.split(wort)
+    soll = {}
+    unerwuenscht = {}
+    pos = len(teile[0])
+    for i in range(1, len(teile), 2):
+        marken = teile[i]
+        if u'.' in marken:
+            unerwuenscht[pos] = kategorie(marken)
+        else:
+            soll[pos] = kategorie(marken)
+        pos += len(teile[i+1])
+    return u''.join(teile[::2]), soll, unerwuenscht
+
+# Bewertung
+# ---------
+
+# Zähler: {Kategorie: [good, bad, missed]}::
+
+def neue_zaehler():
+    return dict((k, [0, 0, 0]) for k in kategorien + (ohne_kategorie,))
+
+def addiere(zaehler, summanden):
+    for k, werte in summanden.iteritems():
+        for i, wert in enumerate(werte):
+            zaehler[k][i] += wert
+
+# Vergleiche die Trennung eines Wortes mit den Mustern. Zähle und gib die
+# Trennung mit den Mustern zurück, wenn sie abweicht (sonst None)::
+
+def bewerte(hyphenator, wort, zaehler, lmin=2, rmin=2):
+    wort, soll, unerwuenscht = trennstellen(wort)
+    teile = hyphenator.split_word(wort, lmin, rmin)
+    ist = set()
+    pos = 0
+    for teil in teile[:-1]:
+        pos += len(teil)
+        ist.add(pos)
+    abweichend = False
+    for pos, k in soll.iteritems():
+        if lmin <= pos <= len(wort) - rmin:
+            if pos in ist:
+                zaehler[k][0] += 1
+            else:
+                zaehler[k][2] += 1
+                abweichend = True
+    for pos in ist:
+        if pos not in soll:
+            zaehler[unerwuenscht.get(pos, ohne_kategorie)][1] += 1
+            abweichend = True
+    if abweichend:
+        return u'-'.join(teile)
+
+# Bewertung eines Blocks von Zeilen der Wortliste (im Kindprozess, die
+# Trennmuster werden vor dem Start der Prozesse geladen). Rückgabe: Zähler,
+# Zahl der Wörter und Liste der Abweichungen (Wort, Trennung mit Mustern)::
+
+_args = None # (hyphenator, sprachvarianten, lmin, rmin)
+
+def bewerte_block(lines):
+    hyphenator, sprachvarianten, lmin, rmin = _args
+    zaehler = neue_zaehler()
+    woerter = 0
+    abweichungen = []
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        line = line.decode('utf8')
+        entry = WordEntry(u''.join(line.split(u'#')[0].split()))
+        wort = entry.get(sprachvarianten)
+        if not wort:
+            continue
+        woerter += 1
+        getrennt = bewerte(hyphenator, wort, zaehler, lmin, rmin)
+        if getrennt is not None:
+            abweichungen.append((wort, getrennt))
+    return zaehler, woerter, abweichungen
+
+def evaluate(hyphenator, lines, sprachvarianten='de-1996', lmin=2, rmin=2,
+             jobs=1, chunk_size=5000):
+    """Bewerte die Trennung der `lines` (Zeilen der Wortliste).
+
+    Gib Zähler, Zahl der Wörter und die Liste der Abweichungen zurück.
+    """
+    global _args
+    _args = (hyphenator, sprachvarianten, lmin, rmin)
+    zaehler = neue_zaehler()
+    woerter = 0
+    abweichungen = []
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+        ergebnisse = pool.imap(bewerte_block,
+                               line_chunks(lines, chunk_size))
+    else:
+        pool = None
+        ergebnisse = (bewerte_block(chunk)
+                      for chunk in line_chunks(lines, chunk_size))
+    try:
+        for z, n, a in ergebnisse:
+            addiere(zaehler, z)
+            woerter += n
+            abweichungen.extend(a)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _args = None
+    return zaehler, woerter, abweichungen
+
+# Bericht (Dictionary, als JSON speicherbar)::
+
+def bericht(zaehler, woerter, abweichungen, sekunden, **angaben):
+    summe = [sum(werte[i] for werte in zaehler.values()) for i in range(3)]
+    felder = ('good', 'bad', 'missed')
+    daten = dict(angaben)
+    daten.update({
+        'words': woerter,
+        'wrong_words': len(abweichungen),
+        'seconds': round(sekunden, 3),
+        'words_per_second': int(woerter / sekunden) if sekunden else None,
+        'categories': dict((k, dict(zip(felder, werte)))
+                           for k, werte in zaehler.iteritems()),
+        'total': dict(zip(felder, summe)),
+        })
+    return daten
+
+# Bewertung einer Pattern-Datei mit Bericht (JSON-Datei `report`) und
+# Liste der Abweichungen (Datei `errors`). Wird auch von
+# ``build_patterns.py`` verwendet::
+
+def evaluate_file(patterns, wortliste, sprachvarianten='de-1996',
+                  encoding='utf8', lmin=2, rmin=2, engine='packed', jobs=1,
+                  report=None, errors=None):
+    start = time.time()
+    hyphenator = Hyphenator(patterns, engine=engine, encoding=encoding)
+    laden = time.time() - start
+    start = time.time()
+    lines = open(wortliste)
+    try:
+        zaehler, woerter, abweichungen = evaluate(
+            hyphenator, lines, sprachvarianten, lmin, rmin, jobs)
+    finally:
+        lines.close()
+    daten = bericht(zaehler, woerter, abweichungen, time.time() - start,
+                    patterns=patterns, wordlist=wortliste,
+                    language=sprachvarianten, lmin=lmin, rmin=rmin,
+                    engine=engine, jobs=jobs, load_seconds=round(laden, 3))
+    if report:
+        with open(report, 'w') as out:
+            json.dump(daten, out, indent=1, sort_keys=True)
+            out.write('\n')
+    if errors:
+        with codecs.open(errors, 'w', 'utf8') as out:
+            for wort, getrennt in abweichungen:
+                out.write(u'%s -> %s\n' % (wort, getrennt))
+    return daten
+
+def drucke_bericht(daten, out=sys.stdout):
+    out.write(u'%-6s %10s %10s %10s\n' % (u'', u'good', u'bad', u'missed'))
+    for k in kategorien + (ohne_kategorie, 'total'):
+        werte = daten['total'] if k == 'total' else daten['categories'][k]
+        out.write(u'%-6s %10d %10d %10d\n'
+                  % (k, werte['good'], werte['bad'], werte['missed']))
+    total = daten['total']
+    soll = total['good'] + total['missed']
+    if soll:
+        out.write(u'%-6s %9.2f%% %9.2f%% %9.2f%%\n'
+                  % (u'', 100.0 * total['good'] / soll,
+                     100.0 * total['bad'] / soll,
+                     100.0 * total['missed'] / soll))
+    out.write(u'%d Wörter, %d abweichend, %.1f s (%s Wörter/s)\n'
+              % (daten['words'], daten['wrong_words'], daten['seconds'],
+                 daten['words_per_second']))
+
+
+if __name__ == '__main__':
+
+    usage = u'%prog [Optionen] [Wortliste]\n\n' + __doc__
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-p', '--patterns', default=default_pfile,
+                      help='Pattern-Datei, Vorgabe "%s"' % default_pfile)
+    parser.add_option('--encoding', default='utf8',
+                      help='Kodierung der Pattern-Datei, Vorgabe "utf8" '
+                      '(für "pattern.8": "iso-8859-15")')
+    parser.add_option('-l', '--language', default='de-1996',
+                      help='Sprachvariante(n) für `WordEntry.get`, '
+                      'Vorgabe "de-1996"')
+    parser.add_option('--lmin', type='int', default=2,
+                      help='ungetrennte Buchstaben am Wortanfang, Vorgabe 2')
+    parser.add_option('--rmin', type='int', default=2,
+                      help='ungetrennte Buchstaben am Wortende, Vorgabe 2')
+    parser.add_option('--engine', choices=sorted(engines.keys()),
+                      default='packed',
+                      help='Pattern-Engine (%s), Vorgabe "packed"'
+                      % ', '.join(sorted(engines.keys())))
+    parser.add_option('-j', '--jobs', type='int',
+                      default=multiprocessing.cpu_count(),
+                      help='Zahl der Prozesse, Vorgabe: Zahl der Prozessoren')
+    parser.add_option('-r', '--report',
+                      help='Bericht (JSON) in Datei REPORT schreiben')
+    parser.add_option('-e', '--errors',
+                      help='abweichend getrennte Wörter in Datei ERRORS '
+                      'schreiben')
+    (options, args) = parser.parse_args()
+
+    wortliste = args and args[0] or default_wortliste
+
+    daten = evaluate_file(options.patterns, wortliste, options.language,
+                          options.encoding, options.lmin, options.rmin,
+                          options.engine, options.jobs, options.report,
+                          options.errors)
+    drucke_bericht(daten, codecs.getwriter('utf8')(sys.stdout))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Hyphenation exceptions for the hyphenation module.
+
+    An `ExceptionStore` maps lowercased words to their break points, stored
+    as a bitset (an integer, bit `k` set for a break after ``word[k]``)
+    instead of a list of points per word.
+
+    Exceptions are read
+
+    * from hyphenated words separated by whitespace (``add()``),
+    * in bulk from lines in the format of the "wortliste"
+      (``add_wortliste()``, e.g. ``wortliste.ausnahmen`` or a fully
+      hyphenated word list), or
+    * lazily from a "wortliste" file via its index (see
+      edit_tools/wortindex.py): words are looked up in the index when first
+      needed, so loading does not read the whole file.
+
+    >>> store = ExceptionStore(u'reci-procity pre-sent')
+    >>> store.add_wortliste([u'Ab<bau;Ab<bau', u'Aal=be<stand;Aal=be<stand'])
+    >>> u'abbau' in store, u'abbaus' in store
+    (True, False)
+    >>> store.points(u'recip')
+    >>> store.points(u'present')
+    [0, 0, 0, 0, 1, 0, 0, 0, 0]
+    >>> store.split(u'Aalbestand', store.bits(u'aalbestand'))
+    [u'Aal', u'be', u'stand']
+"""
+
+import re, os, sys
+
+# Alternatives in the "wortliste" format (as in ``evaluate.py``): the first
+# alternative applies, ambiguous parts have no breaks::
+
+special = re.compile(ur'\{(.*?)/.*?\}')
+ambiguous = re.compile(ur'\[(.*?)/.*?\]')
+marker = re.compile(ur'[-=<>·]')
+separators = re.compile(ur'([-=<>·.]+)')
+
+def wortliste_bits(hyphenated):
+    """Return the word and the bitset of breaks of `hyphenated` (marked as
+    in the "wortliste", unwanted breaks marked with '.' are ignored).
+    """
+    if u'{' in hyphenated or u'[' in hyphenated:
+        hyphenated = special.sub(ur'\1', hyphenated)
+        hyphenated = ambiguous.sub(lambda m: marker.sub(u'', m.group(1)),
+                                   hyphenated)
+    parts = separators.split(hyphenated)
+    bits = 0
+    pos = len(parts[0])
+    for i in range(1, len(parts), 2):
+        if pos and u'.' not in parts[i]:
+            bits |= 1 << (pos - 1)
+        pos += len(parts[i+1])
+    return u''.join(parts[::2]), bits
+
+
+class ExceptionStore(object):
+
+    def __init__(self, exceptions=u''):
+        self.words = {}        # lowercased word -> bitset
+        self.index = None      # lazily searched `WordIndex`
+        self.missing = set()   # words not in the index
+        self.add(exceptions)
+
+    def add(self, exceptions):
+        """Add hyphenated words (separated by whitespace, breaks marked
+        with '-').
+        """
+        words = self.words
+        for ex in exceptions.lower().split():
+            bits = 0
+            pos = 0
+            for part in ex.split(u'-')[:-1]:
+                pos += len(part)
+                if pos:
+                    bits |= 1 << (pos - 1)
+            words[ex.replace(u'-', u'')] = bits
+        self.missing.clear()
+
+    def add_wortliste(self, lines, sprachvarianten='de-1996'):
+        """Add the words of `lines` in the format of the "wortliste"
+        (unicode or utf8-encoded) in the spelling `sprachvarianten`.
+        """
+        words = self.words
+        entry_class = None
+        for line in lines:
+            if isinstance(line, str):
+                line = line.decode('utf8')
+            line = u''.join(line.split(u'#')[0].split())
+            if not line:
+                continue
+            fields = line.split(u';')
+            if len(fields) == 2:  # one spelling for all variants
+                hyphenated = fields[1]
+            else:
+                if entry_class is None:
+                    entry_class = _edit_tools('wortliste').WordEntry
+                hyphenated = entry_class(line).get(sprachvarianten)
+                if not hyphenated:
+                    continue
+            word, bits = wortliste_bits(hyphenated)
+            words[word.lower()] = bits
+        self.missing.clear()
+
+    def open_index(self, wortliste, index=None, sprachvarianten='de-1996'):
+        """Look up words not added with `add()` or `add_wortliste()` in the
+        file `wortliste` (via the index file `index`, default: `wortliste`
+        + "-index", created or updated if required).
+        """
+        WordIndex = _edit_tools('wortindex').WordIndex
+        self.index = WordIndex(wortliste, index or wortliste + '-index')
+        self.sprachvarianten = sprachvarianten
+        self.missing.clear()
+
+    def _lookup(self, word):
+        for entry in self.index.case_variants(word):
+            hyphenated = entry.get(self.sprachvarianten)
+            if hyphenated:
+                bits = wortliste_bits(hyphenated)[1]
+                self.words[word] = bits
+                return bits
+        self.missing.add(word)
+        return None
+
+    def bits(self, word):
+        """Return the bitset of breaks for the lowercased `word` or None,
+        if it is not an exception.
+        """
+        bits = self.words.get(word)
+        if (bits is None and self.index is not None
+            and word not in self.missing):
+            bits = self._lookup(word)
+        return bits
+
+    def points(self, word):
+        """Return the list of points for the lowercased `word` (index
+        ``k+2`` for a break after ``word[k]``, as `PatternTree.points()`
+        without the last value) or None, if it is not an exception.
+        """
+        bits = self.bits(word)
+        if bits is None:
+            return None
+        return [0, 0] + [(bits >> k) & 1 for k in range(len(word))]
+
+    def split(self, word, bits):
+        """Return the pieces of `word` for the bitset `bits`."""
+        pieces = []
+        start = 0
+        while bits:
+            end = start
+            while not bits & 1:
+                bits >>= 1
+                end += 1
+            pieces.append(word[start:end+1])
+            start = end + 1
+            bits >>= 1
+        pieces.append(word[start:])
+        return pieces
+
+    def __contains__(self, word):
+        return self.bits(word) is not None
+
+    def __getitem__(self, word):
+        points = self.points(word)
+        if points is None:
+            raise KeyError(word)
+        return points
+
+    def __len__(self):
+        """Number of words in memory (added or looked up in the index)."""
+        return len(self.words)
+
+
+# Modules of edit_tools/ (imported when needed, path for local Python
+# modules is the parent dir of this file's dir)::
+
+def _edit_tools(name):
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return __import__('edit_tools.' + name, fromlist=[name])
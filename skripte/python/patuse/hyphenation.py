@@ -15,6 +15,21 @@ u"""Hyphenation using a pure Python implementation of Frank Liang's algorithm.
     >>> hyphenator.hyphenate_word(u"project")
     u'project'
 
+    `hyphenate_many()` and `hyphenate_stream()` memoize the results for
+    repeated words:
+
+    >>> list(hyphenator.hyphenate_many([u"hyphenation", u"hyphenation"], '-'))
+    [u'hy-phen-ation', u'hy-phen-ation']
+    >>> hyphenator.word_cache.hits
+    1
+
+    The patterns are stored in a tree of nested dictionaries or, with
+    `Hyphenator(pattern_file, engine='packed')`, in a compact
+    double-array trie (see packed_trie.py). `engine='automaton'` uses an
+    Aho-Corasick automaton (one pass per word, see aho_corasick.py). With
+    `cache=True`, the compiled patterns are stored in a persistent cache
+    (see pattern_cache.py).
+
     based on http://nedbatchelder.com/code/modules/hyphenate.py
     by Ned Batchelder, July 2007.
 
@@ -23,21 +38,162 @@ u"""Hyphenation using a pure Python implementation of Frank Liang's algorithm.
 """
 # See also the independently developed http://pyphen.org/
 
-import re, optparse, sys, os, codecs
+import re, optparse, sys, os, codecs, collections
+import multiprocessing
+from packed_trie import PackedTrie
+from aho_corasick import PatternAutomaton
+from exception_store import ExceptionStore
+from textstream import transform_text, transform_file, line_chunks
+import pattern_cache
+import vectorized
 
 __version__ = '2.1 2015-05-26'
 
+def parse_pattern(pattern):
+    """Split a pattern like 'a1bc3d4' into the string of chars 'abcd'
+    and the list of points [ 0, 1, 0, 3, 4 ].
+    """
+    chars = re.sub(u'[0-9]', u'', pattern)
+    points = [ int(d or 0) for d in re.split(u'[^0-9]', pattern) ]
+    return chars, points
+
+
+class PatternTree(object):
+    """Patterns stored in a tree of nested dictionaries.
+
+    Each character finds a dict another level down in the tree, and leaf
+    nodes have the list of points (stored under the key `None`).
+    """
+    def __init__(self, patterns=()):
+        self.root = {}
+        for pattern in patterns:
+            self.insert(pattern)
+
+    def insert(self, pattern):
+        chars, points = parse_pattern(pattern)
+        t = self.root
+        for c in chars:
+            if c not in t:
+                t[c] = {}
+            t = t[c]
+        t[None] = points
+
+    def dump(self):
+        """Return the tree as `marshal`-able data (see pattern_cache.py)."""
+        return self.root
+
+    @classmethod
+    def load(cls, data):
+        """Return a `PatternTree` with data from `dump()`."""
+        tree = cls()
+        tree.root = data
+        return tree
+
+    def points(self, work):
+        """Return the list of maximal points for all patterns matching
+        in `work` (the lowercased word with '.' at both ends).
+        """
+        points = [0] * (len(work)+1)
+        for i in range(len(work)):
+            t = self.root
+            for c in work[i:]:
+                if c in t:
+                    t = t[c]
+                    if None in t:
+                        p = t[None]
+                        for j in range(len(p)):
+                            points[i+j] = max(points[i+j], p[j])
+                else:
+                    break
+        return points
+
+
+class WordCache(object):
+    """Bounded memo of hyphenated words with hit-rate statistics.
+
+    Two generations of dictionaries approximate a LRU cache: new entries
+    go to `recent`. When `recent` holds `maxsize`/2 entries, it replaces
+    `older` (whose entries are dropped). Entries found in `older` move
+    back to `recent`, so frequent words stay in the cache.
+    """
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self):
+        self.recent = {}
+        self.older = {}
+        self.hits = self.misses = self.evicted = 0
+
+    def get(self, key):
+        try:
+            value = self.recent[key]
+        except KeyError:
+            try:
+                value = self.older.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        if len(self.recent) >= self.maxsize // 2:
+            self.evicted += len(self.older)
+            self.older = self.recent
+            self.recent = {}
+        self.recent[key] = value
+
+    def __len__(self):
+        return len(self.recent) + len(self.older)
+
+    def hit_rate(self):
+        return float(self.hits) / ((self.hits + self.misses) or 1)
+
+    def stats(self):
+        """Return a summary of the cache statistics."""
+        return (u'%d lookups, %d hits (%.1f%%), %d misses, '
+                u'%d entries (max. %d), %d evicted'
+                % (self.hits + self.misses, self.hits, 100*self.hit_rate(),
+                   self.misses, len(self), self.maxsize, self.evicted))
+
+
 class Hyphenator:
-    def __init__(self, pattern_file, exceptions=''):
-        self.tree = {}
-        for pattern in self.yield_patterns(pattern_file):
-            self._insert_pattern(pattern)
+    def __init__(self, pattern_file, exceptions='', engine='tree',
+                 cache=False, cache_size=100000, encoding='utf8'):
+        # `cache`: load the compiled patterns from/store them in the
+        # persistent cache (see pattern_cache.py).
+        # `encoding`: of the pattern file (patgen output is latin-9).
+        if cache:
+            self.tree = pattern_cache.load(pattern_file, engine,
+                            lambda: compile_patterns(
+                                self.yield_patterns(pattern_file,
+                                                    encoding=encoding),
+                                engine),
+                            engines[engine].load, encoding)
+        else:
+            self.tree = compile_patterns(
+                self.yield_patterns(pattern_file, encoding=encoding), engine)
 
-        self.exceptions = {}
-        for ex in exceptions.split():
-            # Convert the hyphenated pattern into a point array for use later.
-            self.exceptions[ex.replace(u'-', u'')] = [0] + [ int(h == u'-')
-                                            for h in re.split(ur"[^-]", ex) ]
+        # `cache_size`: maximal number of words memoized by
+        # `hyphenate_many()` and `hyphenate_stream()`.
+        self.word_cache = WordCache(cache_size)
+
+        # `exceptions`: hyphenated words separated by whitespace or an
+        # `ExceptionStore` (see exception_store.py).
+        if isinstance(exceptions, ExceptionStore):
+            self.exceptions = exceptions
+        else:
+            self.exceptions = ExceptionStore()
+            self.add_exceptions(exceptions)
+
+    def add_exceptions(self, exceptions):
+        """Add hyphenated words (separated by whitespace) to the exceptions.
+        """
+        self.exceptions.add(exceptions)
+        # memoized words may be hyphenated differently now
+        self.word_cache.clear()
 
     def yield_patterns(self, path, invalid_chars = '%\\{}', encoding='utf8'):
         """
@@ -62,22 +218,6 @@ class Hyphenator:
                 yield line
         lines.close()
 
-    def _insert_pattern(self, pattern):
-        # Convert the a pattern like 'a1bc3d4' into a string of chars 'abcd'
-        # and a list of points [ 1, 0, 3, 4 ].
-        chars = re.sub(u'[0-9]', u'', pattern)
-        points = [ int(d or 0) for d in re.split(u'[^0-9]', pattern) ]
-
-        # Insert the pattern into the tree.  Each character finds a dict
-        # another level down in the tree, and leaf nodes have the list of
-        # points.
-        t = self.tree
-        for c in chars:
-            if c not in t:
-                t[c] = {}
-            t = t[c]
-        t[None] = points
-
     def split_word(self, word, lmin=2, rmin=2):
         """ Given a word, returns a list of pieces, broken at the possible
             hyphenation points.
@@ -85,29 +225,18 @@ class Hyphenator:
         # Short words aren't hyphenated.
         if len(word) < (lmin + rmin):
             return [word]
-        # If the word is an exception, get the stored points.
-        if word.lower() in self.exceptions:
-            points = self.exceptions[word.lower()]
-        else:
-            work = '.' + word.lower() + '.'
-            points = [0] * (len(work)+1)
-            for i in range(len(work)):
-                t = self.tree
-                for c in work[i:]:
-                    if c in t:
-                        t = t[c]
-                        if None in t:
-                            p = t[None]
-                            for j in range(len(p)):
-                                points[i+j] = max(points[i+j], p[j])
-                    else:
-                        break
-            # No hyphens in the first `lmin` chars or the last `rmin` ones:
-            for i in range(lmin):
-                points[i+1] = 0
-            for i in range(rmin):
-                points[-2-i] = 0
-            # points[1] = points[2] = points[-2] = points[-3] = 0
+        # If the word is an exception, use the stored breaks.
+        lower = word.lower()
+        bits = self.exceptions.bits(lower)
+        if bits is not None:
+            return self.exceptions.split(word, bits)
+        points = self.tree.points('.' + lower + '.')
+        # No hyphens in the first `lmin` chars or the last `rmin` ones:
+        for i in range(lmin):
+            points[i+1] = 0
+        for i in range(rmin):
+            points[-2-i] = 0
+        # points[1] = points[2] = points[-2] = points[-3] = 0
 
         # Examine the points to build the pieces list.
         pieces = ['']
@@ -117,6 +246,14 @@ class Hyphenator:
                 pieces.append('')
         return pieces
 
+    def split_words(self, words, lmin=2, rmin=2):
+        """Return the list of pieces for each of the `words`.
+
+        Same result as `split_word()` for every word, faster for large
+        batches if NumPy is installed (see vectorized.py).
+        """
+        return vectorized.split_words(self, words, lmin, rmin)
+
     def hyphenate_word(self, word, hyphen=u'­', lmin=2, rmin=2):
         """ Return `word` with (soft-)hyphens at the possible
             hyphenation points.
@@ -125,16 +262,320 @@ class Hyphenator:
 
 
     def hyphenate_text(self, text, hyphen=u'­', lmin=2, rmin=2):
-        # Text zerlegen: finde (ggf. leere) Folgen von nicht-Wort-Zeichen
-        # gefolgt von Wort-Zeichen. Der Iterator liefert Match-Objekte, mit
-        # den Untergruppen 0: nicht-Wort und 1: Wort.
-        it = re.finditer(r"([\W0-9_]*)(\w*)", text, flags=re.UNICODE)
-        # Konvertierung und Zusammenfügen
-        parts = [match.groups()[0] # nicht-Wort Zeichen
-                + self.hyphenate_word(match.groups()[1], hyphen, lmin, rmin)
-                for match in it]
+        """Return `text` with hyphenated words (see textstream.py)."""
+        return transform_text(text, lambda word:
+                              self.hyphenate_word(word, hyphen, lmin, rmin))
+
+    def hyphenate_many(self, words, hyphen=u'­', lmin=2, rmin=2):
+        """Yield the hyphenated `words`.
+
+        Results are memoized in `self.word_cache` (key: word, hyphen, lmin
+        and rmin), so repeated words are hyphenated only once. See
+        `self.word_cache.stats()` for the hit rate.
+        """
+        hyphenate = self.memoized(hyphen, lmin, rmin)
+        for word in words:
+            yield hyphenate(word)
+
+    def memoized(self, hyphen=u'­', lmin=2, rmin=2):
+        """Return a function hyphenating one word, memoized in
+        `self.word_cache` (key: word, hyphen, lmin and rmin).
+        """
+        cache = self.word_cache
+        if not cache.maxsize:
+            return lambda word: self.hyphenate_word(word, hyphen, lmin, rmin)
+        def hyphenate(word):
+            key = (word, hyphen, lmin, rmin)
+            hyphenated = cache.get(key)
+            if hyphenated is None:
+                hyphenated = self.hyphenate_word(word, hyphen, lmin, rmin)
+                cache[key] = hyphenated
+            return hyphenated
+        return hyphenate
+
+    def hyphenate_stream(self, lines, hyphen=u'­', lmin=2, rmin=2):
+        """Yield `lines` (or other chunks of text) with hyphenated words.
+
+        Like `hyphenate_text()`, but words are memoized (see
+        `hyphenate_many()`).
+        """
+        hyphenate = self.memoized(hyphen, lmin, rmin)
+        for line in lines:
+            yield transform_text(line, hyphenate)
+
+    def hyphenate_file(self, infile, outfile, hyphen=u'­', lmin=2, rmin=2,
+                       encoding='utf8'):
+        """Write the text of file `infile` with hyphenated words to
+        `outfile`, chunk by chunk (see `textstream.transform_file()`).
+        Words are memoized.
+        """
+        transform_file(infile, outfile, self.memoized(hyphen, lmin, rmin),
+                       encoding)
+
+
+class LayeredTree(PatternTree):
+    """Several pattern sets ("layers") in one tree of nested dictionaries.
+
+    Leaf nodes store a dictionary {layer: points}, so `points()` finds the
+    points of all layers in one scan of the word:
+
+    >>> tree = LayeredTree(2)
+    >>> tree.insert(u'1ba', 0)
+    >>> tree.insert(u'a1b', 0)
+    >>> tree.insert(u'2bc', 1)
+    >>> tree.points(u'.abc.')
+    [[0, 0, 1, 0, 0, 0], [0, 0, 2, 0, 0, 0]]
+    """
+    def __init__(self, nlayers=1):
+        self.root = {}
+        self.nlayers = nlayers
+
+    def insert(self, pattern, layer=0):
+        chars, points = parse_pattern(pattern)
+        t = self.root
+        for c in chars:
+            if c not in t:
+                t[c] = {}
+            t = t[c]
+        t.setdefault(None, {})[layer] = points
+
+    def dump(self):
+        """Return the tree as `marshal`-able data (see pattern_cache.py)."""
+        return (self.nlayers, self.root)
+
+    @classmethod
+    def load(cls, data):
+        """Return a `LayeredTree` with data from `dump()`."""
+        tree = cls(data[0])
+        tree.root = data[1]
+        return tree
+
+    def points(self, work):
+        """Return a list of point lists (one per layer) for all patterns
+        matching in `work` (the lowercased word with '.' at both ends).
+        """
+        layers = [[0] * (len(work)+1) for layer in range(self.nlayers)]
+        for i in range(len(work)):
+            t = self.root
+            for c in work[i:]:
+                if c in t:
+                    t = t[c]
+                    if None in t:
+                        for layer, p in t[None].iteritems():
+                            points = layers[layer]
+                            for j in range(len(p)):
+                                if p[j] > points[i+j]:
+                                    points[i+j] = p[j]
+                else:
+                    break
+        return layers
+
+
+class MultiHyphenator(Hyphenator):
+    """Hyphenate with several pattern files in one pass.
+
+    The first pattern file determines the hyphenation points, the others
+    categorize them (e.g. patterns for word joints or suffixes generated
+    with ``make fugen pattern-refo`` and ``make suffix pattern-refo``).
+    All pattern sets are stored in one `LayeredTree`, each word is
+    lowercased and scanned only once.
+
+    multi_hyphenator = MultiHyphenator([pattern_file, pattern_file])
+    >>> multi_hyphenator.categorized_breaks(u"hyphenation", u'-=')
+    [(2, u'='), (6, u'=')]
+    >>> multi_hyphenator.hyphenate_categorized(u"hyphenation", u'-=')
+    u'hy=phen=ation'
+    """
+    def __init__(self, pattern_files, exceptions='', cache=False,
+                 cache_size=100000):
+        # `exceptions` apply to the first pattern file.
+        if cache:
+            self.tree = pattern_cache.load(pattern_files, 'layered',
+                                    lambda: self.compile(pattern_files),
+                                    LayeredTree.load)
+        else:
+            self.tree = self.compile(pattern_files)
+        self.word_cache = WordCache(cache_size)
+        if isinstance(exceptions, ExceptionStore):
+            self.exceptions = exceptions
+        else:
+            self.exceptions = ExceptionStore()
+            self.add_exceptions(exceptions)
+
+    def compile(self, pattern_files):
+        tree = LayeredTree(len(pattern_files))
+        for layer, path in enumerate(pattern_files):
+            for pattern in self.yield_patterns(path):
+                tree.insert(pattern, layer)
+        return tree
+
+    def layer_points(self, word, lmin=2, rmin=2):
+        """Return a list of point lists (one per pattern file) for `word`.
+
+        Index ``i+2`` holds the points for a break after ``word[i]``.
+        """
+        work = '.' + word.lower() + '.'
+        layers = self.tree.points(work)
+        # No hyphens in the first `lmin` chars or the last `rmin` ones:
+        for points in layers:
+            for i in range(lmin):
+                points[i+1] = 0
+            for i in range(rmin):
+                points[-2-i] = 0
+        # If the word is an exception, use the stored points.
+        points = self.exceptions.points(work[1:-1])
+        if points is not None:
+            layers[0] = points + [0]
+        return layers
+
+    def categorized_breaks(self, word, marks, lmin=2, rmin=2):
+        """Return a list of (position, mark) tuples for the hyphenation
+        points of `word`.
+
+        `marks` is a sequence with one mark per pattern file: a break
+        gets the mark of the first additional pattern file that also
+        allows it, else ``marks[0]``.
+        """
+        if len(word) < (lmin + rmin):
+            return []
+        layers = self.layer_points(word, lmin, rmin)
+        categorizers = zip(layers[1:], marks[1:])
+        breaks = []
+        for i in range(len(word)-1):
+            if layers[0][i+2] % 2:
+                for points, mark in categorizers:
+                    if points[i+2] % 2:
+                        break
+                else:
+                    mark = marks[0]
+                breaks.append((i+1, mark))
+        return breaks
+
+    def hyphenate_categorized(self, word, marks, lmin=2, rmin=2):
+        """Return `word` with categorized hyphenation marks
+        (see `categorized_breaks()`).
+        """
+        parts = []
+        start = 0
+        for i, mark in self.categorized_breaks(word, marks, lmin, rmin):
+            parts.extend((word[start:i], mark))
+            start = i
+        parts.append(word[start:])
         return u''.join(parts)
 
+    def split_word(self, word, lmin=2, rmin=2):
+        """Split `word` at the hyphenation points of the first pattern file.
+        """
+        breaks = [0] + [i for i, mark in self.categorized_breaks(
+                            word, u'-', lmin, rmin)] + [len(word)]
+        return [word[start:end] for start, end in zip(breaks, breaks[1:])]
+
+    def split_words(self, words, lmin=2, rmin=2):
+        """Return the list of pieces for each of the `words`.
+
+        The `LayeredTree` has no vectorized variant (see vectorized.py),
+        `split_word()` is used for every word:
+
+        >>> words = [u'hyphenation', u'project', u'a']
+        >>> pieces = multi_hyphenator.split_words(words)
+        >>> pieces
+        [[u'hy', u'phen', u'ation'], [u'project'], [u'a']]
+        >>> pieces == [multi_hyphenator.split_word(word) for word in words]
+        True
+        """
+        return [self.split_word(word, lmin, rmin) for word in words]
+
+
+# Pattern engines::
+#
+#   tree    nested dictionaries (simple, fast to build),
+#   packed     double-array trie (compact, see packed_trie.py),
+#   automaton  Aho-Corasick automaton (one pass per word, see aho_corasick.py).
+
+engines = {'tree': PatternTree,
+           'packed': PackedTrie,
+           'automaton': PatternAutomaton,
+          }
+
+def compile_patterns(patterns, engine='tree'):
+    """Return the pattern structure for `engine` (a key in `engines`)."""
+    if engine not in engines:
+        raise ValueError('unknown pattern engine "%s"' % engine)
+    tree = PatternTree(patterns)
+    if engine != 'tree':
+        return engines[engine](tree.root)
+    return tree
+
+# Exception files: hyphenated words separated by whitespace or lines in the
+# "wortliste" format (with ';'), see exception_store.py::
+
+def read_exceptions(path, sprachvarianten='de-1996', lazy=False):
+    """Return an `ExceptionStore` with the exceptions in file `path`.
+
+    With `lazy`, words are looked up in the index of a file in the
+    "wortliste" format when needed.
+    """
+    store = ExceptionStore()
+    if lazy:
+        store.open_index(path, sprachvarianten=sprachvarianten)
+        return store
+    ex_file = open(path)
+    exceptions = ex_file.read().decode('utf8')
+    ex_file.close()
+    if u';' in exceptions:
+        store.add_wortliste(exceptions.splitlines(), sprachvarianten)
+    else:
+        store.add(exceptions)
+    return store
+
+# Parallel processing
+# -------------------
+#
+# The worker processes are forked after the `Hyphenator` is set up and
+# share its pattern structure copy-on-write. (The arrays of the "packed"
+# engine are not touched by reference counting and stay shared.)::
+
+_parallel_args = None # (hyphenator, hyphen, lmin, rmin), set before forking
+
+def _hyphenate_chunk(lines):
+    hyphenator, hyphen, lmin, rmin = _parallel_args
+    return list(hyphenator.hyphenate_stream(lines, hyphen, lmin, rmin))
+
+def hyphenate_parallel(hyphenator, lines, jobs, hyphen=u'­', lmin=2, rmin=2,
+                       chunk_size=1000):
+    """Yield the hyphenated `lines` in input order.
+
+    Chunks of `chunk_size` lines are hyphenated in a pool of `jobs`
+    worker processes. At most ``2 * jobs`` chunks are read ahead, the
+    memory use does not depend on the size of the input. The result is the same as with `hyphenate_stream()`
+    (line ends are kept):
+
+    >>> lines = [u'hyphenation\\n', u'a project,\\n', u'presents']
+    >>> parallel = list(hyphenate_parallel(hyphenator, lines, 2, u'-',
+    ...                                    chunk_size=1))
+    >>> parallel
+    [u'hy-phen-ation\\n', u'a project,\\n', u'presents']
+    >>> parallel == list(hyphenator.hyphenate_stream(lines, u'-'))
+    True
+    """
+    global _parallel_args
+    _parallel_args = (hyphenator, hyphen, lmin, rmin)
+    pool = multiprocessing.Pool(jobs)
+    pending = collections.deque()  # results in input order
+    try:
+        for chunk in line_chunks(lines, chunk_size):
+            pending.append(pool.apply_async(_hyphenate_chunk, (chunk,)))
+            if len(pending) >= 2 * jobs:
+                for line in pending.popleft().get():
+                    yield line
+        while pending:
+            for line in pending.popleft().get():
+                yield line
+    finally:
+        pool.close()
+        pool.join()
+        _parallel_args = None
+
 
 default_pattern_file = os.path.join(os.path.dirname(__file__), 'en-US.pat')
 # default_pattern_file = '../../../dehyphn-x/dehyphn-x-*.pat'
@@ -154,8 +595,16 @@ if __name__ == '__main__':
                       help='Pattern file, Default "en-US.pat"',
                       default=default_pattern_file)
     parser.add_option('-e', '--exception-file',
-                      help='File of hyphenated words (exceptions), '
-                      'Default None', default='')
+                      help='File of hyphenated words (exceptions) or '
+                      'lines in the "wortliste" format, Default None',
+                      default='')
+    parser.add_option('--lazy-exceptions', action="store_true",
+                      default=False, help='Look up exceptions in the '
+                      '"wortliste" format via an index file when needed '
+                      '(see edit_tools/wortindex.py)')
+    parser.add_option('--variant', default='de-1996',
+                      help='Spelling of exceptions in the "wortliste" '
+                      'format, default "de-1996"')
     parser.add_option('--hyphen',
                       help=r'hyphenation marker, default SOFT HYPHEN (\u00AD)',
                       default='­')
@@ -165,6 +614,20 @@ if __name__ == '__main__':
     parser.add_option('', '--rmin',
                       help='Unhyphenated characters at end of word, default 2',
                       default='2')
+    parser.add_option('--engine', choices=sorted(engines.keys()),
+                      help='pattern engine (%s), default "tree"'
+                      % ', '.join(sorted(engines.keys())), default='tree')
+    parser.add_option('--no-cache', dest='cache', action="store_false",
+                      default=True, help='Do not use the persistent cache '
+                      'of compiled patterns (see pattern_cache.py).')
+    parser.add_option('--cache-size', type='int', default=100000,
+                      help='Number of memoized words, default 100000 '
+                      '(0: no memoization)')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help='Hyphenate text in JOBS processes, default 1 '
+                      '(use with "--engine packed" to share the patterns)')
+    parser.add_option('--stats', action="store_true", default=False,
+                      help='Report word cache statistics on stderr.')
     parser.add_option('-t', '--test', action="store_true", default=False,
                       help='Compare input and reconstruction, '
                       'report differences.')
@@ -178,15 +641,19 @@ if __name__ == '__main__':
     rmin = int(options.rmin)
 
     if options.exception_file:
-        ex_file = open(exception_file)
-        exceptions = ex_file.read().decode('utf8')
-        ex_file.close()
+        exceptions = read_exceptions(options.exception_file,
+                                     options.variant, options.lazy_exceptions)
     elif options.self_test:
         exceptions = u"present presents project projects reci-procity"
     else:
         exceptions = ''
 
-    hyphenator = Hyphenator(options.pattern_file, exceptions)
+    hyphenator = Hyphenator(options.pattern_file, exceptions,
+                            engine=options.engine, cache=options.cache,
+                            cache_size=options.cache_size)
+    if options.self_test:
+        multi_hyphenator = MultiHyphenator([options.pattern_file]*2,
+                                           exceptions, cache=options.cache)
     del exceptions
     
     if len(args) == 0:
@@ -213,6 +680,26 @@ if __name__ == '__main__':
                 print line, '->', line2
         sys.exit()
 
-    for line in lines:
-        print hyphenator.hyphenate_text(line, hyphen=hyphen,
-                                        lmin=lmin, rmin=rmin)
+    if options.jobs > 1:
+        lines = hyphenate_parallel(hyphenator, lines, options.jobs,
+                                   hyphen=hyphen, lmin=lmin, rmin=rmin)
+    elif len(args) == 0:
+        # stream stdin to stdout chunk by chunk (encoded by
+        # `hyphenate_file()`, not by the UTF-8 writer)
+        hyphenator.hyphenate_file(sys.stdin, sys.stdout.stream, hyphen=hyphen,
+                                  lmin=lmin, rmin=rmin)
+        lines = []
+    else:
+        lines = hyphenator.hyphenate_stream(lines, hyphen=hyphen,
+                                            lmin=lmin, rmin=rmin)
+    if len(args) == 0:
+        # lines from stdin keep their line end (same output as the
+        # serial `hyphenate_file()`)
+        for line in lines:
+            sys.stdout.write(line)
+    else:
+        for line in lines:
+            print line
+
+    if options.stats and options.jobs == 1:
+        sys.stderr.write('word cache: %s\n' % hyphenator.word_cache.stats())
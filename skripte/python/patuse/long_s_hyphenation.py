@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+# long_s_hyphenation.py: Lang-S Wandlung und Trennung in einem Durchlauf
+# =====================================================================
+
+u"""Rund-S nach Lang-S Wandlung und Silbentrennung in einem Durchlauf.
+
+Statt den Text erst mit ``long_s_conversion.py`` zu wandeln und dann mit
+den Trennmustern zu trennen, werden beide Pattern-Dateien in einen Baum
+geladen (siehe `hyphenation.MultiHyphenator`). Ein Durchlauf pro Wort
+liefert die Trennstellen und die Lang-S Quasi-Trennstellen ("s-" statt
+"ſ", ausſagen -> auss-agen). Das Ergebnis ist das gewandelte Wort mit
+(weichen) Trennstrichen, z.B.::
+
+  h = LangSHyphenator('dehypht-x.pat', 'de-x-long-s.pat')
+  h.hyphenate_word(u'Aussagen', u'-')   # -> u'Auſ-sa-gen'
+
+Die Lang-S Muster werden wie in ``long_s_conversion.py`` mit
+``lmin=1, rmin=1`` angewendet (dort auch die Ausnahmen). Nur
+Quasi-Trennstellen nach "s" zählen, andere werden ignoriert.
+
+Die Eingabe wird blockweise gelesen und ausgegeben (siehe textstream.py),
+ein ganzes Buch wird in einem Durchlauf gewandelt und getrennt.
+
+Aufruf: python long_s_hyphenation.py [Optionen] < text > text-Latf
+"""
+
+import sys, os, glob, optparse
+
+from hyphenation import MultiHyphenator
+from long_s_conversion import exceptions as lang_s_ausnahmen
+
+# Konfiguration
+# -------------
+
+# Die neuesten Trennmuster für die traditionelle Rechtschreibung und die
+# Lang-s Pseudo-Trennmuster (mit "make" im Wurzelverzeichnis der wortliste
+# generiert)::
+
+basedir = os.path.dirname(os.path.abspath(__file__))
+pfiles = glob.glob(os.path.join(basedir,
+                                '../../../dehypht-x/dehypht-x-*.pat'))
+default_pfile = os.path.relpath(sorted(pfiles)[-1] if pfiles else
+                    os.path.join(basedir, '../../../dehypht-x/dehypht-x.pat'))
+default_long_s_file = os.path.relpath(os.path.join(basedir,
+                                    '../../../de-long-s/de-x-long-s.pat'))
+
+
+# LangSHyphenator
+# ---------------
+#
+# Ebene 0 des Baums: Trennmuster, Ebene 1: Lang-S Muster. Die Ausnahmen
+# (`exceptions`) gelten für die Trennung.
+#
+# `split_word()` gibt die Teile des gewandelten Wortes zurück, damit
+# liefern `hyphenate_word()`, `hyphenate_text()`, `hyphenate_stream()` und
+# `hyphenate_file()` von `Hyphenator` gewandelte und getrennte Wörter::
+
+class LangSHyphenator(MultiHyphenator):
+
+    def __init__(self, pattern_file, long_s_file, exceptions='', cache=False,
+                 cache_size=100000):
+        MultiHyphenator.__init__(self, [pattern_file, long_s_file],
+                                 exceptions, cache, cache_size)
+
+    def split_word(self, wort, lmin=2, rmin=2):
+        """Gib die Teile von `wort` (mit Lang-S) an den Trennstellen zurück.
+        """
+        n = len(wort)
+        lang_s = u's' in wort and wort not in lang_s_ausnahmen
+        trennen = n >= lmin + rmin
+        if not (lang_s or trennen):
+            return [lang_s_ausnahmen.get(wort, wort)]
+
+        lower = wort.lower()
+        punkte = trennen and self.exceptions.points(lower) or None
+        if lang_s or (trennen and punkte is None):
+            ebenen = self.tree.points(u'.' + lower + u'.')
+        if trennen and punkte is None:
+            punkte = ebenen[0]
+            # keine Trennung in den ersten `lmin` und letzten `rmin` Zeichen
+            for i in range(lmin):
+                punkte[i+1] = 0
+            for i in range(rmin):
+                punkte[-2-i] = 0
+
+        # Rund-S nach Lang-S (Quasi-Trennstelle nach s, nicht am Wortende):
+        if lang_s:
+            s_punkte = ebenen[1]
+            wort = u''.join([u'ſ' if c == u's' and s_punkte[i+2] % 2
+                             and i < n - 1 else c
+                             for i, c in enumerate(wort)])
+        else:
+            wort = lang_s_ausnahmen.get(wort, wort)
+
+        if not trennen:
+            return [wort]
+        teile = []
+        start = 0
+        for i in range(n):
+            if punkte[i+2] % 2:
+                teile.append(wort[start:i+1])
+                start = i + 1
+        teile.append(wort[start:])
+        return teile
+
+
+if __name__ == '__main__':
+
+    usage = u'%prog [Optionen] [Wörter]\n\n' + __doc__
+
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option('-f', '--pattern-file',
+                      help='Trennmuster, Vorgabe "%s"' % default_pfile,
+                      default=default_pfile)
+    parser.add_option('-s', '--long-s-file',
+                      help='Lang-S Muster, Vorgabe "%s"' % default_long_s_file,
+                      default=default_long_s_file)
+    parser.add_option('--hyphen', default='­',
+                      help='Trennzeichen, Vorgabe: weicher Trennstrich '
+                      '(U+00AD)')
+    parser.add_option('--lmin', type='int', default=2,
+                      help='ungetrennte Zeichen am Wortanfang, Vorgabe 2')
+    parser.add_option('--rmin', type='int', default=2,
+                      help='ungetrennte Zeichen am Wortende, Vorgabe 2')
+    parser.add_option('--no-cache', dest='cache', action="store_false",
+                      default=True, help='Trennmuster nicht aus dem Cache '
+                      'laden (siehe pattern_cache.py).')
+
+    (options, args) = parser.parse_args()
+
+    hyphenator = LangSHyphenator(options.pattern_file, options.long_s_file,
+                                 cache=options.cache)
+    hyphen = options.hyphen.decode('utf8')
+
+    if args:
+        for wort in args:
+            print hyphenator.hyphenate_text(wort.decode('utf8'), hyphen,
+                                    options.lmin, options.rmin).encode('utf8')
+    else:
+        hyphenator.hyphenate_file(sys.stdin, sys.stdout, hyphen,
+                                  options.lmin, options.rmin)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Compiled, array-backed pattern trie for the hyphenation module.
+
+    A `PackedTrie` holds the same information as the nested dictionaries of
+    `hyphenation.PatternTree` in a "double-array trie": three flat integer
+    arrays `base`, `check` and `value` instead of one dictionary per node.
+
+    * Characters are mapped to small integer codes (1, 2, ...).
+    * The transition from node `s` with character code `c` leads to node
+      ``t = base[s] + c`` if ``check[t] == s``, otherwise there is none.
+    * ``value[t]`` is an index into the list of (interned) point vectors
+      or 0, if no pattern ends in node `t`.
+
+    Point vectors are stored "sparse" as tuples of (offset, point) pairs
+    with non-zero points. Identical vectors are stored only once.
+
+    >>> from hyphenation import PatternTree
+    >>> trie = PackedTrie(PatternTree([u'1ba', u'a1b', u'2bc']).root)
+    >>> trie.points(u'.abc.')
+    [0, 0, 2, 0, 0, 0]
+    >>> trie.points(u'.abc.') == PatternTree([u'1ba', u'a1b', u'2bc']).points(u'.abc.')
+    True
+"""
+
+from array import array
+
+class PackedTrie(object):
+
+    def __init__(self, tree=None):
+        self.alphabet = {}             # character -> code
+        self.base = array('i', [0])
+        self.check = array('i', [-1])  # -1: unused cell
+        self.value = array('i', [0])
+        self.vectors = [()]            # interned point vectors
+        if tree is not None:
+            self.compile(tree)
+
+    def compile(self, tree):
+        """Fill the arrays with the content of a `PatternTree` root
+        (nested dictionaries, point lists stored under the key `None`).
+        """
+        # Alphabet: all characters used in the patterns.
+        chars = set()
+        stack = [tree]
+        while stack:
+            t = stack.pop()
+            for c, sub in t.iteritems():
+                if c is not None:
+                    chars.add(c)
+                    stack.append(sub)
+        self.alphabet = dict((c, i+1) for i, c in enumerate(sorted(chars)))
+
+        # Place the nodes breadth-first, each node's children at the first
+        # offset `b` where all cells ``b + code`` are unused.
+        # The lists grow in steps, ``skip[i]`` points to a cell >= i that
+        # might be unused (chains through used cells are shortened while
+        # searching).
+        size = 1024
+        base, check, value = [0] * size, [-1] * size, [0] * size
+        skip = range(size)
+        skip[0] = 1 # root node
+        top = 0
+        vectors = [()]
+        interned = {(): 0}
+        last = len(self.alphabet)
+
+        queue = [(tree, 0)]
+        for t, s in queue:
+            children = sorted((self.alphabet[c], sub)
+                              for c, sub in t.iteritems() if c is not None)
+            if not children:
+                continue
+            codes = [code for code, sub in children]
+            first = codes.pop(0)
+            cell = first
+            while True:
+                # first unused cell >= `cell`:
+                i = cell
+                while skip[i] != i:
+                    i = skip[i]
+                while skip[cell] != cell:
+                    skip[cell], cell = i, skip[cell]
+                b = cell - first
+                if b + last + 1 >= size:
+                    n = size
+                    base.extend([0] * n)
+                    check.extend([-1] * n)
+                    value.extend([0] * n)
+                    skip.extend(range(size, size + n))
+                    size += n
+                for code in codes:
+                    if check[b + code] != -1:
+                        break
+                else:
+                    break
+                cell += 1
+            base[s] = b
+            for code, sub in children:
+                check[b + code] = s
+                skip[b + code] = b + code + 1
+                if None in sub:
+                    vector = tuple((j, p) for j, p in enumerate(sub[None]) if p)
+                    if vector not in interned:
+                        interned[vector] = len(vectors)
+                        vectors.append(vector)
+                    value[b + code] = interned[vector]
+                queue.append((sub, b + code))
+            top = max(top, b + last)
+
+        # Truncate (``base[s] + code`` remains a valid index):
+        del base[top+1:], check[top+1:], value[top+1:]
+
+        self.base = array('i', base)
+        self.check = array('i', check)
+        self.value = array('i', value)
+        self.vectors = vectors
+
+    def dump(self):
+        """Return the arrays as `marshal`-able data (see pattern_cache.py).
+        """
+        alphabet = sorted(self.alphabet, key=self.alphabet.get)
+        return (u''.join(alphabet), self.base.tostring(),
+                self.check.tostring(), self.value.tostring(),
+                tuple(self.vectors))
+
+    @classmethod
+    def load(cls, data):
+        """Return a `PackedTrie` with data from `dump()`."""
+        alphabet, base, check, value, vectors = data
+        trie = cls()
+        trie.alphabet = dict((c, i+1) for i, c in enumerate(alphabet))
+        trie.base = array('i', base)
+        trie.check = array('i', check)
+        trie.value = array('i', value)
+        trie.vectors = list(vectors)
+        return trie
+
+    def points(self, work):
+        """Return the list of maximal points for all patterns matching
+        in `work` (the lowercased word with '.' at both ends).
+        """
+        base, check, value = self.base, self.check, self.value
+        vectors = self.vectors
+        # unknown characters get code 0 (never a valid transition)
+        codes = [self.alphabet.get(c, 0) for c in work]
+        points = [0] * (len(work)+1)
+        for i in range(len(work)):
+            s = 0
+            for code in codes[i:]:
+                t = base[s] + code
+                if check[t] != s:
+                    break
+                s = t
+                if value[s]:
+                    for j, p in vectors[value[s]]:
+                        if p > points[i+j]:
+                            points[i+j] = p
+        return points
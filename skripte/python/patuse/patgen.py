@@ -0,0 +1,706 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Generate hyphenation patterns like patgen, in pure Python.
+
+    Usage: patgen.py [options] dictionary pattern-in pattern-out translate
+
+    The arguments are the same as for patgen: a list of hyphenated words,
+    the patterns to start with (e.g. ``pattern.0`` or the result of a
+    previous level), the output file and the translate file (e.g.
+    ``daten/german.tr``). Without ``--levels``, the parameters are read from
+    standard input in patgen's order (``hyph_start hyph_finish``, then
+    ``pat_start pat_finish`` and ``good_wt bad_wt thresh`` for each level,
+    then "y" to write ``pattmp.<level>``), so the script can replace patgen
+    in ``make-full-pattern.sh`` or ``build_patterns.py --patgen``.
+
+    With ``--levels``, the parameters of the given levels are taken from
+    ``make-full-pattern.sh``. Starting with a pattern file of a previous
+    run ("warm start"), only the remaining levels are generated, e.g.
+    ``--levels 5-8`` with ``pattern.4``.
+
+    With ``--update``, no levels are generated. Instead, the input patterns
+    (usually the final ``pattern.8`` of the last run) are checked against
+    the dictionary and a minimal pattern is added for every wrong hyphen
+    that does not change the hyphenation of any other word in the
+    dictionary. With ``--old-dictionary``, only the new or changed words
+    are checked, so a small change of the word list takes seconds instead
+    of a full pattern generation.
+
+    The algorithm follows patgen (Liang's thesis, patgen.web): At odd
+    levels, patterns for missed hyphens are collected, at even levels
+    patterns inhibiting bad hyphens. For each pattern length and dot
+    position, candidate patterns are counted at the "good" and "bad"
+    positions of the dictionary; a candidate is accepted if
+    ``good_wt * good - bad_wt * bad >= thresh``. Candidates with
+    ``good_wt * good < thresh`` are "hopeless": longer patterns containing
+    them are not considered.
+
+    Differences: the dictionary is kept in memory (patgen reads it once per
+    pass), hyphen weights within words are ignored (a leading digit sets
+    the word weight) and the pattern trie statistics of patgen's log are
+    not available.
+
+    >>> tr = Translation([u' 1 1', u' a A', u' b B', u' c C'])
+    >>> gen = PatternGenerator(tr)
+    >>> gen.read_dictionary([u'ab-ba', u'a-ca', u'cab', u'ab-c'])
+    >>> gen.generate_level(1, 1, 3, 1, 1, 1, log=None)
+    >>> gen.generate_level(2, 1, 3, 1, 1, 1, log=None)
+    >>> [tr.format_pattern(*p) for p in gen.pattern_list()]
+    [u'b1b', u'1c']
+    >>> gen.statistics()
+    (3, 0, 0)
+"""
+
+import sys, os, re, codecs, optparse, bisect
+from collections import defaultdict
+
+# Classification of the positions in a word (as in patgen): a hyphen in the
+# dictionary (`IS_HYF`) or not (`NO_HYF`), plus one if the patterns
+# generated so far insert a hyphen (odd value)::
+
+NO_HYF, ERR_HYF, IS_HYF, FOUND_HYF = 0, 1, 2, 3
+
+# Internal representation: every letter of the translate file is mapped to
+# one character of the Private Use Area, the word boundary ("edge of word",
+# "." in patterns) to the first one. Sorting internal strings sorts by the
+# order of the translate file, like patgen's output::
+
+EDGE = unichr(0xE000)
+SEPARATOR = u'\n'   # not in the internal alphabet
+
+def letter(code):
+    return unichr(0xE000 + code)
+
+def code(char):
+    return ord(char) - 0xE000
+
+# Maximal value of a pattern (digits 1...9)::
+
+MAX_VAL = 9
+
+_invalid = re.compile(u'[^\ue000-\uefff]').search
+
+
+class Translation(object):
+    """Letters and hyphenation minima of a patgen translate file.
+
+    The first line contains `left_hyphen_min` and `right_hyphen_min` in
+    columns 1-2 and 3-4 and optionally the characters for bad, missed and
+    good hyphens (default ".-*") in columns 5-7. Each following line starts
+    with a delimiter, followed by the representations of a letter (first
+    the one used for output) separated by the delimiter. A line starting
+    with two delimiters (e.g. "%%") is a comment.
+
+    >>> tr = Translation([u' 2 2', u'%% comment', u' a A', u' \\xdf'])
+    >>> tr.left_hyphen_min, tr.right_hyphen_min, tr.letters
+    (2, 2, [u'.', u'a', u'\\xdf'])
+    >>> w, hyf, weight = tr.parse_word(u'A-\\xdfa')
+    >>> len(w), [i for i, h in enumerate(hyf) if h], weight
+    (5, [2], 1)
+    >>> tr.format_pattern(*tr.parse_pattern(u'.a2\\xdf'))
+    u'.a2\\xdf'
+    """
+
+    def __init__(self, lines=(u' 2 2',)):
+        lines = iter(lines)
+        first = next(lines, u'').rstrip(u'\r\n')
+        self.left_hyphen_min = int(first[0:2] or 2)
+        self.right_hyphen_min = int(first[2:4] or 2)
+        marks = (first[4:7] + u'.-*'[len(first[4:7]):])
+        self.bad_mark, self.missed_mark, self.good_mark = marks
+        self.letters = [u'.']  # output representation by code
+        self.codes = {}        # representation -> internal character
+        for line in lines:
+            line = line.rstrip(u'\r\n')
+            if not line:
+                continue
+            representations = []
+            for rep in line[1:].split(line[0]):
+                if not rep:
+                    break
+                representations.append(rep)
+            if not representations:
+                continue # comment
+            for rep in representations:
+                if rep in self.codes:
+                    raise ValueError(u'letter %r defined twice' % rep)
+                self.codes[rep] = letter(len(self.letters))
+            self.letters.append(representations[0])
+        # tokenizer (longest representation first), digits and markers:
+        reps = sorted(self.codes, key=len, reverse=True)
+        self._tokens = re.compile(u'|'.join(re.escape(rep) for rep in reps)
+                                  + u'|.', re.UNICODE | re.DOTALL).findall
+        # translation table for the fast path (single-character letters):
+        if all(len(rep) == 1 for rep in reps):
+            self._table = dict((ord(rep), char)
+                               for rep, char in self.codes.iteritems())
+        else:
+            self._table = None
+
+    @classmethod
+    def read(cls, path, encoding='iso-8859-15'):
+        return cls(line.decode(encoding) for line in open(path))
+
+    def parse_word(self, word):
+        """Return internal word (with edges), hyphen list and weight.
+
+        ``hyf[dpos]`` is `IS_HYF` for a hyphen after the character
+        ``w[dpos-1]`` of the internal word `w` (patgen's numbering).
+        """
+        if self._table is not None:
+            parsed = self._parse_word_fast(word)
+            if parsed is not None:
+                return parsed
+        chars = [EDGE]
+        hyphens = []
+        weight = 1
+        for token in self._tokens(word.strip()):
+            char = self.codes.get(token)
+            if char is not None:
+                chars.append(char)
+            elif token == self.missed_mark or token == self.good_mark:
+                hyphens.append(len(chars))
+            elif token == self.bad_mark:
+                pass
+            elif token.isdigit():
+                if len(chars) == 1:
+                    weight = int(token)
+            else:
+                raise ValueError(u'bad character %r in %r' % (token, word))
+        chars.append(EDGE)
+        hyf = [NO_HYF] * (len(chars) + 1)
+        for dpos in hyphens:
+            hyf[dpos] = IS_HYF
+        return u''.join(chars), hyf, weight
+
+    def _parse_word_fast(self, word):
+        # translate and split at the hyphens, None for other characters
+        word = word.strip()
+        weight = 1
+        if word[:1].isdigit():
+            weight = int(word[0])
+            word = word[1:]
+        parts = word.replace(self.bad_mark, u'').replace(
+            self.good_mark, self.missed_mark).translate(self._table).split(
+            self.missed_mark)
+        w = EDGE + u''.join(parts) + EDGE
+        if _invalid(w):
+            return None
+        hyf = [NO_HYF] * (len(w) + 1)
+        dpos = 1
+        for part in parts[:-1]:
+            dpos += len(part)
+            hyf[dpos] = IS_HYF
+        return w, hyf, weight
+
+    def parse_pattern(self, pattern):
+        """Return internal letters and a dictionary {offset: value}."""
+        chars = []
+        values = {}
+        for token in self._tokens(pattern.strip()):
+            if token.isdigit():
+                values[len(chars)] = int(token)
+            elif token == u'.':
+                chars.append(EDGE)
+            elif token in self.codes:
+                chars.append(self.codes[token])
+            else:
+                raise ValueError(u'bad character %r in pattern %r'
+                                 % (token, pattern))
+        return u''.join(chars), values
+
+    def format_pattern(self, chars, values):
+        parts = []
+        for i, char in enumerate(chars):
+            if values.get(i):
+                parts.append(unicode(values[i]))
+            parts.append(self.letters[code(char)])
+        if values.get(len(chars)):
+            parts.append(unicode(values[len(chars)]))
+        return u''.join(parts)
+
+    def format_word(self, w, hyf, hval):
+        """Return the word with marks for good, bad and missed hyphens."""
+        marks = {ERR_HYF: self.bad_mark, IS_HYF: self.missed_mark,
+                 FOUND_HYF: self.good_mark}
+        first = self.left_hyphen_min + 1
+        last = len(w) - self.right_hyphen_min - 1
+        parts = []
+        for dpos in range(2, len(w)):
+            parts.append(self.letters[code(w[dpos-1])])
+            if first <= dpos <= last:
+                parts.append(marks.get(hyf[dpos] + (hval[dpos] & 1), u''))
+        return u''.join(parts)
+
+
+# Order of the dot positions for a pattern length (patgen starts in the
+# middle and works outwards):
+#
+# >>> list(dot_positions(4))
+# [2, 1, 3, 0, 4]
+#
+# ::
+
+def dot_positions(pat_len):
+    pat_dot = pat_len // 2
+    dot1 = pat_dot * 2
+    while True:
+        pat_dot = dot1 - pat_dot
+        dot1 = pat_len * 2 - dot1 - 1
+        yield pat_dot
+        if pat_dot == pat_len:
+            break
+
+# Candidates of longer patterns are not counted at a position, if a pattern
+# with a value of at least the current level (or a hopeless candidate)
+# inside the window already covers it. The covering patterns are stored as
+# bits ``1 << (16*left + right)`` with the extent to the left and right of
+# the position; `window_mask` selects the bits of patterns inside the window
+# of a candidate::
+
+def block_bit(pat_len, pat_dot):
+    return 1 << (16 * pat_dot + pat_len - pat_dot)
+
+def window_mask(pat_len, pat_dot):
+    mask = 0
+    for left in range(pat_dot + 1):
+        for right in range(pat_len - pat_dot + 1):
+            mask |= 1 << (16 * left + right)
+    return mask
+
+
+class PatternGenerator(object):
+    """Generate hyphenation patterns for a dictionary, level by level.
+
+    `patterns` maps the internal letters of a pattern to a dictionary
+    {offset: value}.
+    """
+
+    def __init__(self, translation):
+        self.translation = translation
+        # first and last allowed position (patgen's hyf_min, hyf_max):
+        self.hyf_min = translation.left_hyphen_min + 1
+        self.hyf_max = translation.right_hyphen_min + 1
+        self.patterns = {}
+        self._prefixes = set()
+        self._max_len = 0
+        self.words = []  # (internal word, hyphen list, weight)
+        self.hvals = []  # values of the current patterns (or None)
+
+    def read_patterns(self, lines):
+        for line in lines:
+            for pattern in line.split(u'%')[0].split():
+                self.insert(*self.translation.parse_pattern(pattern))
+
+    def read_dictionary(self, lines):
+        for line in lines:
+            if line.strip():
+                self.words.append(self.translation.parse_word(line))
+                self.hvals.append(None)
+
+    def hval(self, i):
+        """Return the values of the current patterns for word `i`."""
+        hval = self.hvals[i]
+        if hval is None:
+            hval = self.hvals[i] = self.values(self.words[i][0])
+        return hval
+
+    def all_values(self):
+        return [self.hval(i) for i in xrange(len(self.words))]
+
+    def insert(self, chars, values):
+        points = self.patterns.setdefault(chars, {})
+        for offset, value in values.iteritems():
+            if value > points.get(offset, 0):
+                points[offset] = value
+        if len(chars) > self._max_len:
+            self._max_len = len(chars)
+        for i in range(1, len(chars) + 1):
+            self._prefixes.add(chars[:i])
+
+    def pattern_list(self):
+        """Return a sorted list of (letters, values) pairs."""
+        return sorted((chars, values) for chars, values
+                      in self.patterns.iteritems() if any(values.values()))
+
+    def values(self, w):
+        """Return the maximal pattern value for every position of `w`."""
+        n = len(w)
+        hval = [0] * (n + 1)
+        prefixes = self._prefixes
+        patterns = self.patterns
+        max_len = self._max_len
+        for spos in xrange(n):
+            for fpos in xrange(spos + 1, min(n, spos + max_len) + 1):
+                chars = w[spos:fpos]
+                if chars not in prefixes:
+                    break
+                points = patterns.get(chars)
+                if points:
+                    for offset, value in points.iteritems():
+                        if value > hval[spos+offset]:
+                            hval[spos+offset] = value
+        return hval
+
+    def value_at(self, w, dpos):
+        """Return the maximal pattern value at position `dpos` of `w`."""
+        value = 0
+        n = len(w)
+        prefixes = self._prefixes
+        patterns = self.patterns
+        for spos in xrange(max(0, dpos - self._max_len), min(dpos, n - 1) + 1):
+            for fpos in xrange(spos + 1, min(n, spos + self._max_len) + 1):
+                chars = w[spos:fpos]
+                if chars not in prefixes:
+                    break
+                points = patterns.get(chars)
+                if points and points.get(dpos - spos, 0) > value:
+                    value = points[dpos - spos]
+        return value
+
+    def statistics(self):
+        """Return the numbers of good, bad and missed hyphens."""
+        counts = [0, 0, 0, 0]
+        hyf_min, hyf_max = self.hyf_min, self.hyf_max
+        for (w, hyf, weight), hval in zip(self.words, self.all_values()):
+            for dpos in xrange(hyf_min, len(w) - hyf_max + 1):
+                counts[hyf[dpos] + (hval[dpos] & 1)] += weight
+        return counts[FOUND_HYF], counts[ERR_HYF], counts[IS_HYF]
+
+    # Generation of one level
+    # -----------------------
+
+    def generate_level(self, level, pat_start, pat_finish,
+                       good_wt, bad_wt, thresh, log=sys.stdout):
+        if level % 2:  # insert missed hyphens
+            good_dot, bad_dot = IS_HYF, NO_HYF
+        else:          # inhibit bad hyphens
+            good_dot, bad_dot = ERR_HYF, FOUND_HYF
+        self.all_values()
+        blocked = [None] * len(self.words)
+        # patterns with values >= level (when regenerating a level) cover
+        # their positions from the start:
+        high = {}
+        for chars, points in self.patterns.iteritems():
+            for offset, value in points.iteritems():
+                if value >= level:
+                    high.setdefault(len(chars), {}).setdefault(
+                        offset, {})[chars] = False
+        for pat_len in high:
+            for pat_dot, found in high[pat_len].iteritems():
+                self._cover(found, pat_len, pat_dot, level, blocked)
+
+        more_this_level = [True] * (pat_finish + 1)
+        level_patterns = 0
+        for pat_len in range(pat_start, pat_finish + 1):
+            for pat_dot in dot_positions(pat_len):
+                if not more_this_level[pat_dot]:
+                    continue
+                if log:
+                    log.write('processing dictionary with pat_len = %d, '
+                              'pat_dot = %d\n' % (pat_len, pat_dot))
+                good, bad = self._count(pat_len, pat_dot, good_dot, bad_dot,
+                                        blocked)
+                # select patterns (accepted: True, hopeless: False):
+                new = {}
+                more_to_come = False
+                good_count = bad_count = 0
+                for chars in set(good).union(bad):
+                    g, b = good.get(chars, 0), bad.get(chars, 0)
+                    if good_wt * g < thresh:
+                        new[chars] = False
+                    elif good_wt * g - bad_wt * b >= thresh:
+                        new[chars] = True
+                        good_count += g
+                        bad_count += b
+                    else:
+                        more_to_come = True
+                more_this_level[pat_dot] = more_to_come
+                accepted = [chars for chars, ok in new.iteritems() if ok]
+                for chars in accepted:
+                    self.insert(chars, {pat_dot: level})
+                level_patterns += len(accepted)
+                if log:
+                    log.write('%d good and %d bad patterns added\n'
+                              % (len(accepted), len(new) - len(accepted)))
+                    log.write('finding %d good and %d bad hyphens\n'
+                              % (good_count, bad_count))
+                if new:
+                    self._cover(new, pat_len, pat_dot, level, blocked)
+            for k in range(pat_finish, 0, -1):
+                if not more_this_level[k-1]:
+                    more_this_level[k] = False
+        if log:
+            log.write('total of %d patterns at hyph_level %d\n'
+                      % (level_patterns, level))
+
+    def _count(self, pat_len, pat_dot, good_dot, bad_dot, blocked):
+        # Count the candidates at good and bad positions (one pass over the
+        # dictionary)
+        good = defaultdict(int)
+        bad = defaultdict(int)
+        dot_min = max(pat_dot, self.hyf_min)
+        dot_max = max(pat_len - pat_dot, self.hyf_max)
+        mask = window_mask(pat_len, pat_dot)
+        for (w, hyf, weight), hval, bl in zip(self.words, self.hvals,
+                                              blocked):
+            for dpos in xrange(dot_min, len(w) - dot_max + 1):
+                dot = hyf[dpos] + (hval[dpos] & 1)
+                if dot == good_dot:
+                    counts = good
+                elif dot == bad_dot:
+                    counts = bad
+                else:
+                    continue
+                if bl is not None and bl[dpos] & mask:
+                    continue
+                spos = dpos - pat_dot
+                counts[w[spos:spos+pat_len]] += weight
+        return good, bad
+
+    def _cover(self, new, pat_len, pat_dot, level, blocked):
+        # Update values and covered positions for the new patterns (True)
+        # and hopeless candidates (False) of length `pat_len`
+        bit = block_bit(pat_len, pat_dot)
+        for i, (w, hyf, weight) in enumerate(self.words):
+            for spos in xrange(len(w) - pat_len + 1):
+                accepted = new.get(w[spos:spos+pat_len])
+                if accepted is None:
+                    continue
+                dpos = spos + pat_dot
+                bl = blocked[i]
+                if bl is None:
+                    bl = blocked[i] = [0] * (len(w) + 1)
+                bl[dpos] |= bit
+                if accepted and self.hvals[i][dpos] < level:
+                    self.hvals[i][dpos] = level
+
+    # Corrections for a changed dictionary
+    # ------------------------------------
+
+    def correct(self, indices=None, max_len=13, log=sys.stdout):
+        """Add patterns fixing the wrong hyphens of the words `indices`.
+
+        For each wrong position, the shortest pattern (of at most `max_len`
+        characters) with a value one above the current one is added, if it
+        does not spoil any other position of the dictionary.
+        Return the list of indices of the words that could not be fixed.
+        """
+        # all words in one string, to find the occurrences of a pattern:
+        starts = []
+        pos = 0
+        for w, hyf, weight in self.words:
+            starts.append(pos)
+            pos += len(w) + 1
+        text = SEPARATOR.join(w for w, hyf, weight in self.words)
+        if indices is None:
+            indices = range(len(self.words))
+        unfixed = []
+        added = 0
+        for i in indices:
+            w, hyf, weight = self.words[i]
+            hval = self.hval(i)
+            fixed = True
+            for dpos in xrange(self.hyf_min, len(w) - self.hyf_max + 1):
+                if hyf[dpos] + (hval[dpos] & 1) not in (ERR_HYF, IS_HYF):
+                    continue
+                if hval[dpos] >= MAX_VAL:
+                    fixed = False
+                    continue
+                if self._fix(i, dpos, hval[dpos] + 1, max_len, text, starts):
+                    added += 1
+                else:
+                    fixed = False
+            if not fixed:
+                unfixed.append(i)
+        if log:
+            log.write('%d patterns added, %d words not fixed\n'
+                      % (added, len(unfixed)))
+        return unfixed
+
+    def _fix(self, i, dpos, value, max_len, text, starts):
+        w = self.words[i][0]
+        for pat_len in range(1, min(max_len, len(w)) + 1):
+            for pat_dot in dot_positions(pat_len):
+                spos = dpos - pat_dot
+                if spos < 0 or spos + pat_len > len(w):
+                    continue
+                chars = w[spos:spos+pat_len]
+                changes = self._changes(chars, pat_dot, value, text, starts)
+                if changes is not None:
+                    self.insert(chars, {pat_dot: value})
+                    for j, d in changes:
+                        if self.hvals[j] is not None:
+                            self.hvals[j][d] = value
+                    return True
+        return False
+
+    def _changes(self, chars, pat_dot, value, text, starts):
+        # Return the positions where the new pattern raises the value or
+        # None if it would spoil a correct position.
+        changes = []
+        pos = text.find(chars)
+        while pos >= 0:
+            j = bisect.bisect_right(starts, pos) - 1
+            w, hyf, weight = self.words[j]
+            dpos = pos - starts[j] + pat_dot
+            if self.hyf_min <= dpos <= len(w) - self.hyf_max:
+                # values of unchecked words are computed later (with the
+                # new patterns), only the position is needed here
+                if self.hvals[j] is not None:
+                    old = self.hvals[j][dpos]
+                else:
+                    old = self.value_at(w, dpos)
+                if old < value:
+                    if ((old & 1) != (value & 1)
+                        and hyf[dpos] + (old & 1) in (NO_HYF, FOUND_HYF)):
+                        return None
+                    changes.append((j, dpos))
+            pos = text.find(chars, pos + 1)
+        return changes
+
+    # Output
+    # ------
+
+    def write_patterns(self, out):
+        for chars, values in self.pattern_list():
+            out.write(self.translation.format_pattern(chars, values) + u'\n')
+
+    def write_pattmp(self, out):
+        for (w, hyf, weight), hval in zip(self.words, self.all_values()):
+            if weight != 1:
+                out.write(unicode(weight))
+            out.write(self.translation.format_word(w, hyf, hval) + u'\n')
+
+
+# Parameters
+# ----------
+
+# Read the level parameters from make-full-pattern.sh. Return a dictionary
+# {level: (pat_start, pat_finish, good_wt, bad_wt, thresh)}::
+
+default_parameter_file = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'make-full-pattern.sh')
+
+def read_parameters(path=default_parameter_file):
+    fields = {}
+    for line in open(path):
+        match = re.match(r"(\w+)\[(\d+)\]='([^']*)'", line)
+        if match:
+            fields.setdefault(match.group(1), {})[int(match.group(2))] = [
+                int(value) for value in match.group(3).split()]
+    parameters = {}
+    for i, (start, finish) in fields['hyph_start_finish'].iteritems():
+        for level in range(start, finish + 1):
+            parameters[level] = tuple(fields['pat_start_finish'][i]
+                                      + fields['good_bad_thres'][i])
+    return parameters
+
+# Parameters in patgen's order on standard input. Return a dictionary like
+# `read_parameters()` and the answer to "hyphenate word list?"::
+
+def read_stdin_parameters(stdin):
+    def numbers():
+        return [int(value) for value in stdin.readline().split()]
+    hyph_start, hyph_finish = numbers()
+    parameters = {}
+    for level in range(hyph_start, hyph_finish + 1):
+        parameters[level] = tuple(numbers() + numbers())
+    pattmp = stdin.readline().strip().lower().startswith('y')
+    return parameters, pattmp
+
+def parse_levels(levels):
+    first, sep, last = levels.partition('-')
+    return range(int(first), int(last or first) + 1)
+
+
+if __name__ == '__main__':
+
+    usage = u'%prog [options] dictionary pattern-in pattern-out translate\n\n'
+    parser = optparse.OptionParser(usage=usage + __doc__.split('\n\n')[2])
+    parser.add_option('-l', '--levels',
+                      help='levels to generate, e.g. "1-8" or "5-8" '
+                      '(warm start with pattern-in), parameters from '
+                      'make-full-pattern.sh. Default: read the parameters '
+                      'from stdin like patgen.')
+    parser.add_option('-p', '--parameter-file', default=default_parameter_file,
+                      help='file with the level parameters, default '
+                      '"make-full-pattern.sh"')
+    parser.add_option('-d', '--directory',
+                      help='write pattern.<level> and pattmp.<level> for '
+                      'every level to DIRECTORY')
+    parser.add_option('-u', '--update', action='store_true', default=False,
+                      help='add patterns for the wrong hyphens of the '
+                      'dictionary instead of generating levels')
+    parser.add_option('--old-dictionary',
+                      help='with --update: check only the words not in '
+                      'OLD_DICTIONARY')
+    parser.add_option('--max-len', type='int', default=13,
+                      help='with --update: maximal pattern length, '
+                      'default 13')
+    parser.add_option('-e', '--encoding', default='iso-8859-15',
+                      help='encoding of all files, default "iso-8859-15"')
+    (options, args) = parser.parse_args()
+
+    if len(args) != 4:
+        parser.error('expected 4 arguments')
+    dictionary, pattern_in, pattern_out, translate = args
+    enc = options.encoding
+    log = sys.stdout
+
+    translation = Translation.read(translate, enc)
+    log.write('left_hyphen_min = %d, right_hyphen_min = %d, %d letters\n'
+              % (translation.left_hyphen_min, translation.right_hyphen_min,
+                 len(translation.letters) - 1))
+    generator = PatternGenerator(translation)
+    generator.read_patterns(line.decode(enc) for line in open(pattern_in))
+    log.write('%d patterns read in\n' % len(generator.pattern_list()))
+    lines = [line.decode(enc) for line in open(dictionary)]
+    generator.read_dictionary(lines)
+
+    if options.update:
+        indices = None
+        if options.old_dictionary:
+            old = set(line.decode(enc) for line in open(options.old_dictionary))
+            indices = [i for i, line in enumerate(l for l in lines if l.strip())
+                       if line not in old]
+            log.write('%d new or changed words\n' % len(indices))
+        unfixed = generator.correct(indices, options.max_len, log)
+        for i in unfixed:
+            w, hyf, weight = generator.words[i]
+            log.write('not fixed: %s\n' % translation.format_word(
+                w, hyf, generator.hval(i)).encode('utf8'))
+        pattmp = False
+    else:
+        if options.levels:
+            parameters = read_parameters(options.parameter_file)
+            parameters = dict((level, parameters[level])
+                              for level in parse_levels(options.levels))
+            pattmp = bool(options.directory)
+        else:
+            parameters, pattmp = read_stdin_parameters(sys.stdin)
+        for level in sorted(parameters):
+            log.write('hyph_level = %d: pat_start, pat_finish = %d %d, '
+                      'good weight, bad weight, threshold = %d %d %d\n'
+                      % ((level,) + parameters[level]))
+            generator.generate_level(level, *parameters[level], log=log)
+            if options.directory:
+                path = os.path.join(options.directory, 'pattern.%d' % level)
+                with codecs.open(path, 'w', enc) as out:
+                    generator.write_patterns(out)
+                if pattmp:
+                    path = os.path.join(options.directory, 'pattmp.%d' % level)
+                    with codecs.open(path, 'w', enc) as out:
+                        generator.write_pattmp(out)
+            log.write('%d good, %d bad, %d missed\n'
+                      % generator.statistics())
+        if pattmp and not options.directory:
+            with codecs.open('pattmp.%d' % max(parameters), 'w', enc) as out:
+                generator.write_pattmp(out)
+
+    with codecs.open(pattern_out, 'w', enc) as out:
+        generator.write_patterns(out)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Persistent cache for compiled pattern structures.
+
+    Parsing a pattern file and building the pattern tree takes most of the
+    start-up time of the scripts using `hyphenation.Hyphenator`. The cache
+    stores the compiled structure (see the `dump()` and `load()` methods of
+    the engines in hyphenation.py) in a binary file per pattern file,
+    engine and encoding of the pattern file.
+
+    A cache file starts with one header line::
+
+      patuse-cache <format> <mtime> <size> <sha1>
+
+    with modification time, size and SHA1 checksum of the pattern file
+    (or a list of pattern files compiled into one structure), followed by
+    the `marshal`-ed structure. The whole file is loaded with
+    one read.  If mtime or size differ, the checksum decides whether the
+    cache is stale and must be rebuilt.
+
+    The cache directory is ``$PATUSE_CACHE`` or ``~/.cache/patuse``.
+    Errors when writing the cache are ignored. Other scripts keep their
+    caches for data files in the same directory (see `cache_file()`).
+"""
+
+import os, codecs, hashlib, marshal
+
+cache_dir = os.environ.get('PATUSE_CACHE',
+                           os.path.join(os.path.expanduser('~'),
+                                        '.cache', 'patuse'))
+
+# Version of the cache file format, increment if the structure of an
+# engine changes::
+
+format_version = '1'
+
+
+def cache_path(pattern_file, engine, encoding='utf8'):
+    """Return the path of the cache file for `pattern_file`, `engine` and
+    the `encoding` of the pattern file.
+
+    `pattern_file` may also be a list of files compiled into one structure.
+    """
+    key = hashlib.sha1('\n'.join(os.path.abspath(path)
+                                  for path in _files(pattern_file)))
+    # aliases ('latin9', 'iso-8859-15') use the same cache file
+    key.update('\n' + codecs.lookup(encoding).name)
+    return os.path.join(cache_dir, '%s-%s.cache' % (key.hexdigest()[:16],
+                                                    engine))
+
+def cache_file(path, suffix):
+    """Return the path of a cache file with `suffix` for the data file
+    `path` (e.g. the sort keys of a word list) in the cache directory.
+
+    The name starts with a hash of the absolute path, files with the same
+    name in different directories have different cache files.
+    """
+    key = hashlib.sha1(os.path.abspath(path))
+    return os.path.join(cache_dir, '%s-%s%s' % (key.hexdigest()[:16],
+                                                os.path.basename(path), suffix))
+
+def _files(pattern_file):
+    if isinstance(pattern_file, basestring):
+        return [pattern_file]
+    return list(pattern_file)
+
+def _stamp(pattern_file):
+    # modification time and size (comma separated for several files)
+    stats = [os.stat(path) for path in _files(pattern_file)]
+    return [','.join(repr(stat.st_mtime) for stat in stats),
+            ','.join(str(stat.st_size) for stat in stats)]
+
+def _checksum(pattern_file):
+    checksum = hashlib.sha1()
+    for path in _files(pattern_file):
+        checksum.update(_read(path))
+    return checksum.hexdigest()
+
+def _read(path):
+    f = open(path, 'rb')
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+def _write(path, header, data):
+    # write to a temporary file and rename (atomic on POSIX)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    tmpfile = '%s.%d' % (path, os.getpid())
+    f = open(tmpfile, 'wb')
+    try:
+        f.write(' '.join(header) + '\n')
+        marshal.dump(data, f)
+    finally:
+        f.close()
+    os.rename(tmpfile, path)
+
+
+def load(pattern_file, engine, build, loader, encoding='utf8'):
+    """Return the compiled pattern structure for `pattern_file` (decoded
+    with `encoding` by `build`).
+
+    `build` is called without arguments to compile the patterns, if there
+    is no valid cache file, the result is stored with its `dump()` method.
+    `loader` re-creates the structure from the cached data.
+    """
+    path = cache_path(pattern_file, engine, encoding)
+    stamp = _stamp(pattern_file)
+    checksum = None
+
+    try:
+        content = _read(path)
+        header, data = content.split('\n', 1)
+        header = header.split()
+        if header[:2] == ['patuse-cache', format_version]:
+            if header[2:4] != stamp:
+                checksum = _checksum(pattern_file)
+                if header[4] != checksum:
+                    raise ValueError('stale cache')
+                data = marshal.loads(data)
+                try: # update the time stamp
+                    _write(path, ['patuse-cache', format_version]
+                                 + stamp + [checksum], data)
+                except (IOError, OSError):
+                    pass
+                return loader(data)
+            return loader(marshal.loads(data))
+    except (IOError, OSError, ValueError, EOFError, TypeError, IndexError):
+        pass
+
+    structure = build()
+    if checksum is None:
+        checksum = _checksum(pattern_file)
+    try:
+        _write(path, ['patuse-cache', format_version] + stamp + [checksum],
+               structure.dump())
+    except (IOError, OSError):
+        pass
+    return structure
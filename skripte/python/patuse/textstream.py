@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Word-by-word transformation of text, also for large files.
+
+    The text is split into runs of non-word characters (including digits
+    and '_') and words (starting with a letter, see `word_split`). A
+    transformation (e.g. hyphenation or long-s conversion) is applied to
+    the words, the non-word characters are kept:
+
+    >>> transform_text(u'Ein Test, 2 Wörter.', lambda word: word.upper())
+    u'EIN TEST, 2 W\\xd6RTER.'
+
+    `transform_chunks()` and `transform_file()` process text in chunks.
+    A word at the end of a chunk is kept for the next chunk, so words are
+    never split at chunk boundaries and the result equals the
+    transformation of the whole text:
+
+    >>> list(transform_chunks([u'Ein Te', u'st, 2 W', u'örter.'],
+    ...                       lambda word: word.upper()))
+    [u'EIN ', u'TEST, 2 ', u'W\\xd6RTER.']
+
+    `transform_file()` reads and writes incrementally, the memory use does
+    not depend on the file size.
+"""
+
+import re, codecs
+
+# Words start with a word character that is not a digit or '_'. (The
+# same tokens as finding runs of non-word characters followed by word
+# characters with ``r"([\W0-9_]*)(\w*)"``.) With `re.split`, the words are
+# the items with odd index::
+
+word_split = re.compile(r"([^\W0-9_]\w*)", flags=re.UNICODE)
+
+_word_char = re.compile(r"\w", flags=re.UNICODE).match
+
+def transform_text(text, transform):
+    """Return `text` with every word replaced by ``transform(word)``."""
+    parts = word_split.split(text)
+    parts[1::2] = map(transform, parts[1::2])
+    return u''.join(parts)
+
+def transform_chunks(chunks, transform):
+    """Yield the transformed text of `chunks` (unicode strings).
+
+    Trailing word characters of a chunk are transformed with the next
+    chunk.
+    """
+    tail = u''
+    for chunk in chunks:
+        text = tail + chunk
+        end = len(text)
+        while end and _word_char(text, end - 1):
+            end -= 1
+        tail = text[end:]
+        if end:
+            yield transform_text(text[:end], transform)
+    if tail:
+        yield transform_text(tail, transform)
+
+def read_chunks(stream, encoding='utf8', size=1<<16):
+    """Yield the decoded content of `stream` in chunks of about `size`
+    bytes (multi-byte characters are not split).
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        data = stream.read(size)
+        chunk = decoder.decode(data, not data)
+        if chunk:
+            yield chunk
+        if not data:
+            break
+
+def line_chunks(lines, size):
+    """Yield lists of `size` lines (the last one may be shorter) from the
+    iterable `lines`, e.g. for the work packages of a process pool.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def transform_file(infile, outfile, transform, encoding='utf8',
+                   size=1<<16):
+    """Write the transformed content of the file object `infile` to
+    `outfile` (both with `encoding`) chunk by chunk.
+    """
+    write = outfile.write
+    for text in transform_chunks(read_chunks(infile, encoding, size),
+                                 transform):
+        write(text.encode(encoding))
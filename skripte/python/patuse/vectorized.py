@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# :Licence:   Released without warranty under the terms of the
+#             GNU General Public License (v. 2 or later)
+
+u"""Hyphenate many words at once with NumPy arrays (optional).
+
+    `split_words()` returns the same pieces as `Hyphenator.split_word()`
+    for a list of words. The patterns (as `PackedTrie`, see
+    packed_trie.py) are applied to a batch of words together:
+
+    * The words are encoded as rows of a 2-D integer array (character
+      codes of the trie alphabet, 0 for padding and unknown characters).
+    * For each start offset, the trie is walked for all words at once with
+      the `base` and `check` arrays. Nodes with a point vector give
+      (word, start offset, vector) triples.
+    * The point vectors (stored flat, with start index and length per
+      vector) are combined with ``np.maximum.at()`` in a padded 2-D points
+      matrix.
+    * The `lmin`/`rmin` masks and the selection of odd values are applied
+      to the whole matrix.
+
+    Without NumPy (or with the "automaton" engine and the `LayeredTree` of
+    a `MultiHyphenator`), `split_words()` uses `Hyphenator.split_word()`
+    for every word.
+
+    >>> from hyphenation import Hyphenator
+    >>> hyphenator = Hyphenator('en-US.pat', engine='packed')
+    >>> split_words(hyphenator, [u'hyphenation', u'project', u'a'])
+    [[u'hy', u'phen', u'ation'], [u'pro', u'ject'], [u'a']]
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from packed_trie import PackedTrie
+
+available = np is not None
+
+
+class VectorTrie(object):
+    """The arrays of a `PackedTrie` (or `PatternTree`) as NumPy arrays."""
+
+    def __init__(self, trie):
+        if not isinstance(trie, PackedTrie):
+            trie = PackedTrie(trie.root)
+        self.base = np.array(trie.base, dtype=np.intp)
+        self.check = np.array(trie.check, dtype=np.intp)
+        self.value = np.array(trie.value, dtype=np.intp)
+        # point vectors: offsets and points of all vectors in flat arrays
+        lengths = [len(vector) for vector in trie.vectors]
+        self.vector_length = np.array(lengths, dtype=np.intp)
+        self.vector_start = np.cumsum(self.vector_length) - self.vector_length
+        self.vector_offset = np.array([j for vector in trie.vectors
+                                      for j, p in vector], dtype=np.intp)
+        self.vector_point = np.array([p for vector in trie.vectors
+                                     for j, p in vector], dtype=np.int32)
+        # character codes by code point (the last entry is 0 and used for
+        # all code points above the alphabet)
+        top = max([ord(c) for c in trie.alphabet] or [0])
+        self.table = np.zeros(top + 2, dtype=np.intp)
+        for c, code in trie.alphabet.items():
+            self.table[ord(c)] = code
+
+    def encode(self, works):
+        """Return the character codes of `works` as 2-D array (one row per
+        work, padded with 0) and the array of lengths.
+        """
+        lengths = np.array([len(work) for work in works], dtype=np.intp)
+        width = int(lengths.max()) if len(works) else 0
+        chars = np.frombuffer(u''.join(works).encode('utf-32-le'),
+                              dtype='<u4').astype(np.intp)
+        flat = self.table[np.minimum(chars, len(self.table) - 1)]
+        rows = np.repeat(np.arange(len(works)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        cols = np.arange(len(chars)) - np.repeat(starts, lengths)
+        codes = np.zeros((len(works), width), dtype=np.intp)
+        codes[rows, cols] = flat
+        return codes, lengths
+
+    def points(self, works):
+        """Return the maximal points for all `works` (lowercased words with
+        '.' at both ends) as 2-D array. Row `i` starts with the
+        ``len(works[i]) + 1`` values of ``PackedTrie.points(works[i])``.
+        """
+        codes, lengths = self.encode(works)
+        n, width = codes.shape
+        base, check, value = self.base, self.check, self.value
+        hit_rows, hit_starts, hit_vectors = [], [], []
+        for i in range(width):
+            rows = np.nonzero(lengths > i)[0]
+            state = np.zeros(len(rows), dtype=np.intp)
+            for d in range(i, width):
+                code = codes[rows, d]
+                t = base[state] + code
+                ok = (code > 0) & (check[t] == state)
+                rows, state = rows[ok], t[ok]
+                if not len(rows):
+                    break
+                vectors = value[state]
+                hit = vectors > 0
+                if hit.any():
+                    hit_rows.append(rows[hit])
+                    hit_starts.append(np.full(int(hit.sum()), i,
+                                              dtype=np.intp))
+                    hit_vectors.append(vectors[hit])
+
+        points = np.zeros((n, width + 1), dtype=np.int32)
+        if hit_rows:
+            rows = np.concatenate(hit_rows)
+            starts = np.concatenate(hit_starts)
+            vectors = np.concatenate(hit_vectors)
+            # one entry for each (offset, point) pair of the vectors:
+            counts = self.vector_length[vectors]
+            first = np.cumsum(counts) - counts
+            k = (np.repeat(self.vector_start[vectors], counts)
+                 + np.arange(int(counts.sum())) - np.repeat(first, counts))
+            cols = np.repeat(starts, counts) + self.vector_offset[k]
+            np.maximum.at(points, (np.repeat(rows, counts), cols),
+                          self.vector_point[k])
+        return points
+
+    def breaks(self, words, lmin=2, rmin=2):
+        """Return the break positions (number of characters before the
+        break) for each of the `words`, as `Hyphenator.split_word()`
+        without exceptions.
+        """
+        works = [u'.' + word.lower() + u'.' for word in words]
+        points = self.points(works)
+        m = np.array([len(word) for word in words], dtype=np.intp)
+        cols = np.arange(points.shape[1])
+        # no hyphens in the first `lmin` and the last `rmin` characters
+        # (columns 1...lmin and m+2-rmin...m+1):
+        points[:, 1:lmin+1] = 0
+        points[(cols >= (m + 2 - rmin)[:, None])
+               & (cols <= (m + 1)[:, None])] = 0
+        # break after character j (j < m) for odd points[j+2]:
+        odd = ((points[:, 2:] & 1) == 1) & (cols[:-2] < m[:, None])
+        rows, after = np.nonzero(odd)
+        counts = np.bincount(rows, minlength=len(words))
+        return np.split(after + 1, np.cumsum(counts)[:-1])
+
+
+def split_words(hyphenator, words, lmin=2, rmin=2, batch_size=10000):
+    """Return the list of pieces for each of the `words`, like
+    ``[hyphenator.split_word(word, lmin, rmin) for word in words]``.
+
+    Repeated words are hyphenated only once; the other words are processed
+    in batches of `batch_size` words (short words and exceptions with
+    `split_word()`).
+    """
+    tree = hyphenator.tree
+    # plain `PatternTree` or `PackedTrie` (a `LayeredTree` stores
+    # {layer: points} dictionaries instead of points)
+    if (not available or hasattr(tree, 'nlayers')
+        or not (isinstance(tree, PackedTrie) or hasattr(tree, 'root'))):
+        return [hyphenator.split_word(word, lmin, rmin) for word in words]
+    trie = getattr(hyphenator, '_vector_trie', None)
+    if trie is None:
+        trie = hyphenator._vector_trie = VectorTrie(tree)
+
+    pieces = {}
+    batch = []  # words for the vectorized path
+    for word in words:
+        if word in pieces:
+            continue
+        if len(word) < (lmin + rmin) or word.lower() in hyphenator.exceptions:
+            pieces[word] = hyphenator.split_word(word, lmin, rmin)
+        else:
+            pieces[word] = None
+            batch.append(word)
+    for start in range(0, len(batch), batch_size):
+        chunk = batch[start:start+batch_size]
+        for word, cuts in zip(chunk, trie.breaks(chunk, lmin, rmin)):
+            cuts = [0] + cuts.tolist() + [len(word)]
+            pieces[word] = [word[a:b] for a, b in zip(cuts, cuts[1:])]
+    return [list(pieces[word]) for word in words]
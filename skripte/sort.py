@@ -20,18 +20,30 @@ Die Kodierung ist UTF8.
 
 Es wird wahlweise nach Duden oder nach der bis März 2012 für die Wortliste
 genutzten Regel sortiert. Voreinstellung ist Dudensortierung.
+
+Die Sortierschlüssel werden im Cache-Verzeichnis ("$PATUSE_CACHE" oder
+"~/.cache/patuse") zwischengespeichert und nur für geänderte Zeilen neu
+berechnet.
+
+Mit --external werden beliebig viele (und große) Eingangsdateien mit
+beschränktem Speicherbedarf zu einer sortierten Gesamtliste zusammengeführt
+und auf die Standardausgabe geschrieben.
 """
 
 usage = u'%prog [Optionen] [Eingangsdatei]\n' + __doc__
 
 
-import unicodedata, sys, optparse, os
+import unicodedata, sys, optparse, os, hashlib, marshal, heapq, tempfile
+import bisect, random, time
+from itertools import chain, islice, izip
 
 # path for local Python modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python'))
 
-from edit_tools.wortliste import (WordFile, WordEntry, 
-                                  join_word, udiff, sortkey_duden)
+from edit_tools.wortliste import (WordEntry, join_word, udiff, sortkey_duden,
+                                  matching_opcodes, format_udiff,
+                                  out_of_order)
+from patuse.pattern_cache import cache_file
 
 # sortkey_wl
 # ----------
@@ -65,6 +77,218 @@ def sortkey_wl(entry):
     return key
 
 
+# SortKeyCache
+# ------------
+#
+# Zwischenspeicher für Sortierschlüssel. Die Schlüssel werden über die
+# MD5-Prüfsumme der (UTF-8-kodierten) Zeile gefunden; nur Zeilen ohne
+# gespeicherten Schlüssel werden geparst und ausgewertet. `save` schreibt
+# die Schlüssel der im aktuellen Lauf verwendeten Zeilen (``marshal``),
+# Schreibfehler werden ignoriert::
+
+cache_format = '1'
+
+class SortKeyCache(object):
+
+    def __init__(self, sortkey, path=None):
+        self.sortkey = sortkey
+        self.path = path
+        self.keys = {} # Prüfsumme -> Sortierschlüssel
+        self.used = {} # im aktuellen Lauf verwendete Schlüssel
+        self.computed = 0
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = marshal.load(f)
+            finally:
+                f.close()
+        except (IOError, EOFError, ValueError, TypeError):
+            return
+        if data[:2] == (cache_format, self.sortkey.__name__):
+            self.keys = data[2]
+
+    def key(self, line):
+        digest = hashlib.md5(line).digest()
+        key = self.keys.get(digest)
+        if key is None:
+            key = self.keys[digest] = self.sortkey(
+                                        WordEntry(line.decode('utf8')))
+            self.computed += 1
+        self.used[digest] = key
+        return key
+
+    def save(self):
+        if not self.path:
+            return
+        if not self.computed and len(self.used) == len(self.keys):
+            return # keine Änderungen
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            tmpfile = '%s.%d' % (self.path, os.getpid())
+            f = open(tmpfile, 'wb')
+            try:
+                marshal.dump((cache_format, self.sortkey.__name__, self.used),
+                             f, 2)
+            finally:
+                f.close()
+            os.rename(tmpfile, self.path)
+        except (IOError, OSError):
+            pass
+
+
+# external_sort
+# -------------
+#
+# Sortiere die Zeilen des Iterators `lines` nach `key` mit beschränktem
+# Speicherbedarf: Abschnitte von je `run_size` Zeilen werden sortiert in
+# temporäre Dateien geschrieben und anschließend zusammengeführt. Die
+# laufende Nummer als zweites Sortierkriterium erhält die Reihenfolge von
+# Zeilen mit gleichem Schlüssel (wie `sorted`).
+#
+# >>> from sort import external_sort
+# >>> lines = ['b1', 'a1', 'c1', 'a2', 'b2']
+# >>> list(external_sort(iter(lines), key=lambda line: line[0], run_size=2))
+# ['a1', 'a2', 'b1', 'b2', 'c1']
+#
+# ::
+
+def external_sort(lines, key, run_size=100000, tmpdir=None):
+    runs = []
+    run = []
+    try:
+        for i, line in enumerate(lines):
+            run.append((key(line), i, line))
+            if len(run) >= run_size:
+                runs.append(_write_run(run, tmpdir))
+                run = []
+        run.sort()
+        for (k, i, line) in heapq.merge(*([_read_run(f) for f in runs]
+                                         + [iter(run)])):
+            yield line
+    finally:
+        for f in runs:
+            f.close()
+
+def _write_run(run, tmpdir=None):
+    run.sort()
+    f = tempfile.TemporaryFile(dir=tmpdir)
+    for record in run:
+        marshal.dump(record, f, 2)
+    f.seek(0)
+    return f
+
+def _read_run(f):
+    while True:
+        try:
+            yield marshal.load(f)
+        except EOFError:
+            return
+
+
+# Inkrementelles Sortieren
+# ------------------------
+#
+# Nach kleinen Änderungen ist die Liste bis auf wenige Einträge sortiert.
+# Ein linearer Test über die Schlüssel genügt dann, um festzustellen, ob
+# sich etwas geändert hat::
+
+def is_sorted(keys):
+    return all(a <= b for a, b in izip(keys, islice(keys, 1, None)))
+
+# Andernfalls bleiben die Einträge einer längsten sortierten Teilfolge an
+# ihrem Platz, nur die übrigen werden per Binärsuche neu einsortiert. Der
+# Index als zweites Sortierkriterium ergibt dieselbe Reihenfolge wie
+# `sorted`.
+#
+# Gib die neue Reihenfolge (Liste der alten Indizes) und die Indizes der
+# verschobenen Einträge zurück::
+#
+# >>> from sort import incremental_sort
+# >>> incremental_sort(['a', 'c', 'd', 'b', 'e'])
+# ([0, 3, 1, 2, 4], [3])
+#
+# ::
+
+def incremental_sort(keys):
+    if is_sorted(keys):
+        return range(len(keys)), []
+    pairs = zip(keys, xrange(len(keys)))
+    moved = out_of_order(pairs)
+    is_moved = set(moved)
+    order = [pair for pair in pairs if pair[1] not in is_moved]
+    for i in moved:
+        bisect.insort(order, pairs[i])
+    return [i for key, i in order], moved
+
+# Patch für die Umsortierung. Da bekannt ist, welche Zeilen an ihrem Platz
+# bleiben, wird der "unified diff" ohne `difflib`-Vergleich erstellt::
+#
+# >>> from sort import sort_patch
+# >>> print sort_patch(['a', 'c', 'd', 'b', 'e'], [0, 3, 1, 2, 4], [3],
+# ...                  'liste', 'liste-sortiert')
+# --- liste
+# +++ liste-sortiert
+# @@ -1,5 +1,5 @@
+#  a
+# +b
+#  c
+#  d
+# -b
+#  e
+#
+# ::
+
+def sort_patch(lines, order, moved, fromfile='', tofile=''):
+    if not moved:
+        return None
+    moved = set(moved)
+    matches = [(i, j) for j, i in enumerate(order) if i not in moved]
+    opcodes = matching_opcodes(matches, len(lines), len(order))
+    sortiert = [lines[i] for i in order]
+    return '\n'.join(format_udiff(lines, sortiert, opcodes,
+                                  fromfile, tofile))
+
+# Vergleich der Laufzeit von vollständiger Sortierung mit `udiff` und
+# inkrementeller Sortierung, bei unveränderter (sortierter) Liste und
+# nach Verschieben von `n_edits` zufälligen Zeilen. Die Schlüssel werden
+# vorab berechnet, verglichen wird nur das Sortieren und Erstellen des
+# Patches::
+
+def benchmark(lines, key, n_edits=100):
+    keys = dict((line, key(line)) for line in lines)
+    key = keys.__getitem__
+    lines = sorted(lines, key=key)
+    edited = list(lines)
+    random.seed(1)
+    for n in range(n_edits):
+        line = edited.pop(random.randrange(len(edited)))
+        edited.insert(random.randrange(len(edited)), line)
+
+    print '%-22s %10s %14s' % ('', 'vollständig', 'inkrementell')
+    for label, liste in (('unverändert', lines),
+                         ('%d Zeilen verschoben' % n_edits, edited)):
+        start = time.time()
+        sortiert = sorted(liste, key=key)
+        udiff([zeile.decode('utf8') for zeile in liste],
+              [zeile.decode('utf8') for zeile in sortiert])
+        t_full = time.time() - start
+
+        start = time.time()
+        order, moved = incremental_sort(map(key, liste))
+        sort_patch(liste, order, moved)
+        t_incremental = time.time() - start
+
+        assert [liste[i] for i in order] == sortiert
+        print '%-22s %9.2fs %13.2fs' % (label, t_full, t_incremental)
+
+
 # Aufruf von der Kommandozeile
 # ============================
 #
@@ -84,6 +308,30 @@ if __name__ == '__main__':
     parser.add_option('-d', '--dump', action="store_true", default=False,
                       help='Schreibe die sortierte Liste '
                       'auf die Standardausgabe.')
+    parser.add_option('-c', '--cache',
+                      help='Zwischenspeicher für Sortierschlüssel, '
+                      'Vorgabe "<Eingangsdatei>.sortkeys-duden" '
+                      'bzw. "<Eingangsdatei>.sortkeys-wl" '
+                      'im Cache-Verzeichnis')
+    parser.add_option('--no-cache', action="store_true", default=False,
+                      help='Sortierschlüssel nicht zwischenspeichern.')
+    parser.add_option('-x', '--external', action="store_true", default=False,
+                      help='Externes Sortieren: alle Eingangsdateien '
+                      'zusammenführen, sortierte Gesamtliste auf die '
+                      'Standardausgabe schreiben.')
+    parser.add_option('-n', '--run-size', type='int', default=100000,
+                      help='Zeilen pro Abschnitt beim externen Sortieren, '
+                      'Vorgabe 100000')
+    parser.add_option('-k', '--check', action="store_true", default=False,
+                      help='Nur testen, ob die Liste sortiert ist '
+                      '(Rückgabewert 1 falls nicht).')
+    parser.add_option('-i', '--incremental', action="store_true",
+                      default=False,
+                      help='Nur verschobene Einträge neu einsortieren, '
+                      'Patch ohne vollständigen Vergleich erstellen.')
+    parser.add_option('-b', '--benchmark', action="store_true", default=False,
+                      help='Laufzeitvergleich vollständige/inkrementelle '
+                      'Sortierung.')
 
     (options, args) = parser.parse_args()
 
@@ -94,29 +342,83 @@ if __name__ == '__main__':
     else:
         sortkey = sortkey_duden
 
-    # Einlesen in eine Liste::
-    
+    # Sortierschlüssel einer UTF-8-kodierten Zeile (ohne Zwischenspeicher)::
+
+    def line_key(line):
+        return sortkey(WordEntry(line.decode('utf8')))
+
+    # Externes Sortieren (die Sortierschlüssel werden nicht
+    # zwischengespeichert, um den Speicherbedarf zu begrenzen)::
+
+    if options.external:
+        if args:
+            lines = chain(*[open(name) for name in args])
+        else:
+            lines = sys.stdin
+        lines = (line.rstrip() for line in lines)
+        for line in external_sort(lines, line_key, options.run_size):
+            print line
+        sys.exit()
+
+    # Einlesen in eine Liste (von UTF-8-kodierten Zeilen)::
+
     if args:
         eingangsdateiname = args[0]
-        wordfile = WordFile(eingangsdateiname)
-        wortliste = list(wordfile)
+        wortliste = [line.rstrip() for line in open(eingangsdateiname)]
+        cachefile = options.cache or cache_file(eingangsdateiname,
+                                    '.sortkeys-' + sortkey.__name__[8:])
     else:
         eingangsdateiname = 'stdin'
-        wortliste = [WordEntry(line.rstrip().decode('utf-8'))
-                     for line in sys.stdin]
+        wortliste = [line.rstrip() for line in sys.stdin]
+        cachefile = options.cache
+
+    if options.no_cache:
+        key = line_key
+    else:
+        cache = SortKeyCache(sortkey, cachefile)
+        key = cache.key
+
+    if options.benchmark:
+        benchmark(wortliste, key)
+        sys.exit()
+
+    # Test auf Sortierung::
+
+    if options.check:
+        keys = map(key, wortliste)
+        if not options.no_cache:
+            cache.save()
+        if is_sorted(keys):
+            print 'sortiert'
+            sys.exit()
+        print '%d Einträge nicht an ihrem Platz' % len(out_of_order(
+                                            zip(keys, xrange(len(keys)))))
+        sys.exit(1)
 
     # Sortieren::
 
-    sortiert = sorted(wortliste, key=sortkey)
+    if options.incremental:
+        order, moved = incremental_sort(map(key, wortliste))
+        sortiert = [wortliste[i] for i in order]
+    else:
+        sortiert = sorted(wortliste, key=key)
+    if not options.no_cache:
+        cache.save()
 
     if options.dump:
         for line in sortiert:
-            print unicode(line).encode('utf8')
+            print line
         sys.exit()
 
-    patch = udiff(wortliste, sortiert,
-                  eingangsdateiname, eingangsdateiname+'-sortiert',
-                  encoding='utf-8')
+    if options.incremental:
+        patch = sort_patch(wortliste, order, moved,
+                           eingangsdateiname, eingangsdateiname+'-sortiert')
+    else:
+        wortliste = [line.decode('utf8') for line in wortliste]
+        sortiert = [line.decode('utf8') for line in sortiert]
+        patch = udiff(wortliste, sortiert,
+                      eingangsdateiname, eingangsdateiname+'-sortiert',
+                      encoding='utf-8')
     if patch:
         print patch
         if options.patchfile: